@@ -1,8 +1,47 @@
 """JWT token creation and verification utilities"""
+import calendar
+import logging
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
 from ..config import settings
+from .jwt_codecs import JWTCodec, TokenDecodeError, build_codec
+
+logger = logging.getLogger(__name__)
+
+# Backend used for encode/decode; see jwt_codecs.CODECS and bench_jwt_codecs.py
+JWT_CODEC = "jose"
+
+_codec: Optional[JWTCodec] = None
+
+
+def get_codec() -> JWTCodec:
+    """
+    Get the active JWT codec, building it on first use
+
+    The signing secret is resolved from settings once, here, rather than
+    on every encode/decode.
+    """
+    global _codec
+    if _codec is None:
+        _codec = build_codec(JWT_CODEC, settings.effective_jwt_secret, settings.JWT_ALGORITHM)
+    return _codec
+
+
+def set_codec(name: str) -> JWTCodec:
+    """
+    Switch the active JWT codec
+
+    Args:
+        name: Codec name (jose, pyjwt or hs256)
+
+    Returns:
+        The new active codec
+    """
+    global _codec, JWT_CODEC
+    _codec = build_codec(name, settings.effective_jwt_secret, settings.JWT_ALGORITHM)
+    JWT_CODEC = name
+    return _codec
 
 
 def create_access_token(user_id: int, email: str, expires_delta: Optional[timedelta] = None) -> str:
@@ -20,6 +59,7 @@ def create_access_token(user_id: int, email: str, expires_delta: Optional[timede
     to_encode = {
         "sub": str(user_id),
         "email": email,
+        "jti": uuid.uuid4().hex,  # Lets the token be revoked on logout
     }
 
     if expires_delta:
@@ -27,15 +67,9 @@ def create_access_token(user_id: int, email: str, expires_delta: Optional[timede
     else:
         expire = datetime.utcnow() + timedelta(hours=settings.JWT_EXPIRATION_HOURS)
 
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": calendar.timegm(expire.utctimetuple())})
 
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.effective_jwt_secret,
-        algorithm=settings.JWT_ALGORITHM
-    )
-
-    return encoded_jwt
+    return get_codec().encode(to_encode)
 
 
 def verify_token(token: str) -> Optional[dict]:
@@ -47,28 +81,20 @@ def verify_token(token: str) -> Optional[dict]:
 
     Returns:
         Decoded token payload if valid, None otherwise
-
-    Raises:
-        JWTError: If token is invalid or expired
     """
     try:
-        # Ensure we're using the same secret that was used to encode
-        payload = jwt.decode(
-            token,
-            settings.effective_jwt_secret,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = get_codec().decode(token)
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
         return payload
-    except JWTError as e:
+    except TokenDecodeError as e:
         # Log the specific error for debugging
-        print(f"JWT Error: {e}")
+        logger.debug("JWT Error: %s", e)
         return None
     except Exception as e:
         # Log any other errors
-        print(f"Unexpected error during JWT verification: {e}")
+        logger.warning("Unexpected error during JWT verification: %s", e)
         return None
 
 
@@ -0,0 +1,184 @@
+"""Interchangeable JWT encode/decode backends"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+
+class TokenDecodeError(Exception):
+    """Raised by a codec when a token is malformed, badly signed or expired"""
+
+
+class JWTCodec(ABC):
+    """
+    Interface for JWT backends
+
+    Codecs are constructed once with the signing key and algorithm so the
+    hot path does no settings lookups. Payload values must already be JSON
+    serializable (``exp`` as an integer timestamp).
+    """
+
+    name = "base"
+
+    def __init__(self, secret: str, algorithm: str = "HS256"):
+        self.secret = secret
+        self.algorithm = algorithm
+
+    @abstractmethod
+    def encode(self, payload: Dict[str, Any]) -> str:
+        """Sign a payload and return the compact token"""
+
+    @abstractmethod
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token and return its payload
+
+        Raises:
+            TokenDecodeError: If the token is malformed, badly signed or expired
+        """
+
+
+class JoseCodec(JWTCodec):
+    """python-jose backend"""
+
+    name = "jose"
+
+    def __init__(self, secret: str, algorithm: str = "HS256"):
+        super().__init__(secret, algorithm)
+        from jose import JWTError, jwt
+        self._jwt = jwt
+        self._error = JWTError
+        self._algorithms = [algorithm]
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        return self._jwt.encode(payload, self.secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(token, self.secret, algorithms=self._algorithms)
+        except self._error as e:
+            raise TokenDecodeError(str(e)) from e
+
+
+class PyJWTCodec(JWTCodec):
+    """PyJWT backend (requires the optional ``PyJWT`` package)"""
+
+    name = "pyjwt"
+
+    def __init__(self, secret: str, algorithm: str = "HS256"):
+        super().__init__(secret, algorithm)
+        try:
+            import jwt
+        except ImportError as e:
+            raise ImportError("The 'pyjwt' codec requires PyJWT: pip install PyJWT") from e
+        self._jwt = jwt
+        self._algorithms = [algorithm]
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        return self._jwt.encode(payload, self.secret, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(token, self.secret, algorithms=self._algorithms)
+        except self._jwt.PyJWTError as e:
+            raise TokenDecodeError(str(e)) from e
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class HS256Codec(JWTCodec):
+    """
+    Minimal HS256-only backend built on ``hmac``
+
+    The key and the encoded header are prepared once at construction.
+    Validates the signature, the ``alg`` header and the ``exp``/``nbf``
+    claims, which is everything the auth layer relies on.
+    """
+
+    name = "hs256"
+
+    def __init__(self, secret: str, algorithm: str = "HS256"):
+        if algorithm != "HS256":
+            raise ValueError(f"HS256Codec does not support algorithm {algorithm}")
+        super().__init__(secret, algorithm)
+        self._key = secret.encode("utf-8")
+        self._header = _b64encode(b'{"alg":"HS256","typ":"JWT"}')
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return hmac.new(self._key, signing_input, hashlib.sha256).digest()
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        body = _b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        signing_input = self._header + b"." + body
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode("ascii")
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            header = json.loads(_b64decode(header_segment))
+            signature = _b64decode(signature_segment)
+            signing_input = f"{header_segment}.{payload_segment}".encode("ascii")
+        except (ValueError, TypeError) as e:
+            raise TokenDecodeError("Malformed token") from e
+
+        if not isinstance(header, dict) or header.get("alg") != "HS256":
+            raise TokenDecodeError("The specified alg value is not allowed")
+
+        if not hmac.compare_digest(self._sign(signing_input), signature):
+            raise TokenDecodeError("Signature verification failed")
+
+        try:
+            payload = json.loads(_b64decode(payload_segment))
+        except ValueError as e:
+            raise TokenDecodeError("Invalid payload") from e
+        if not isinstance(payload, dict):
+            raise TokenDecodeError("Invalid payload")
+
+        now = time.time()
+        try:
+            if "exp" in payload and int(payload["exp"]) <= now:
+                raise TokenDecodeError("Signature has expired")
+            if "nbf" in payload and int(payload["nbf"]) > now:
+                raise TokenDecodeError("The token is not yet valid (nbf)")
+        except (ValueError, TypeError) as e:
+            raise TokenDecodeError("Invalid exp or nbf claim") from e
+
+        return payload
+
+
+CODECS = {
+    JoseCodec.name: JoseCodec,
+    PyJWTCodec.name: PyJWTCodec,
+    HS256Codec.name: HS256Codec,
+}
+
+
+def build_codec(name: str, secret: str, algorithm: str = "HS256") -> JWTCodec:
+    """
+    Construct a codec by name
+
+    Args:
+        name: One of the keys of CODECS
+        secret: Signing key
+        algorithm: JWT algorithm
+
+    Returns:
+        Codec instance
+
+    Raises:
+        ValueError: If the codec name is unknown
+    """
+    try:
+        codec_cls = CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown JWT codec: {name}") from None
+    return codec_cls(secret, algorithm)
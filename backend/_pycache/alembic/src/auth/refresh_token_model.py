@@ -1,17 +1,23 @@
 from sqlmodel import SQLModel, Field
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
 import uuid
 
 
 class RefreshToken(SQLModel, table=True):
-    """Refresh token model for authentication"""
+    """
+    Refresh token model for authentication
+
+    Only a SHA-256 hex digest of the token is stored, so the unique index
+    has fixed-size keys and a database leak does not expose usable tokens.
+    """
     __tablename__ = "refresh_tokens"
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    token: str = Field(unique=True, index=True, max_length=255)
+    token_hash: str = Field(unique=True, index=True, min_length=64, max_length=64)
     user_id: int = Field(index=True)
-    expires_at: datetime
+    expires_at: datetime = Field(index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     revoked: bool = Field(default=False)
 
@@ -19,7 +25,7 @@ class RefreshToken(SQLModel, table=True):
         json_schema_extra = {
             "example": {
                 "id": 1,
-                "token": "unique-refresh-token-string",
+                "token_hash": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
                 "user_id": 1,
                 "expires_at": "2025-01-14T10:00:00",
                 "created_at": "2025-01-07T10:00:00",
@@ -33,6 +39,11 @@ def generate_refresh_token() -> str:
     return str(uuid.uuid4())
 
 
+def hash_refresh_token(token: str) -> str:
+    """Hash a refresh token for storage and lookup"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def get_default_refresh_token_expiry() -> datetime:
     """Get default refresh token expiry (30 days)"""
-    return datetime.utcnow() + timedelta(days=30)
\ No newline at end of file
+    return datetime.utcnow() + timedelta(days=30)
@@ -0,0 +1,165 @@
+"""Refresh token storage, rotation and pruning"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import delete, or_
+from sqlmodel import Session, select
+from .refresh_token_model import (
+    RefreshToken,
+    generate_refresh_token,
+    get_default_refresh_token_expiry,
+    hash_refresh_token,
+)
+
+logger = logging.getLogger(__name__)
+
+# Live refresh tokens kept per user; the oldest are dropped beyond this
+MAX_REFRESH_TOKENS_PER_USER = 10
+
+# Rows deleted per statement by the background pruner
+PRUNE_BATCH_SIZE = 1000
+
+# Seconds between background pruning runs
+PRUNE_INTERVAL_SECONDS = 3600
+
+
+class RefreshTokenService:
+    """Service for refresh token operations"""
+
+    @staticmethod
+    def issue(session: Session, user_id: int) -> str:
+        """
+        Create a refresh token for a user and enforce the per-user cap
+
+        The caller is responsible for committing the session.
+
+        Args:
+            session: Database session
+            user_id: Owner of the token
+
+        Returns:
+            The plain refresh token string (only its hash is stored)
+        """
+        # Keep the newest MAX_REFRESH_TOKENS_PER_USER - 1 existing tokens
+        stale_ids = select(RefreshToken.id).where(
+            RefreshToken.user_id == user_id
+        ).order_by(
+            RefreshToken.created_at.desc(), RefreshToken.id.desc()
+        ).offset(MAX_REFRESH_TOKENS_PER_USER - 1)
+        session.execute(
+            delete(RefreshToken).where(RefreshToken.id.in_(stale_ids.scalar_subquery()))
+        )
+
+        refresh_token_str = generate_refresh_token()
+        session.add(RefreshToken(
+            token_hash=hash_refresh_token(refresh_token_str),
+            user_id=user_id,
+            expires_at=get_default_refresh_token_expiry(),
+        ))
+
+        return refresh_token_str
+
+    @staticmethod
+    def get_valid(session: Session, token: str) -> Optional[RefreshToken]:
+        """
+        Look up a presented refresh token
+
+        Expired or revoked tokens are deleted and treated as missing.
+
+        Args:
+            session: Database session
+            token: Plain refresh token string
+
+        Returns:
+            RefreshToken row if valid, None otherwise
+        """
+        refresh_token_obj = session.exec(
+            select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token))
+        ).first()
+
+        if refresh_token_obj is None:
+            return None
+
+        if refresh_token_obj.revoked or refresh_token_obj.expires_at < datetime.utcnow():
+            session.delete(refresh_token_obj)
+            session.commit()
+            return None
+
+        return refresh_token_obj
+
+    @staticmethod
+    def rotate(session: Session, refresh_token_obj: RefreshToken) -> str:
+        """
+        Replace a refresh token with a new one for the same user
+
+        The caller is responsible for committing the session.
+
+        Args:
+            session: Database session
+            refresh_token_obj: Token row being exchanged
+
+        Returns:
+            The new plain refresh token string
+        """
+        user_id = refresh_token_obj.user_id
+        session.delete(refresh_token_obj)
+        session.flush()
+        return RefreshTokenService.issue(session, user_id)
+
+    @staticmethod
+    def prune(session: Session, batch_size: int = PRUNE_BATCH_SIZE) -> int:
+        """
+        Delete one batch of expired or revoked refresh tokens
+
+        Args:
+            session: Database session
+            batch_size: Maximum rows deleted by this call
+
+        Returns:
+            Number of rows deleted
+        """
+        batch_ids = select(RefreshToken.id).where(
+            or_(RefreshToken.expires_at < datetime.utcnow(), RefreshToken.revoked == True)
+        ).limit(batch_size)
+        result = session.execute(
+            delete(RefreshToken).where(RefreshToken.id.in_(batch_ids.scalar_subquery()))
+        )
+        session.commit()
+        return result.rowcount
+
+
+async def run_refresh_token_pruner(
+    engine,
+    interval: float = PRUNE_INTERVAL_SECONDS,
+    batch_size: int = PRUNE_BATCH_SIZE,
+) -> None:
+    """
+    Periodically prune expired and revoked refresh tokens
+
+    Intended to be started as a task from the application lifespan and
+    cancelled on shutdown. Each batch is its own short transaction, run in a
+    worker thread so the event loop is never blocked on the database.
+
+    Args:
+        engine: SQLAlchemy engine
+        interval: Seconds to sleep between runs
+        batch_size: Rows deleted per batch
+    """
+    def prune_batch() -> int:
+        with Session(engine) as session:
+            return RefreshTokenService.prune(session, batch_size)
+
+    while True:
+        try:
+            total = 0
+            while True:
+                deleted = await asyncio.to_thread(prune_batch)
+                total += deleted
+                if deleted < batch_size:
+                    break
+            if total:
+                logger.info("Pruned %d refresh tokens", total)
+        except Exception:
+            logger.exception("Refresh token pruning failed")
+        await asyncio.sleep(interval)
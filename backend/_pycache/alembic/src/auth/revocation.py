@@ -0,0 +1,200 @@
+"""Access token revocation list held in memory and synced from the database"""
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Optional, Set
+from sqlalchemy import delete
+from sqlmodel import Session, select
+from .revoked_token_model import RevokedToken
+from ..database import engine
+
+logger = logging.getLogger(__name__)
+
+# Seconds between incremental refreshes from the database
+REVOCATION_REFRESH_INTERVAL_SECONDS = 30
+
+# Incremental refreshes between full rebuilds (which also drop expired jtis)
+REVOCATION_REBUILD_EVERY = 120
+
+
+class RevocationList:
+    """
+    Denylist of revoked access token IDs (jti claims)
+
+    Lookups are answered from an in-memory set and never touch the
+    database, since they run on the auth middleware's event loop. load()
+    and refresh() keep the set in step with the revoked_tokens table; it
+    holds only unexpired revocations, so it stays small.
+    """
+
+    def __init__(self):
+        self._revoked: Set[str] = set()
+        # jtis added while load() reads the table, merged into its result
+        self._added_during_load: Optional[Set[str]] = None
+        self._last_id = 0
+        self._loaded = False
+        self._warned_unloaded = False
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.hits = 0
+
+    @property
+    def loaded(self) -> bool:
+        """Whether load() has run, so revocations from before startup are known"""
+        return self._loaded
+
+    def load(self, session: Session) -> None:
+        """Rebuild the set from all unexpired revocations in the database"""
+        with self._lock:
+            self._added_during_load = set()
+        rows = session.exec(
+            select(RevokedToken.id, RevokedToken.jti).where(RevokedToken.expires_at > datetime.utcnow())
+        ).all()
+
+        revoked = {jti for _, jti in rows}
+        last_id = max((row_id for row_id, _ in rows), default=0)
+
+        with self._lock:
+            revoked |= self._added_during_load or set()
+            self._added_during_load = None
+            self._revoked = revoked
+            self._last_id = max(last_id, self._last_id)
+            self._loaded = True
+
+    def refresh(self, session: Session) -> int:
+        """
+        Add revocations made since the last load/refresh (e.g. by other workers)
+
+        Returns:
+            Number of new jtis added
+        """
+        rows = session.exec(
+            select(RevokedToken.id, RevokedToken.jti).where(RevokedToken.id > self._last_id)
+        ).all()
+
+        with self._lock:
+            for row_id, jti in rows:
+                self._add(jti)
+                self._last_id = max(self._last_id, row_id)
+        return len(rows)
+
+    def _add(self, jti: str) -> None:
+        # Caller holds self._lock
+        self._revoked.add(jti)
+        if self._added_during_load is not None:
+            self._added_during_load.add(jti)
+
+    def revoke(self, session: Session, jti: str, user_id: int, expires_at: datetime) -> None:
+        """
+        Revoke an access token
+
+        Args:
+            session: Database session (committed here)
+            jti: Token ID claim
+            user_id: Token owner
+            expires_at: Token expiry; the row can be pruned after this
+        """
+        existing = session.exec(select(RevokedToken).where(RevokedToken.jti == jti)).first()
+        if existing is None:
+            session.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+            session.commit()
+
+        with self._lock:
+            self._add(jti)
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """
+        Check whether a token ID has been revoked, from memory only
+
+        Args:
+            jti: Token ID claim (tokens without one cannot be revoked)
+
+        Returns:
+            True if the token is on the denylist
+        """
+        if jti is None:
+            return False
+
+        if not self._loaded and not self._warned_unloaded:
+            self._warned_unloaded = True
+            logger.warning(
+                "Revocation list not loaded; only this worker's revocations are known. "
+                "Await start_revocation_refresher() in the application lifespan."
+            )
+
+        self.checks += 1
+        revoked = jti in self._revoked
+        if revoked:
+            self.hits += 1
+        return revoked
+
+    def stats(self) -> dict:
+        """Get list size and lookup metrics"""
+        return {
+            "entries": len(self._revoked),
+            "checks": self.checks,
+            "hits": self.hits,
+        }
+
+
+def prune_expired_revocations(session: Session) -> int:
+    """Delete revocations for tokens that have expired anyway"""
+    result = session.execute(
+        delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow())
+    )
+    session.commit()
+    return result.rowcount
+
+
+revocation_list = RevocationList()
+
+
+def _sync_revocations(full: bool) -> None:
+    with Session(engine) as session:
+        if full:
+            prune_expired_revocations(session)
+            revocation_list.load(session)
+        else:
+            revocation_list.refresh(session)
+
+
+async def run_revocation_refresher(
+    interval: float = REVOCATION_REFRESH_INTERVAL_SECONDS,
+    rebuild_every: int = REVOCATION_REBUILD_EVERY,
+) -> None:
+    """
+    Keep the in-memory revocation list in sync with the revoked_tokens table
+
+    Loads the list first unless it is already loaded, then picks up new
+    revocations every interval and periodically rebuilds it so expired
+    jtis are dropped. Database work runs in a worker thread.
+    """
+    runs = 0
+    if revocation_list.loaded:
+        runs = 1
+        await asyncio.sleep(interval)
+    while True:
+        try:
+            await asyncio.to_thread(_sync_revocations, runs % rebuild_every == 0)
+        except Exception:
+            logger.exception("Revocation list refresh failed")
+        runs += 1
+        await asyncio.sleep(interval)
+
+
+async def start_revocation_refresher(
+    interval: float = REVOCATION_REFRESH_INTERVAL_SECONDS,
+    rebuild_every: int = REVOCATION_REBUILD_EVERY,
+) -> "asyncio.Task[None]":
+    """
+    Load the revocation list, then keep it fresh in a background task
+
+    Await this from the application lifespan before serving requests, so
+    tokens revoked before startup are rejected from the first request on.
+
+    Returns:
+        The refresher task; cancel it on shutdown
+    """
+    await asyncio.to_thread(_sync_revocations, True)
+    return asyncio.create_task(run_revocation_refresher(interval, rebuild_every))
@@ -0,0 +1,25 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+
+class RevokedToken(SQLModel, table=True):
+    """Revoked access token, keyed by the token's jti claim"""
+    __tablename__ = "revoked_tokens"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    jti: str = Field(unique=True, index=True, max_length=32)
+    user_id: int = Field(index=True)
+    expires_at: datetime = Field(index=True)
+    revoked_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": 1,
+                "jti": "3f2c9a8e4b7d4c1e9f0a6b5d2e8c7a1f",
+                "user_id": 1,
+                "expires_at": "2025-01-14T10:00:00",
+                "revoked_at": "2025-01-07T10:00:00",
+            }
+        }
@@ -1,4 +1,5 @@
 """Authentication API routes"""
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
 from sqlmodel import Session
 from datetime import datetime, timedelta
@@ -9,16 +10,20 @@ from .schemas import (
     LoginResponse,
 )
 from .service import AuthService
-from .jwt import get_user_id_from_token, create_access_token
+from .jwt import get_user_id_from_token, create_access_token, verify_token
 from ..database import get_session
 from ..exceptions import InvalidTokenException
-from .refresh_token_model import RefreshToken, generate_refresh_token, get_default_refresh_token_expiry
+from .refresh_token_service import RefreshTokenService
+from .revocation import revocation_list
+from .throttle import AUTH_ADMISSION, run_hashing
+from .token_cache import token_cache
+from .user_cache import user_cache
 from jose import JWTError, jwt
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
-@router.post("/register", status_code=status.HTTP_201_CREATED)
+@router.post("/register", status_code=status.HTTP_201_CREATED, dependencies=AUTH_ADMISSION)
 async def register(
     request: RegisterRequest,
     session: Session = Depends(get_session),
@@ -35,25 +40,23 @@ netstat -ano | findstr :3001
         curl -v -X POST http://127.0.0.1:8000/api/auth/register \
       -H "Content-Type: application/json" \
       -d '{"email":"me+test@example.com","password":"Passw0rd1"}'"""
-    user = AuthService.register(session, request.email, request.password)
+    user = await run_hashing(AuthService.register, session, request.email, request.password, commit=False)
+    # Read before the commit below expires the user, so it is not reloaded
+    user_response = UserResponse(id=user.id, email=user.email, created_at=user.created_at)
 
-    # Generate token for the newly registered user
-    token_data = AuthService.login(session, request.email, request.password)
+    # Issue tokens for the new user; this commits the registration too
+    token_data = await run_hashing(AuthService.issue_tokens, session, user)
 
     return LoginResponse(
         access_token=token_data["access_token"],
         token_type=token_data["token_type"],
         expires_in=token_data["expires_in"],
         refresh_token=token_data.get("refresh_token"),
-        user=UserResponse(
-            id=user.id,
-            email=user.email,
-            created_at=user.created_at,
-        ),
+        user=user_response,
     )
 
 
-@router.post("/login", status_code=status.HTTP_200_OK)
+@router.post("/login", status_code=status.HTTP_200_OK, dependencies=AUTH_ADMISSION)
 async def login(
     request: LoginRequest,
     session: Session = Depends(get_session),
@@ -68,40 +71,54 @@ async def login(
     Returns:
         LoginResponse with access_token and user info
     """
-    token_data = AuthService.login(session, request.email, request.password)
-    user = AuthService.get_user_by_email(session, request.email)
+    user = await run_hashing(AuthService.authenticate, session, request.email, request.password)
+    # Read before issue_tokens commits and expires the user, so it is not reloaded
+    user_response = UserResponse(id=user.id, email=user.email, created_at=user.created_at)
+    token_data = await run_hashing(AuthService.issue_tokens, session, user)
 
     return LoginResponse(
         access_token=token_data["access_token"],
         token_type=token_data["token_type"],
         expires_in=token_data["expires_in"],
         refresh_token=token_data.get("refresh_token"),
-        user=UserResponse(
-            id=user.id,
-            email=user.email,
-            created_at=user.created_at,
-        ),
+        user=user_response,
     )
 
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
 async def logout(
     request: Request,
+    session: Session = Depends(get_session),
 ) -> dict:
     """
-    Logout user (invalidate token on client side)
+    Logout user and revoke the presented access token
 
-    Note: Token invalidation is handled on the client side by removing
-    the token from storage. This endpoint is provided for completeness.
+    The token's jti is added to the revocation list, so it is rejected by
+    the auth middleware from now on even though it has not expired.
 
     Args:
         request: HTTP request (contains user_id from middleware)
+        session: Database session
 
     Returns:
         Success message
     """
     # The middleware has already validated the token
-    # In a real implementation, you might want to invalidate the refresh token here
+    auth_header = request.headers.get("Authorization", "")
+    token = auth_header.split()[-1] if auth_header else ""
+    payload = verify_token(token)
+
+    if payload is not None and payload.get("jti"):
+        # Blocking database write; keep it off the event loop
+        await asyncio.to_thread(
+            revocation_list.revoke,
+            session,
+            jti=payload["jti"],
+            user_id=int(payload["sub"]),
+            expires_at=datetime.utcfromtimestamp(payload["exp"]),
+        )
+    token_cache.discard(token)
+
     return {"message": "Logged out successfully"}
 
 
@@ -128,29 +145,17 @@ async def refresh_token(
             detail="Refresh token is required"
         )
     
-    # Look up the refresh token in the database
-    from sqlmodel import select
-    refresh_token_obj = session.exec(
-        select(RefreshToken).where(RefreshToken.token == refresh_token_str)
-    ).first()
-    
+    # Look up the refresh token in the database (expired/revoked tokens are removed)
+    refresh_token_obj = RefreshTokenService.get_valid(session, refresh_token_str)
+
     if not refresh_token_obj:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token"
-        )
-    
-    # Check if refresh token has expired
-    if refresh_token_obj.expires_at < datetime.utcnow():
-        session.delete(refresh_token_obj)
-        session.commit()
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh token has expired"
+            detail="Invalid or expired refresh token"
         )
     
     # Get user associated with the refresh token
-    user = AuthService.get_user_by_id(session, refresh_token_obj.user_id)
+    user = user_cache.get_by_id(session, refresh_token_obj.user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -160,17 +165,8 @@ async def refresh_token(
     # Generate new access token
     new_access_token = create_access_token(user.id, user.email)
     
-    # Generate new refresh token
-    new_refresh_token_str = generate_refresh_token()
-    
-    # Delete old refresh token and create new one
-    session.delete(refresh_token_obj)
-    new_refresh_token_obj = RefreshToken(
-        token=new_refresh_token_str,
-        user_id=user.id,
-        expires_at=get_default_refresh_token_expiry()
-    )
-    session.add(new_refresh_token_obj)
+    # Replace the old refresh token with a new one
+    new_refresh_token_str = RefreshTokenService.rotate(session, refresh_token_obj)
     session.commit()
     
     return LoginResponse(
@@ -209,8 +205,8 @@ async def get_current_user(
     if user_id is None:
         raise InvalidTokenException()
 
-    # Get user from database
-    user = AuthService.get_user_by_id(session, user_id)
+    # Get user (cached; the row almost never changes)
+    user = user_cache.get_by_id(session, user_id)
     if user is None:
         raise InvalidTokenException()
 
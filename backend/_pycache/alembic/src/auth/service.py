@@ -1,33 +1,66 @@
 """Authentication business logic service"""
 from sqlmodel import Session, select
 from datetime import datetime, timedelta
+from typing import Optional
 from fastapi import HTTPException, status
 from .models import User
+from ..tasks.models import Task
 from .security import hash_password, verify_password
 from .jwt import create_access_token
 from ..exceptions import (
     InvalidCredentialsException,
     EmailAlreadyExistsException,
 )
-from .refresh_token_model import RefreshToken, generate_refresh_token, get_default_refresh_token_expiry
+from .refresh_token_service import RefreshTokenService
 
 
 class AuthService:
     """Service for authentication operations"""
 
     @staticmethod
-    def register(session: Session, email: str, password: str) -> User:
+    def register(session: Session, email: str, password: str, commit: bool = True) -> User:
         """
-        Register a new user
+        Register a new user with a welcome task
 
         Args:
             session: Database session
             email: User email
             password: Plain text password
+            commit: Commit the transaction (see register_with_task)
 
         Returns:
             Created User object
 
+        Raises:
+            EmailAlreadyExistsException: If email already registered
+        """
+        user, _ = AuthService.register_with_task(session, email, password, commit=commit)
+        return user
+
+    @staticmethod
+    def register_with_task(
+        session: Session,
+        email: str,
+        password: str,
+        task_title: str = "Welcome to the Task App!",
+        task_description: Optional[str] = None,
+        commit: bool = True,
+    ) -> tuple[User, Task]:
+        """
+        Register a new user together with their first task
+
+        Args:
+            session: Database session
+            email: User email
+            password: Plain text password
+            task_title: Title of the first task
+            task_description: Description of the first task (defaults to a welcome message)
+            commit: Commit the transaction; pass False to keep working in it
+                (e.g. to issue tokens) and commit once at the end
+
+        Returns:
+            Tuple of (created User, created Task)
+
         Raises:
             EmailAlreadyExistsException: If email already registered
         """
@@ -59,25 +92,30 @@ class AuthService:
         )
 
         session.add(user)
-        session.commit()
-        session.refresh(user)
+        session.flush()
 
-        # Create a welcome task for the new user
+        # Create the first task for the new user in the same transaction
         # Import here to avoid circular imports
         from ..tasks.service import TaskService
-        TaskService.create_task(
+        if task_description is None:
+            task_description = f"Congratulations {user.email}, you've successfully signed up! This is your first task."
+        task = TaskService.create_task(
             session=session,
-            user_id=user.id,
-            title="Welcome to the Task App!",
-            description=f"Congratulations {user.email}, you've successfully signed up! This is your first task.",
+            user_id=str(user.id),
+            title=task_title,
+            description=task_description,
+            commit=False,
         )
 
-        return user
+        if commit:
+            session.commit()
+
+        return user, task
 
     @staticmethod
-    def login(session: Session, email: str, password: str) -> dict:
+    def authenticate(session: Session, email: str, password: str) -> User:
         """
-        Authenticate user and return JWT token
+        Check user credentials
 
         Args:
             session: Database session
@@ -85,7 +123,7 @@ class AuthService:
             password: Plain text password
 
         Returns:
-            Dictionary with access_token, token_type, expires_in, and refresh_token
+            Authenticated User object
 
         Raises:
             InvalidCredentialsException: If credentials are incorrect
@@ -102,17 +140,28 @@ class AuthService:
         if not verify_password(password, user.hashed_password):
             raise InvalidCredentialsException()
 
+        return user
+
+    @staticmethod
+    def issue_tokens(session: Session, user: User) -> dict:
+        """
+        Issue access and refresh tokens for an already authenticated user
+
+        Does no password check and no user lookup. Commits the session, so
+        any pending work (e.g. a registration) lands in the same transaction.
+
+        Args:
+            session: Database session
+            user: Authenticated user
+
+        Returns:
+            Dictionary with access_token, token_type, expires_in, and refresh_token
+        """
         # Generate JWT token
         access_token = create_access_token(user.id, user.email)
 
         # Generate refresh token
-        refresh_token_str = generate_refresh_token()
-        refresh_token_obj = RefreshToken(
-            token=refresh_token_str,
-            user_id=user.id,
-            expires_at=get_default_refresh_token_expiry()
-        )
-        session.add(refresh_token_obj)
+        refresh_token_str = RefreshTokenService.issue(session, user.id)
         session.commit()
 
         return {
@@ -122,6 +171,25 @@ class AuthService:
             "refresh_token": refresh_token_str
         }
 
+    @staticmethod
+    def login(session: Session, email: str, password: str) -> dict:
+        """
+        Authenticate user and return JWT token
+
+        Args:
+            session: Database session
+            email: User email
+            password: Plain text password
+
+        Returns:
+            Dictionary with access_token, token_type, expires_in, and refresh_token
+
+        Raises:
+            InvalidCredentialsException: If credentials are incorrect
+        """
+        user = AuthService.authenticate(session, email, password)
+        return AuthService.issue_tokens(session, user)
+
     @staticmethod
     def get_user_by_id(session: Session, user_id: int) -> User | None:
         """
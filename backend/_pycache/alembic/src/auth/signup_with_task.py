@@ -8,15 +8,15 @@ from sqlmodel import Session
 from typing import Dict, Any
 from ..auth.schemas import RegisterRequest, LoginResponse, UserResponse
 from ..auth.service import AuthService
+from ..auth.throttle import AUTH_ADMISSION, run_hashing
 from ..tasks.schemas import TaskResponse
-from ..tasks.service import TaskService
 from ..database import get_session
 
 
 router = APIRouter(prefix="/api", tags=["signup_with_task"])
 
 
-@router.post("/signup-with-task", status_code=status.HTTP_201_CREATED)
+@router.post("/signup-with-task", status_code=status.HTTP_201_CREATED, dependencies=AUTH_ADMISSION)
 async def signup_with_initial_task(
     request: RegisterRequest,
     initial_task_title: str = "Welcome Task",
@@ -35,41 +35,44 @@ async def signup_with_initial_task(
     Returns:
         Dictionary containing user info, token, and created task
     """
-    # Register the new user
-    user = AuthService.register(session, request.email, request.password)
-    
-    # Generate token for the newly registered user
-    token_data = AuthService.login(session, request.email, request.password)
+    # Register the new user with the requested task as their first task
+    user, initial_task = await run_hashing(
+        AuthService.register_with_task,
+        session,
+        request.email,
+        request.password,
+        task_title=initial_task_title,
+        task_description=initial_task_description,
+        commit=False,
+    )
     
-    # Create an initial task for the user
-    initial_task = TaskService.create_task(
-        session=session,
-        user_id=str(user.id),  # Convert to string to match new Task model
-        title=initial_task_title,
-        description=initial_task_description,
-        due_date=None
+    # Read both before the commit below expires them, so neither is reloaded
+    user_response = UserResponse(
+        id=user.id,
+        email=user.email,
+        created_at=user.created_at,
     )
+    task_response = TaskResponse(
+        id=initial_task.id,
+        user_id=initial_task.user_id,
+        title=initial_task.title,
+        description=initial_task.description,
+        completed=initial_task.completed,
+        due_date=initial_task.due_date,
+        created_at=initial_task.created_at,
+        updated_at=initial_task.updated_at,
+    )
+    
+    # Issue tokens for the new user; this commits user, task and refresh token together
+    token_data = await run_hashing(AuthService.issue_tokens, session, user)
     
     # Return comprehensive response
     response_data = {
-        "user": UserResponse(
-            id=user.id,
-            email=user.email,
-            created_at=user.created_at,
-        ),
+        "user": user_response,
         "access_token": token_data["access_token"],
         "token_type": token_data["token_type"],
         "expires_in": token_data["expires_in"],
-        "initial_task": TaskResponse(
-            id=initial_task.id,
-            user_id=initial_task.user_id,
-            title=initial_task.title,
-            description=initial_task.description,
-            completed=initial_task.completed,
-            due_date=initial_task.due_date,
-            created_at=initial_task.created_at,
-            updated_at=initial_task.updated_at,
-        ),
+        "initial_task": task_response,
         "message": f"User {request.email} registered successfully with initial task created!"
     }
 
@@ -0,0 +1,212 @@
+"""Rate limiting and admission control for the password-hashing endpoints"""
+import functools
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar
+import anyio
+from fastapi import Depends, HTTPException, Request, status
+
+
+# (burst capacity, tokens refilled per second) for each limit
+IP_RATE_LIMIT = (20, 20 / 60)
+EMAIL_RATE_LIMIT = (5, 5 / 60)
+
+# Concurrent bcrypt operations allowed per worker; bcrypt is CPU bound so
+# running more than one per core only adds latency
+MAX_CONCURRENT_HASHES = os.cpu_count() or 1
+
+# Seconds a request may wait for a hashing slot before being shed with 503
+ADMISSION_WAIT_SECONDS = 2.0
+
+# Bucket keys kept by the in-memory backend before idle ones are dropped
+MAX_TRACKED_KEYS = 100000
+
+
+class InMemoryRateLimitBackend:
+    """Token buckets held in this worker's memory"""
+
+    def __init__(self, max_keys: int = MAX_TRACKED_KEYS, prune_every: Optional[int] = None):
+        self.max_keys = max_keys
+        # New keys between prunes once over max_keys, so the scan is amortized
+        self.prune_every = prune_every or max(1, max_keys // 10)
+        # key -> (tokens, last update, time the bucket is full again)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._new_keys = 0
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: int, refill_rate: float) -> float:
+        """
+        Take one token from a bucket
+
+        Args:
+            key: Bucket identifier
+            capacity: Maximum tokens (burst size)
+            refill_rate: Tokens added per second
+
+        Returns:
+            0 if allowed, otherwise seconds until a token is available
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens, updated = capacity, now
+                self._new_keys += 1
+            else:
+                tokens, updated, _ = bucket
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            if tokens < 1:
+                self._store(key, tokens, now, capacity, refill_rate)
+                return (1 - tokens) / refill_rate
+
+            self._store(key, tokens - 1, now, capacity, refill_rate)
+            if len(self._buckets) > self.max_keys and self._new_keys >= self.prune_every:
+                self._prune(now)
+            return 0.0
+
+    def _store(self, key: str, tokens: float, now: float, capacity: int, refill_rate: float) -> None:
+        # Each bucket keeps its own refill time, whichever limit it belongs to
+        self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_rate)
+
+    def _prune(self, now: float) -> None:
+        # Buckets that are full again carry no state worth keeping
+        for key in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+        self._new_keys = 0
+
+
+class RedisRateLimitBackend:
+    """
+    Token buckets shared across workers in Redis (requires the optional
+    ``redis`` package)
+    """
+
+    _SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - updated) * rate)
+    local wait = 0
+    if tokens < 1 then
+        wait = (1 - tokens) / rate
+    else
+        tokens = tokens - 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate))
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str, prefix: str = "throttle:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("The Redis rate limit backend requires redis: pip install redis") from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._consume = self._client.register_script(self._SCRIPT)
+
+    def consume(self, key: str, capacity: int, refill_rate: float) -> float:
+        return float(self._consume(keys=[self.prefix + key], args=[capacity, refill_rate, time.time()]))
+
+
+T = TypeVar("T")
+
+_backend = InMemoryRateLimitBackend()
+
+# Admission: requests allowed past hashing_slot at once
+_hash_slots = anyio.CapacityLimiter(MAX_CONCURRENT_HASHES)
+
+# Worker threads for admitted requests' blocking work, kept apart from the
+# shared threadpool limit so auth bursts cannot starve other endpoints
+_hash_threads = anyio.CapacityLimiter(MAX_CONCURRENT_HASHES)
+
+
+def set_rate_limit_backend(backend) -> None:
+    """Replace the rate limit backend (e.g. with RedisRateLimitBackend)"""
+    global _backend
+    _backend = backend
+
+
+def _too_many_requests(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail={"error": "rate_limited", "detail": "Too many attempts, please try again later"},
+        headers={"Retry-After": str(math.ceil(retry_after))},
+    )
+
+
+async def _request_email(request: Request) -> Optional[str]:
+    # The body is cached on the request, so the route can still read it
+    try:
+        email = json.loads(await request.body()).get("email")
+    except (ValueError, AttributeError):
+        return None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+async def auth_rate_limit(request: Request) -> None:
+    """
+    Dependency applying per-IP and per-email token buckets
+
+    Raises:
+        HTTPException: 429 with Retry-After if a limit is exceeded
+    """
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = _backend.consume(f"ip:{client_ip}", *IP_RATE_LIMIT)
+    if retry_after:
+        raise _too_many_requests(retry_after)
+
+    email = await _request_email(request)
+    if email:
+        retry_after = _backend.consume(f"email:{email}", *EMAIL_RATE_LIMIT)
+        if retry_after:
+            raise _too_many_requests(retry_after)
+
+
+async def hashing_slot():
+    """
+    Dependency holding one of MAX_CONCURRENT_HASHES slots for the request
+
+    Waiting happens on the event loop, so queued requests hold no threads;
+    only admitted ones go on to run_hashing.
+
+    Raises:
+        HTTPException: 503 if no slot frees up within ADMISSION_WAIT_SECONDS
+    """
+    # Borrow on behalf of the request, not the task, since FastAPI may
+    # close the dependency from another task
+    slot = object()
+    try:
+        with anyio.fail_after(ADMISSION_WAIT_SECONDS):
+            await _hash_slots.acquire_on_behalf_of(slot)
+    except TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": "overloaded", "detail": "Server is busy, please try again shortly"},
+            headers={"Retry-After": "1"},
+        )
+    try:
+        yield
+    finally:
+        _hash_slots.release_on_behalf_of(slot)
+
+
+async def run_hashing(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run blocking auth work (bcrypt and its queries) in a worker thread
+
+    Uses its own MAX_CONCURRENT_HASHES threads rather than the shared
+    threadpool, which sync dependencies and other endpoints need.
+    """
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_hash_threads)
+
+
+# Rate limits first, then admission, both before any database or bcrypt work
+AUTH_ADMISSION = [Depends(auth_rate_limit), Depends(hashing_slot)]
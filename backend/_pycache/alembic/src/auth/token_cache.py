@@ -0,0 +1,149 @@
+"""In-process cache of verified JWT access tokens"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+from .jwt import verify_token
+from .revocation import revocation_list
+
+
+# Upper bound on cached tokens per worker process
+TOKEN_CACHE_MAX_SIZE = 10000
+
+
+class CachedToken(NamedTuple):
+    """Decoded claims kept for a verified token"""
+    user_id: int
+    expires_at: float  # Unix timestamp taken from the token's "exp" claim
+    jti: Optional[str]
+
+
+class TokenCache:
+    """
+    Bounded LRU cache mapping a token hash to its verified user ID
+
+    Entries live until the token's own expiry. Raw tokens are never stored;
+    keys are SHA-256 digests of the token string.
+    """
+
+    def __init__(
+        self,
+        max_size: int = TOKEN_CACHE_MAX_SIZE,
+        is_revoked: Optional[Callable[[CachedToken], bool]] = None,
+    ):
+        self.max_size = max_size
+        self.is_revoked = is_revoked
+        self._entries: "OrderedDict[bytes, CachedToken]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get_user_id(self, token: str) -> Optional[int]:
+        """
+        Return the user ID for a token, verifying it only on a cache miss
+
+        Args:
+            token: JWT token string
+
+        Returns:
+            User ID if token is valid and not revoked, None otherwise
+        """
+        key = self._key(token)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+            if entry is None:
+                self.misses += 1
+
+        if entry is None:
+            entry = self._verify(token)
+            if entry is None:
+                return None
+            self._store(key, entry)
+
+        # Revocation is checked on every lookup so a revoked token stops
+        # working immediately, even while its entry is still cached
+        if self.is_revoked is not None and self.is_revoked(entry):
+            self._discard_key(key)
+            return None
+
+        return entry.user_id
+
+    @staticmethod
+    def _verify(token: str) -> Optional[CachedToken]:
+        payload = verify_token(token)
+        if payload is None:
+            return None
+
+        try:
+            user_id = int(payload.get("sub"))
+            expires_at = float(payload["exp"])
+        except (KeyError, ValueError, TypeError):
+            return None
+
+        return CachedToken(user_id=user_id, expires_at=expires_at, jti=payload.get("jti"))
+
+    def _store(self, key: bytes, entry: CachedToken) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _discard_key(self, key: bytes) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard(self, token: str) -> None:
+        """Drop a single token from the cache (e.g. on logout)"""
+        self._discard_key(self._key(token))
+
+    def discard_user(self, user_id: int) -> None:
+        """Drop every cached token belonging to a user"""
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if v.user_id == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all cached tokens"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Get cache metrics
+
+        Returns:
+            Dictionary with size, hits, misses, evictions, expirations and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+token_cache = TokenCache(is_revoked=lambda entry: revocation_list.is_revoked(entry.jti))
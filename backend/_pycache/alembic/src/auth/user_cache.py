@@ -0,0 +1,171 @@
+"""Read-through cache of user rows for hot authenticated endpoints"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple, Optional
+from sqlalchemy import event
+from sqlmodel import Session, select
+from .models import User
+
+
+# Seconds a cached user stays valid without being re-read
+USER_CACHE_TTL_SECONDS = 300
+
+# Upper bound on cached users per worker process
+USER_CACHE_MAX_SIZE = 10000
+
+
+class UserSnapshot(NamedTuple):
+    """Immutable projection of a User row (never includes the password hash)"""
+    id: int
+    email: str
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(id=user.id, email=user.email, created_at=user.created_at)
+
+
+class UserCache:
+    """
+    TTL- and size-bounded LRU of UserSnapshots, indexed by id and by email
+
+    Only positive results are cached. Entries are dropped explicitly with
+    invalidate(), which runs automatically when a User is updated or
+    deleted through the ORM.
+    """
+
+    def __init__(self, ttl: float = USER_CACHE_TTL_SECONDS, max_size: int = USER_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._by_id: "OrderedDict[int, tuple[UserSnapshot, float]]" = OrderedDict()
+        self._id_by_email: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _get(self, user_id: int) -> Optional[UserSnapshot]:
+        with self._lock:
+            cached = self._by_id.get(user_id)
+            if cached is not None:
+                snapshot, expires_at = cached
+                if expires_at > time.monotonic():
+                    self._by_id.move_to_end(user_id)
+                    self.hits += 1
+                    return snapshot
+                self._remove(user_id)
+            self.misses += 1
+            return None
+
+    def _put(self, snapshot: UserSnapshot) -> None:
+        with self._lock:
+            self._remove(snapshot.id)
+            self._by_id[snapshot.id] = (snapshot, time.monotonic() + self.ttl)
+            self._id_by_email[snapshot.email] = snapshot.id
+            while len(self._by_id) > self.max_size:
+                _, (old, _) = self._by_id.popitem(last=False)
+                self._id_by_email.pop(old.email, None)
+                self.evictions += 1
+
+    def _remove(self, user_id: int) -> bool:
+        # Caller holds the lock
+        cached = self._by_id.pop(user_id, None)
+        if cached is None:
+            return False
+        self._id_by_email.pop(cached[0].email, None)
+        return True
+
+    def get_by_id(self, session: Session, user_id: int) -> Optional[UserSnapshot]:
+        """
+        Get user by ID, reading from the database only on a miss
+
+        Args:
+            session: Database session
+            user_id: User ID
+
+        Returns:
+            UserSnapshot if found, None otherwise
+        """
+        snapshot = self._get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+        user = session.exec(select(User).where(User.id == user_id)).first()
+        if user is None:
+            return None
+
+        snapshot = UserSnapshot.from_user(user)
+        self._put(snapshot)
+        return snapshot
+
+    def get_by_email(self, session: Session, email: str) -> Optional[UserSnapshot]:
+        """
+        Get user by email, reading from the database only on a miss
+
+        Args:
+            session: Database session
+            email: User email
+
+        Returns:
+            UserSnapshot if found, None otherwise
+        """
+        with self._lock:
+            user_id = self._id_by_email.get(email)
+        if user_id is not None:
+            snapshot = self._get(user_id)
+            if snapshot is not None:
+                return snapshot
+        else:
+            with self._lock:
+                self.misses += 1
+
+        user = session.exec(select(User).where(User.email == email)).first()
+        if user is None:
+            return None
+
+        snapshot = UserSnapshot.from_user(user)
+        self._put(snapshot)
+        return snapshot
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user from the cache after it changes"""
+        with self._lock:
+            if self._remove(user_id):
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all cached users"""
+        with self._lock:
+            self._by_id.clear()
+            self._id_by_email.clear()
+
+    def stats(self) -> dict:
+        """
+        Get cache metrics
+
+        Returns:
+            Dictionary with size, hits, misses, evictions, invalidations and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._by_id),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    user_cache.invalidate(target.id)
@@ -1,16 +1,78 @@
 import asyncio
-from typing import Dict, Any, List
-from openai import OpenAI
-from sqlmodel import Session, select
-from .conversation_models import Message
-from ..config import settings
+import time
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, Union
+from openai import AsyncOpenAI
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from .context import ContextBuilder
+from . import intents
+from .intents import Intent, intent_metrics, match_intent, render_response
+from .llm_calls import Deadline, completion_stream, create_completion
+from .openai_client import OPENAI_MODEL
+from .providers import ChatProvider
+from .tool_executor import ToolExecutor
+from .tool_registry import TOOL_REGISTRY
+from .timing import current_timings, span
 import json
 
 
+# Ask for a final usage chunk on streams (sent via extra_body to work with any 1.x SDK)
+_STREAM_USAGE = {"stream_options": {"include_usage": True}}
+
+
+def _record_usage(chunk: Any) -> None:
+    timings = current_timings()
+    if timings is not None and getattr(chunk, "usage", None) is not None:
+        timings.add_usage(chunk.usage)
+
+
+def _first_token() -> None:
+    timings = current_timings()
+    if timings is not None:
+        timings.first_token()
+
+
+def _parse_arguments(raw: Optional[str]) -> Dict[str, Any]:
+    """Decode tool call arguments; malformed JSON yields no arguments"""
+    try:
+        args = json.loads(raw or "{}")
+    except ValueError:
+        return {}
+    return args if isinstance(args, dict) else {}
+
+
 class AIAgentService:
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)  # Need to add this to config
+    def __init__(self, client: Union[ChatProvider, AsyncOpenAI], engine: Optional[Engine] = None):
+        # Chat provider, or the shared app-scoped OpenAI client (see providers.get_chat_provider)
+        self.client = client
+        # Engine the tools open their sessions on (defaults to the app engine)
+        self.engine = engine
     
+    def _load_history(self, session: Session, conversation_id: int, user_message: str) -> List[Dict[str, Any]]:
+        """Build the token-budgeted context, ending with the new user message"""
+        return ContextBuilder(self.client).build(session, conversation_id, user_message)
+
+    async def _try_fast_path(self, user_id: str, user_message: str) -> Optional[Tuple[Intent, Any, str]]:
+        """
+        Handle a simple command locally, without the model
+
+        Returns:
+            (intent, tool result, templated reply), or None if the message
+            needs the model
+        """
+        if not intents.INTENT_FAST_PATH:
+            return None
+
+        started = time.perf_counter()
+        intent = match_intent(user_message)
+        if intent is None or intent.confidence < intents.INTENT_MIN_CONFIDENCE:
+            intent_metrics.record_miss(intent)
+            return None
+
+        result = await ToolExecutor(user_id, self.engine).run(intent.tool, intent.arguments)
+        intent_metrics.record_hit(intent, result, time.perf_counter() - started)
+        return intent, result, render_response(intent, result)
+
     async def process_conversation(
         self,
         session: Session,
@@ -21,144 +83,57 @@ class AIAgentService:
         """
         Process a user message using OpenAI Agent with MCP tools
         """
-        # Retrieve conversation history
-        messages_db = session.exec(
-            select(Message)
-            .where(Message.conversation_id == conversation_id)
-            .order_by(Message.created_at)
-        ).all()
-        
-        # Convert to OpenAI format
-        conversation_history = []
-        for msg in messages_db:
-            conversation_history.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-        
-        # Add the new user message
-        conversation_history.append({
-            "role": "user",
-            "content": user_message
-        })
-        
-        # Define tools that correspond to MCP tools
-        tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "add_task",
-                    "description": "Create a new task",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "user_id": {"type": "string", "description": "User identifier"},
-                            "title": {"type": "string", "description": "Task title"},
-                            "description": {"type": "string", "description": "Task description (optional)"}
-                        },
-                        "required": ["user_id", "title"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "list_tasks",
-                    "description": "Retrieve tasks from the list",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "user_id": {"type": "string", "description": "User identifier"},
-                            "status": {"type": "string", "description": "Filter by status: all, pending, completed (optional)"}
-                        },
-                        "required": ["user_id"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "complete_task",
-                    "description": "Mark a task as complete",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "user_id": {"type": "string", "description": "User identifier"},
-                            "task_id": {"type": "integer", "description": "Task ID to complete"}
-                        },
-                        "required": ["user_id", "task_id"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "delete_task",
-                    "description": "Remove a task from the list",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "user_id": {"type": "string", "description": "User identifier"},
-                            "task_id": {"type": "integer", "description": "Task ID to delete"}
-                        },
-                        "required": ["user_id", "task_id"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "update_task",
-                    "description": "Modify task title or description",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "user_id": {"type": "string", "description": "User identifier"},
-                            "task_id": {"type": "integer", "description": "Task ID to update"},
-                            "title": {"type": "string", "description": "New task title (optional)"},
-                            "description": {"type": "string", "description": "New task description (optional)"}
-                        },
-                        "required": ["user_id", "task_id"]
-                    }
-                }
-            }
-        ]
-        
+        with span("fast_path"):
+            fast = await self._try_fast_path(user_id, user_message)
+        if fast is not None:
+            intent, _, response = fast
+            _first_token()
+            return {"response": response, "tool_calls": [{"name": intent.tool, "arguments": intent.arguments}]}
+
+        with span("context"):
+            conversation_history = self._load_history(session, conversation_id, user_message)
+        deadline = Deadline()
+
         try:
             # Call OpenAI with tools
-            response = self.client.chat.completions.create(
-                model="gpt-4-turbo-preview",  # or gpt-3.5-turbo
-                messages=conversation_history,
-                tools=tools,
-                tool_choice="auto"
-            )
+            with span("llm"):
+                response = await create_completion(
+                    self.client,
+                    deadline,
+                    model=OPENAI_MODEL,
+                    messages=conversation_history,
+                    tools=TOOL_REGISTRY.openai_tools(),
+                    tool_choice="auto"
+                )
+            # Without streaming, the first completion returning is the first model output
+            _first_token()
             
             response_message = response.choices[0].message
             tool_calls = response_message.tool_calls
             
-            # Process tool calls if any
+            # Run all tool calls of this response concurrently
             tool_results = []
             if tool_calls:
-                for tool_call in tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    
-                    # In a real implementation, this would call the MCP server
-                    # For now, we'll simulate the tool call
-                    result = await self.execute_tool_call(function_name, function_args)
+                calls = [(tc.function.name, _parse_arguments(tc.function.arguments)) for tc in tool_calls]
+                with span("tools"):
+                    results = await self.execute_tool_calls(user_id, calls)
+                for tool_call, (function_name, _), result in zip(tool_calls, calls, results):
                     tool_results.append({
                         "tool_call_id": tool_call.id,
                         "role": "tool",
                         "name": function_name,
-                        "content": json.dumps(result)
+                        "content": json.dumps(result, default=str)
                     })
-                
+
                 # Get final response after tool execution
                 if tool_results:
-                    final_response = self.client.chat.completions.create(
-                        model="gpt-4-turbo-preview",
-                        messages=conversation_history + [response_message] + tool_results
-                    )
+                    with span("llm_final"):
+                        final_response = await create_completion(
+                            self.client,
+                            deadline,
+                            model=OPENAI_MODEL,
+                            messages=conversation_history + [response_message] + tool_results
+                        )
                     final_content = final_response.choices[0].message.content
                 else:
                     final_content = response_message.content
@@ -170,7 +145,7 @@ class AIAgentService:
                 "tool_calls": [
                     {
                         "name": tc.function.name,
-                        "arguments": json.loads(tc.function.arguments)
+                        "arguments": _parse_arguments(tc.function.arguments)
                     } for tc in tool_calls
                 ] if tool_calls else []
             }
@@ -181,47 +156,141 @@ class AIAgentService:
                 "tool_calls": []
             }
     
-    async def execute_tool_call(self, function_name: str, function_args: Dict[str, Any]) -> Dict[str, Any]:
+    async def stream_conversation(
+        self,
+        session: Session,
+        conversation_id: int,
+        user_id: str,
+        user_message: str
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        Execute a tool call (in a real implementation, this would connect to the MCP server)
-        For now, we'll simulate the behavior
+        Stream a reply to a user message as it is generated
+
+        Yields events as dictionaries with an "event" key:
+            {"event": "token", "content": str} for each text delta
+            {"event": "tool_call", "name": str, "arguments": dict} before a tool runs
+            {"event": "tool_result", "name": str, "result": Any} after it returns
+            {"event": "done", "response": str, "tool_calls": list} once at the end
+            {"event": "error", "detail": str} if the model call fails (then "done")
         """
-        # In a real implementation, this would make an actual call to the MCP server
-        # For simulation purposes, we'll return mock responses
-        
-        if function_name == "add_task":
-            # Simulate adding a task
-            return {
-                "task_id": 1,  # Simulated new task ID
-                "status": "created",
-                "title": function_args.get("title", "Untitled task")
-            }
-        elif function_name == "list_tasks":
-            # Simulate listing tasks
-            return [
-                {"id": 1, "title": "Sample task", "completed": False},
-                {"id": 2, "title": "Another task", "completed": True}
-            ]
-        elif function_name == "complete_task":
-            # Simulate completing a task
-            return {
-                "task_id": function_args.get("task_id"),
-                "status": "completed",
-                "title": "Sample completed task"
-            }
-        elif function_name == "delete_task":
-            # Simulate deleting a task
-            return {
-                "task_id": function_args.get("task_id"),
-                "status": "deleted",
-                "title": "Sample deleted task"
-            }
-        elif function_name == "update_task":
-            # Simulate updating a task
-            return {
-                "task_id": function_args.get("task_id"),
-                "status": "updated",
-                "title": function_args.get("title", "Updated task")
-            }
-        else:
-            return {"error": f"Unknown function: {function_name}"}
\ No newline at end of file
+        with span("fast_path"):
+            fast = await self._try_fast_path(user_id, user_message)
+        if fast is not None:
+            intent, result, response = fast
+            yield {"event": "tool_call", "name": intent.tool, "arguments": intent.arguments}
+            yield {"event": "tool_result", "name": intent.tool, "result": result}
+            _first_token()
+            yield {"event": "token", "content": response}
+            yield {"event": "done", "response": response, "tool_calls": [{"name": intent.tool, "arguments": intent.arguments}]}
+            return
+
+        with span("context"):
+            conversation_history = self._load_history(session, conversation_id, user_message)
+        content_parts: List[str] = []
+        executed_calls: List[Dict[str, Any]] = []
+        deadline = Deadline()
+
+        try:
+            # Tool call fragments arrive spread over chunks, keyed by index
+            pending_calls: Dict[int, Dict[str, str]] = {}
+            with span("llm"):
+                async with completion_stream(
+                    self.client,
+                    deadline,
+                    model=OPENAI_MODEL,
+                    messages=conversation_history,
+                    tools=TOOL_REGISTRY.openai_tools(),
+                    tool_choice="auto",
+                    extra_body=_STREAM_USAGE,
+                ) as stream:
+                    async for chunk in stream:
+                        _record_usage(chunk)
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta
+                        if delta.content:
+                            _first_token()
+                            content_parts.append(delta.content)
+                            yield {"event": "token", "content": delta.content}
+                        for tc in delta.tool_calls or []:
+                            call = pending_calls.setdefault(tc.index, {"id": "", "name": "", "arguments": ""})
+                            if tc.id:
+                                call["id"] = tc.id
+                            if tc.function and tc.function.name:
+                                call["name"] += tc.function.name
+                            if tc.function and tc.function.arguments:
+                                call["arguments"] += tc.function.arguments
+
+            if pending_calls:
+                calls = [pending_calls[i] for i in sorted(pending_calls)]
+                assistant_message = {
+                    "role": "assistant",
+                    "content": "".join(content_parts) or None,
+                    "tool_calls": [
+                        {
+                            "id": call["id"],
+                            "type": "function",
+                            "function": {"name": call["name"], "arguments": call["arguments"]},
+                        }
+                        for call in calls
+                    ],
+                }
+
+                parsed = [(call["name"], _parse_arguments(call["arguments"])) for call in calls]
+                for name, function_args in parsed:
+                    yield {"event": "tool_call", "name": name, "arguments": function_args}
+
+                with span("tools"):
+                    results = await self.execute_tool_calls(user_id, parsed)
+
+                tool_results = []
+                for call, (name, function_args), result in zip(calls, parsed, results):
+                    yield {"event": "tool_result", "name": name, "result": result}
+                    executed_calls.append({"name": name, "arguments": function_args})
+                    tool_results.append({
+                        "tool_call_id": call["id"],
+                        "role": "tool",
+                        "name": name,
+                        "content": json.dumps(result, default=str)
+                    })
+
+                # Stream the final response after tool execution
+                content_parts = []
+                with span("llm_final"):
+                    async with completion_stream(
+                        self.client,
+                        deadline,
+                        model=OPENAI_MODEL,
+                        messages=conversation_history + [assistant_message] + tool_results,
+                        extra_body=_STREAM_USAGE,
+                    ) as final_stream:
+                        async for chunk in final_stream:
+                            _record_usage(chunk)
+                            if chunk.choices and chunk.choices[0].delta.content:
+                                _first_token()
+                                content_parts.append(chunk.choices[0].delta.content)
+                                yield {"event": "token", "content": chunk.choices[0].delta.content}
+
+            final_content = "".join(content_parts) or "I processed your request."
+
+        except Exception as e:
+            final_content = f"Sorry, I encountered an error: {str(e)}"
+            yield {"event": "error", "detail": str(e)}
+
+        yield {"event": "done", "response": final_content, "tool_calls": executed_calls}
+
+    async def execute_tool_calls(self, user_id: str, calls: List[tuple]) -> List[Any]:
+        """
+        Execute tool calls in-process against the task service
+
+        Independent calls from one model response run concurrently, each on
+        its own session and with its own timeout.
+
+        Args:
+            user_id: Authenticated user the calls act for
+            calls: (name, arguments) pairs
+
+        Returns:
+            One result per call, in order
+        """
+        return await ToolExecutor(user_id, self.engine).run_all(calls)
@@ -0,0 +1,261 @@
+"""Retention policy for chat messages: compressed archival of old history"""
+import asyncio
+import json
+import logging
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete
+from sqlmodel import Session, select
+from .conversation_models import Message, MessageArchive
+
+logger = logging.getLogger(__name__)
+
+# Messages older than this are moved out of the hot messages table
+MESSAGE_RETENTION_DAYS = 90
+
+# Codec for new archive blocks: "zlib", or "zstd" (requires zstandard)
+ARCHIVE_CODEC = "zlib"
+
+# Messages moved per transaction by the archiver
+ARCHIVE_BATCH_SIZE = 1000
+
+# Seconds between background archival runs
+ARCHIVE_INTERVAL_SECONDS = 3600
+
+ARCHIVE_CODECS = ("zlib", "zstd")
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("The zstd archive codec requires zstandard: pip install zstandard") from e
+    return zstandard
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """Compress an archive payload"""
+    if codec == "zstd":
+        return _zstd().ZstdCompressor(level=9).compress(data)
+    return zlib.compress(data, 9)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """Decompress an archive payload written with codec"""
+    if codec == "zstd":
+        return _zstd().ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def set_message_retention(days: float) -> None:
+    """Archive messages older than this many days"""
+    global MESSAGE_RETENTION_DAYS
+    if days <= 0:
+        raise ValueError("Retention must be positive")
+    MESSAGE_RETENTION_DAYS = days
+
+
+def set_archive_codec(codec: str) -> None:
+    """
+    Choose the codec for new archive blocks; existing blocks keep theirs
+
+    Raises:
+        ValueError: If codec is not one of ARCHIVE_CODECS
+        ImportError: If codec is "zstd" and zstandard is not installed
+    """
+    global ARCHIVE_CODEC
+    if codec not in ARCHIVE_CODECS:
+        raise ValueError(f"Unknown archive codec {codec!r}; expected one of {ARCHIVE_CODECS}")
+    if codec == "zstd":
+        _zstd()
+    ARCHIVE_CODEC = codec
+
+
+def pack_messages(messages: List[Message], codec: str) -> MessageArchive:
+    """Build one archive block from messages of a single conversation, oldest first"""
+    raw = json.dumps([
+        {"id": m.id, "role": m.role, "content": m.content, "created_at": m.created_at.isoformat()}
+        for m in messages
+    ], separators=(",", ":")).encode()
+    return MessageArchive(
+        user_id=messages[0].user_id,
+        conversation_id=messages[0].conversation_id,
+        first_created_at=messages[0].created_at,
+        last_created_at=messages[-1].created_at,
+        message_count=len(messages),
+        codec=codec,
+        raw_bytes=len(raw),
+        payload=compress(raw, codec),
+    )
+
+
+def unpack_messages(archive: MessageArchive) -> List[Message]:
+    """Messages of an archive block as (detached) Message objects, oldest first"""
+    return [
+        Message(
+            id=item["id"],
+            user_id=archive.user_id,
+            conversation_id=archive.conversation_id,
+            role=item["role"],
+            content=item["content"],
+            created_at=datetime.fromisoformat(item["created_at"]),
+        )
+        for item in json.loads(decompress(archive.payload, archive.codec))
+    ]
+
+
+class MessageArchiveService:
+    """Moves old messages into compressed per-conversation blocks and reads them back"""
+
+    @staticmethod
+    def archive_batch(
+        session: Session,
+        older_than: datetime,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+        codec: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """
+        Archive one batch of the oldest messages created before older_than
+
+        The batch's messages are grouped per conversation into one block
+        each; blocks are inserted and the messages deleted in the same
+        transaction.
+
+        Args:
+            session: Database session
+            older_than: Messages created before this are archived
+            batch_size: Maximum messages moved by this call
+            codec: Compression codec (ARCHIVE_CODEC if omitted)
+
+        Returns:
+            Counts: messages, blocks, raw_bytes, compressed_bytes
+        """
+        messages = session.exec(
+            select(Message)
+            .where(Message.created_at < older_than)
+            .order_by(Message.conversation_id, Message.created_at, Message.id)
+            .limit(batch_size)
+        ).all()
+        stats = {"messages": len(messages), "blocks": 0, "raw_bytes": 0, "compressed_bytes": 0}
+        if not messages:
+            return stats
+
+        by_conversation: Dict[int, List[Message]] = defaultdict(list)
+        for message in messages:
+            by_conversation[message.conversation_id].append(message)
+
+        for conversation_messages in by_conversation.values():
+            block = pack_messages(conversation_messages, codec or ARCHIVE_CODEC)
+            session.add(block)
+            stats["blocks"] += 1
+            stats["raw_bytes"] += block.raw_bytes
+            stats["compressed_bytes"] += len(block.payload)
+
+        session.execute(delete(Message).where(Message.id.in_([m.id for m in messages])))
+        session.commit()
+        return stats
+
+    @staticmethod
+    def archive_old_messages(
+        session: Session,
+        retention_days: Optional[float] = None,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+    ) -> Dict[str, int]:
+        """
+        Archive every message older than the retention period, batch by batch
+
+        Args:
+            session: Database session
+            retention_days: Age limit in days (MESSAGE_RETENTION_DAYS if omitted)
+            batch_size: Messages moved per transaction
+
+        Returns:
+            Counts summed over all batches
+        """
+        days = MESSAGE_RETENTION_DAYS if retention_days is None else retention_days
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        totals = {"messages": 0, "blocks": 0, "raw_bytes": 0, "compressed_bytes": 0}
+        while True:
+            stats = MessageArchiveService.archive_batch(session, cutoff, batch_size)
+            for key, value in stats.items():
+                totals[key] += value
+            if stats["messages"] < batch_size:
+                return totals
+
+    @staticmethod
+    def read_archived(
+        session: Session,
+        conversation_id: int,
+        limit: int,
+        before: Optional[Tuple[datetime, int]] = None,
+    ) -> List[Message]:
+        """
+        Newest archived messages of a conversation, newest first
+
+        Args:
+            session: Database session
+            conversation_id: Conversation ID
+            limit: Messages wanted
+            before: Only messages ordered before this (created_at, id) key
+
+        Returns:
+            Up to limit messages; detached, so they are never flushed back
+        """
+        query = select(MessageArchive).where(MessageArchive.conversation_id == conversation_id)
+        if before is not None:
+            query = query.where(MessageArchive.first_created_at <= before[0])
+        query = query.order_by(MessageArchive.last_created_at.desc(), MessageArchive.id.desc())
+
+        found: List[Message] = []
+        for block in session.exec(query):
+            # Blocks are time-ordered; once enough are found, only a block
+            # overlapping the oldest one found can still contribute
+            if len(found) >= limit and block.last_created_at < found[limit - 1].created_at:
+                break
+            found += [
+                m for m in unpack_messages(block)
+                if before is None or (m.created_at, m.id) < before
+            ]
+            found.sort(key=lambda m: (m.created_at, m.id), reverse=True)
+        return found[:limit]
+
+
+async def run_message_archiver(
+    engine,
+    interval: float = ARCHIVE_INTERVAL_SECONDS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> None:
+    """
+    Periodically archive messages past the retention period
+
+    Intended to be started as a task from the application lifespan and
+    cancelled on shutdown. Each batch is its own short transaction, run in a
+    worker thread so the event loop is never blocked on the database.
+
+    Args:
+        engine: SQLAlchemy engine
+        interval: Seconds to sleep between runs
+        batch_size: Messages moved per batch
+    """
+    def archive_batch(cutoff: datetime) -> Dict[str, int]:
+        with Session(engine) as session:
+            return MessageArchiveService.archive_batch(session, cutoff, batch_size)
+
+    while True:
+        try:
+            cutoff = datetime.utcnow() - timedelta(days=MESSAGE_RETENTION_DAYS)
+            moved = stored = raw = 0
+            while True:
+                stats = await asyncio.to_thread(archive_batch, cutoff)
+                moved += stats["messages"]
+                raw += stats["raw_bytes"]
+                stored += stats["compressed_bytes"]
+                if stats["messages"] < batch_size:
+                    break
+            if moved:
+                logger.info("Archived %d chat messages (%d bytes -> %d compressed)", moved, raw, stored)
+        except Exception:
+            logger.exception("Chat message archival failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,183 @@
+"""Token-budgeted conversation context with rolling summaries"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Union
+from openai import AsyncOpenAI
+from sqlmodel import Session, select
+from .conversation_models import Conversation, Message
+from .llm_calls import create_completion
+from .openai_client import OPENAI_MODEL
+from .providers import ChatProvider
+from ..database import engine
+
+logger = logging.getLogger(__name__)
+
+# Most recent messages fetched per turn, before the token budget is applied
+CONTEXT_MAX_MESSAGES = 40
+
+# Estimated tokens allowed for summary + history + new message
+CONTEXT_TOKEN_BUDGET = 6000
+
+# Messages left out of the window before a summary update is started
+SUMMARY_MIN_NEW_MESSAGES = 10
+
+# Messages folded into the summary per update; long backlogs catch up over several turns
+SUMMARY_BATCH_MESSAGES = 100
+
+# Upper bound on the length of a stored summary, in estimated tokens
+SUMMARY_MAX_TOKENS = 500
+
+# Fixed per-message overhead of the chat format, in tokens
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+_SUMMARY_PROMPT = (
+    "Update the running summary of a conversation between a user and a todo "
+    "assistant. Keep facts the assistant may need later (task names, IDs, "
+    "preferences, open questions). Reply with the summary only, under "
+    f"{SUMMARY_MAX_TOKENS * 3 // 4} words."
+)
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """
+    Cheap local token estimate for a chat message
+
+    Uses the usual ~4 characters per token heuristic for English text; good
+    enough to pick a cut-off without running a real tokenizer.
+    """
+    return _MESSAGE_OVERHEAD_TOKENS + (len(text) + 3) // 4 if text else _MESSAGE_OVERHEAD_TOKENS
+
+
+class ContextBuilder:
+    """
+    Builds the message list sent to the model for one turn
+
+    Only the newest CONTEXT_MAX_MESSAGES messages are read (via the
+    (conversation_id, created_at) index) and trimmed to the token budget.
+    Anything older is represented by the conversation's stored summary,
+    which is brought up to date in the background once enough messages
+    have fallen out of the window.
+    """
+
+    _summarizing: Set[int] = set()
+    _tasks: Set[asyncio.Task] = set()
+
+    def __init__(
+        self,
+        client: Union[ChatProvider, AsyncOpenAI],
+        token_budget: int = CONTEXT_TOKEN_BUDGET,
+        max_messages: int = CONTEXT_MAX_MESSAGES,
+    ):
+        self.client = client
+        self.token_budget = token_budget
+        self.max_messages = max_messages
+
+    def build(self, session: Session, conversation_id: int, user_message: str) -> List[Dict[str, Any]]:
+        """
+        Build the model context for a new user message
+
+        Args:
+            session: Database session
+            conversation_id: Conversation ID
+            user_message: The message being answered
+
+        Returns:
+            OpenAI-format messages: optional summary, recent history, new message
+        """
+        conversation = session.get(Conversation, conversation_id)
+        recent = list(reversed(session.exec(
+            select(Message)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.desc())
+            .limit(self.max_messages)
+        ).all()))
+        window_full = len(recent) == self.max_messages
+
+        summary = conversation.summary if conversation else None
+        summary_until = conversation.summary_until if conversation else None
+        if summary_until is not None:
+            unsummarized = [m for m in recent if m.created_at > summary_until]
+            window_full = window_full and len(unsummarized) == len(recent)
+            recent = unsummarized
+
+        # Skip the user message if it is already stored (e.g. a resubmitted turn)
+        if recent and recent[-1].role == "user" and recent[-1].content == user_message:
+            recent.pop()
+
+        budget = self.token_budget - estimate_tokens(user_message)
+        if summary:
+            budget -= estimate_tokens(summary)
+        kept: List[Message] = []
+        for msg in reversed(recent):
+            cost = estimate_tokens(msg.content)
+            if cost > budget:
+                break
+            kept.append(msg)
+            budget -= cost
+        kept.reverse()
+
+        # Fold older turns into the summary once enough were cut by the budget,
+        # or when the window is full of unsummarized messages (older ones unread)
+        dropped = len(recent) - len(kept)
+        if dropped >= SUMMARY_MIN_NEW_MESSAGES or window_full:
+            cut_off = kept[0].created_at if kept else datetime.utcnow()
+            self._schedule_summary(conversation_id, cut_off)
+
+        context: List[Dict[str, Any]] = []
+        if summary:
+            context.append({"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+        context += [{"role": msg.role, "content": msg.content} for msg in kept]
+        context.append({"role": "user", "content": user_message})
+        return context
+
+    def _schedule_summary(self, conversation_id: int, cut_off: datetime) -> None:
+        if conversation_id in self._summarizing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._summarizing.add(conversation_id)
+        task = loop.create_task(self._update_summary(conversation_id, cut_off))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _update_summary(self, conversation_id: int, cut_off: datetime) -> None:
+        """Fold every unsummarized message created before cut_off into the summary"""
+        try:
+            with Session(engine) as session:
+                conversation = session.get(Conversation, conversation_id)
+                if conversation is None:
+                    return
+
+                query = select(Message).where(
+                    Message.conversation_id == conversation_id,
+                    Message.created_at < cut_off,
+                )
+                if conversation.summary_until is not None:
+                    query = query.where(Message.created_at > conversation.summary_until)
+                pending = session.exec(query.order_by(Message.created_at).limit(SUMMARY_BATCH_MESSAGES)).all()
+                if len(pending) < SUMMARY_MIN_NEW_MESSAGES:
+                    return
+
+                transcript = "\n".join(f"{m.role}: {m.content}" for m in pending)
+                response = await create_completion(
+                    self.client,
+                    model=OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": _SUMMARY_PROMPT},
+                        {"role": "user", "content": f"Current summary:\n{conversation.summary or '(none)'}\n\nNew messages:\n{transcript}"},
+                    ],
+                    max_tokens=SUMMARY_MAX_TOKENS,
+                )
+
+                conversation.summary = response.choices[0].message.content
+                conversation.summary_until = pending[-1].created_at
+                session.add(conversation)
+                session.commit()
+        except Exception:
+            logger.exception("Updating summary for conversation %s failed", conversation_id)
+        finally:
+            self._summarizing.discard(conversation_id)
@@ -1,6 +1,7 @@
+from sqlalchemy import Column, Index, LargeBinary
 from sqlmodel import SQLModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 
 
@@ -17,11 +18,24 @@ class ConversationBase(SQLModel):
 class Conversation(ConversationBase, table=True):
     """Conversation model for chat sessions"""
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Serves the keyset-paginated conversation list of a user
+        Index("ix_conversations_user_id_created_at", "user_id", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Kept up to date by the chat write path so listing conversations never
+    # aggregates over messages
+    message_count: int = Field(default=0)
+    last_message_at: Optional[datetime] = Field(default=None)
+    preview: Optional[str] = Field(default=None, max_length=255)
+    # Rolling summary of messages older than the model's context window,
+    # covering every message created at or before summary_until
+    summary: Optional[str] = Field(default=None)
+    summary_until: Optional[datetime] = Field(default=None)
 
 
 class ConversationCreate(ConversationBase):
@@ -39,6 +53,10 @@ class MessageBase(SQLModel):
 class Message(MessageBase, table=True):
     """Message model for chat history"""
     __tablename__ = "messages"
+    __table_args__ = (
+        # Serves "latest N messages of a conversation" without a sort
+        Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(index=True)
@@ -48,9 +66,61 @@ class Message(MessageBase, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
 
+class MessageArchive(SQLModel, table=True):
+    """Compressed block of archived messages from one conversation"""
+    __tablename__ = "message_archives"
+    __table_args__ = (
+        Index("ix_message_archives_conversation_id_last_created_at", "conversation_id", "last_created_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: str = Field(index=True)
+    conversation_id: int = Field(foreign_key="conversations.id")
+    # created_at range of the messages in the block
+    first_created_at: datetime
+    last_created_at: datetime
+    message_count: int
+    codec: str = Field(max_length=16)  # "zlib" or "zstd"
+    raw_bytes: int
+    # JSON list of {"id", "role", "content", "created_at"}, compressed with codec
+    payload: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    archived_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class MessageCreate(MessageBase):
     """Model for creating a new message"""
     user_id: str
     conversation_id: int
     role: str
-    content: str
\ No newline at end of file
+    content: str
+
+
+class ConversationRead(SQLModel):
+    """Conversation as shown in the conversation list"""
+    id: int
+    created_at: datetime
+    updated_at: datetime
+    message_count: int
+    last_message_at: Optional[datetime]
+    preview: Optional[str]
+
+
+class ConversationPage(SQLModel):
+    """One page of a user's conversations, newest first"""
+    conversations: List[ConversationRead]
+    next_cursor: Optional[str]
+
+
+class MessageRead(SQLModel):
+    """Message as returned by the history endpoint"""
+    id: int
+    role: str
+    content: str
+    created_at: datetime
+
+
+class MessagePage(SQLModel):
+    """One page of a conversation's messages, newest first"""
+    conversation_id: int
+    messages: List[MessageRead]
+    next_cursor: Optional[str]
@@ -0,0 +1,224 @@
+"""Deterministic offline chat provider for load tests and local development"""
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+import httpx
+import openai
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from .providers import ChatProvider
+
+_WORDS = (
+    "sure", "here", "is", "what", "I", "found", "your", "task", "list", "looks",
+    "good", "today", "let", "me", "know", "if", "you", "need", "anything", "else",
+)
+
+_ERRORS = {
+    429: openai.RateLimitError,
+    500: openai.InternalServerError,
+    503: openai.InternalServerError,
+}
+
+
+class Latency:
+    """
+    Latency distribution in seconds
+
+    Kinds: constant (seconds), uniform (low, high), lognormal (median,
+    sigma) and exponential (mean).
+    """
+
+    def __init__(self, kind: str = "constant", *params: float):
+        if kind not in ("constant", "uniform", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution {kind!r}")
+        self.kind = kind
+        self.params = params or (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        """Build from "kind:a,b", e.g. "lognormal:0.4,0.5" or "0.2" (constant)"""
+        kind, _, values = spec.partition(":")
+        if not values:
+            return cls("constant", float(kind))
+        return cls(kind, *(float(v) for v in values.split(",")))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "constant":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(self.params[0], self.params[1])
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.params[0]), self.params[1])
+        return rng.expovariate(1 / self.params[0])
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(str(p) for p in self.params)}"
+
+
+def _estimate_tokens(messages: Sequence[Any]) -> int:
+    return sum(4 + len(str(_get(m, "content") or "")) // 4 for m in messages)
+
+
+def _get(message: Any, key: str) -> Any:
+    return message.get(key) if isinstance(message, dict) else getattr(message, key, None)
+
+
+class FakeProvider(ChatProvider):
+    """
+    Scriptless stand-in for the OpenAI chat API
+
+    Replies are derived from a seeded RNG keyed on the conversation so the
+    same input always yields the same output, however requests interleave.
+    When tools are offered, a user message leads to a tool call with
+    probability tool_call_rate; once tool results are in, the reply is text.
+    Errors are injected with probability error_rate from a separate seeded
+    RNG, so retries see fresh draws.
+    """
+
+    def __init__(
+        self,
+        latency: Latency = Latency("constant", 0.0),
+        token_interval: Latency = Latency("constant", 0.0),
+        reply_tokens: int = 30,
+        tool_call_rate: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: Sequence[int] = (429, 500, 503),
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.token_interval = token_interval
+        self.reply_tokens = reply_tokens
+        self.tool_call_rate = tool_call_rate
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.seed = seed
+        self._error_rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def _rng(self, messages: Sequence[Any]) -> random.Random:
+        last = _get(messages[-1], "content") if messages else ""
+        return random.Random(f"{self.seed}:{len(messages)}:{last}")
+
+    def _maybe_fail(self) -> None:
+        with self._lock:
+            self.calls += 1
+            if not self.error_rate or self._error_rng.random() >= self.error_rate:
+                return
+            self.errors += 1
+            status = self._error_rng.choice(self.error_statuses)
+
+        request = httpx.Request("POST", "http://fake-provider/v1/chat/completions")
+        response = httpx.Response(status, request=request)
+        error = _ERRORS.get(status, openai.APIStatusError)
+        raise error(f"Injected error {status}", response=response, body=None)
+
+    async def _wait(self, seconds: float, timeout: Optional[float]) -> None:
+        if timeout is not None and seconds > timeout:
+            await asyncio.sleep(timeout)
+            raise openai.APITimeoutError(request=httpx.Request("POST", "http://fake-provider/v1/chat/completions"))
+        await asyncio.sleep(seconds)
+
+    def _plan(self, messages: Sequence[Any], tools: Optional[list]) -> Dict[str, Any]:
+        """Decide the reply: {"tool_call": {...}} or {"content": str}"""
+        rng = self._rng(messages)
+        last = messages[-1] if messages else {}
+        if tools and _get(last, "role") == "user" and rng.random() < self.tool_call_rate:
+            text = str(_get(last, "content") or "")
+            names = {tool["function"]["name"] for tool in tools}
+            if "list_tasks" in names and any(word in text.lower() for word in ("list", "show", "what")):
+                call = {"name": "list_tasks", "arguments": {"status": "all"}}
+            elif "add_task" in names:
+                call = {"name": "add_task", "arguments": {"title": text[:60] or "Untitled"}}
+            else:
+                call = {"name": sorted(names)[0], "arguments": {}}
+            return {"tool_call": {"id": f"call_{rng.randrange(10**8)}", **call}}
+
+        words = [rng.choice(_WORDS) for _ in range(self.reply_tokens)]
+        return {"content": " ".join(words).capitalize() + "."}
+
+    def _usage(self, messages: Sequence[Any], plan: Dict[str, Any]) -> Dict[str, int]:
+        prompt = _estimate_tokens(messages)
+        completion = self.reply_tokens if "content" in plan else 20
+        return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+    async def complete(self, **kwargs: Any) -> ChatCompletion:
+        messages = kwargs.get("messages") or []
+        timeout = kwargs.get("timeout")
+        plan = self._plan(messages, kwargs.get("tools"))
+        await self._wait(self.latency.sample(self._rng(messages)), timeout)
+        self._maybe_fail()
+
+        message: Dict[str, Any] = {"role": "assistant", "content": plan.get("content")}
+        if "tool_call" in plan:
+            call = plan["tool_call"]
+            message["tool_calls"] = [{
+                "id": call["id"],
+                "type": "function",
+                "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])},
+            }]
+        return ChatCompletion.model_validate({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": kwargs.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if "tool_call" in plan else "stop",
+            }],
+            "usage": self._usage(messages, plan),
+        })
+
+    async def open_stream(self, **kwargs: Any) -> AsyncIterator[ChatCompletionChunk]:
+        messages = kwargs.get("messages") or []
+        timeout = kwargs.get("timeout")
+        plan = self._plan(messages, kwargs.get("tools"))
+        rng = self._rng(messages)
+
+        # Time to first token is spent opening the stream
+        await self._wait(self.latency.sample(rng), timeout)
+        self._maybe_fail()
+        return self._chunks(kwargs, plan, rng)
+
+    async def _chunks(self, kwargs: Dict[str, Any], plan: Dict[str, Any], rng: random.Random) -> AsyncIterator[ChatCompletionChunk]:
+        deltas: List[Dict[str, Any]] = [{"role": "assistant", "content": ""}]
+        if "tool_call" in plan:
+            call = plan["tool_call"]
+            arguments = json.dumps(call["arguments"])
+            deltas.append({"tool_calls": [{"index": 0, "id": call["id"], "type": "function",
+                                           "function": {"name": call["name"], "arguments": ""}}]})
+            deltas.append({"tool_calls": [{"index": 0, "function": {"arguments": arguments}}]})
+        else:
+            words = plan["content"].split(" ")
+            deltas += [{"content": word if i == 0 else f" {word}"} for i, word in enumerate(words)]
+
+        finish = "tool_calls" if "tool_call" in plan else "stop"
+        for i, delta in enumerate(deltas + [{}]):
+            if i > 1:
+                await asyncio.sleep(self.token_interval.sample(rng))
+            yield self._chunk(kwargs, delta, finish if i == len(deltas) else None)
+
+        if (kwargs.get("extra_body") or {}).get("stream_options", {}).get("include_usage"):
+            yield ChatCompletionChunk.model_validate({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": kwargs.get("model", "fake"),
+                "choices": [],
+                "usage": self._usage(kwargs.get("messages") or [], plan),
+            })
+
+    @staticmethod
+    def _chunk(kwargs: Dict[str, Any], delta: Dict[str, Any], finish_reason: Optional[str]) -> ChatCompletionChunk:
+        return ChatCompletionChunk.model_validate({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": kwargs.get("model", "fake"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        })
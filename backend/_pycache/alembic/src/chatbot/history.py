@@ -0,0 +1,160 @@
+"""Keyset-paginated conversation and message history"""
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, or_
+from sqlmodel import Session, select
+from .conversation_models import Conversation, Message, MessageArchive
+from .archive import MessageArchiveService
+from .message_writer import message_preview
+from .pagination import decode_cursor, encode_cursor
+
+# Page size bounds for the history endpoints
+HISTORY_DEFAULT_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+
+
+def _before(model, cursor: str):
+    """Keyset condition: rows ordered after the cursor in (created_at, id) descending order"""
+    created_at, row_id = decode_cursor(cursor)
+    return or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < row_id),
+    )
+
+
+def _page(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+
+class ConversationHistoryService:
+    """Read access to a user's chat history"""
+
+    @staticmethod
+    def list_conversations(
+        session: Session,
+        user_id: str,
+        limit: int = HISTORY_DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Conversation], Optional[str]]:
+        """
+        One page of the user's conversations, newest first
+
+        Reads only the conversations table; counts and previews are the
+        denormalized columns kept by the write path.
+
+        Args:
+            session: Database session
+            user_id: Owner of the conversations
+            limit: Page size
+            cursor: next_cursor of the previous page, None for the first
+
+        Returns:
+            Tuple of (conversations, next_cursor or None on the last page)
+
+        Raises:
+            HTTPException: 400 if the cursor is malformed
+        """
+        query = select(Conversation).where(Conversation.user_id == user_id)
+        if cursor:
+            query = query.where(_before(Conversation, cursor))
+        query = query.order_by(Conversation.created_at.desc(), Conversation.id.desc()).limit(limit + 1)
+        return _page(list(session.exec(query).all()), limit)
+
+    @staticmethod
+    def list_messages(
+        session: Session,
+        conversation_id: int,
+        user_id: str,
+        limit: int = HISTORY_DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Message], Optional[str]]:
+        """
+        One page of a conversation's messages, newest first
+
+        Archived messages are read from their compressed blocks once the
+        hot table is exhausted, so paging reaches the start of the
+        conversation either way.
+
+        Args:
+            session: Database session
+            conversation_id: Conversation ID
+            user_id: Owner of the conversation
+            limit: Page size
+            cursor: next_cursor of the previous page, None for the first
+
+        Returns:
+            Tuple of (messages, next_cursor or None on the last page)
+
+        Raises:
+            HTTPException: 404 if the conversation does not belong to the user,
+                400 if the cursor is malformed
+        """
+        owned = session.exec(
+            select(Conversation.id).where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user_id,
+            )
+        ).first()
+        if owned is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found"
+            )
+
+        query = select(Message).where(Message.conversation_id == conversation_id)
+        if cursor:
+            query = query.where(_before(Message, cursor))
+        query = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)
+        messages = list(session.exec(query).all())
+
+        # Past the end of the hot table, continue into the archive
+        if len(messages) <= limit:
+            archived = MessageArchiveService.read_archived(
+                session,
+                conversation_id,
+                limit + 1 - len(messages),
+                before=decode_cursor(cursor) if cursor else None,
+            )
+            messages = sorted(messages + archived, key=lambda m: (m.created_at, m.id), reverse=True)
+        return _page(messages, limit)
+
+    @staticmethod
+    def refresh_stats(session: Session, conversation_id: int) -> None:
+        """
+        Recompute a conversation's message_count, last_message_at and preview
+        from its messages, archived ones included
+
+        The write path keeps these current; this is for backfilling rows
+        written before the columns existed.
+
+        Args:
+            session: Database session
+            conversation_id: Conversation ID
+        """
+        conversation = session.get(Conversation, conversation_id)
+        if conversation is None:
+            return
+        hot = session.exec(
+            select(func.count()).select_from(Message).where(Message.conversation_id == conversation_id)
+        ).one()
+        archived = session.exec(
+            select(func.coalesce(func.sum(MessageArchive.message_count), 0))
+            .where(MessageArchive.conversation_id == conversation_id)
+        ).one()
+        last = session.exec(
+            select(Message)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(1)
+        ).first()
+        if last is None:
+            last = next(iter(MessageArchiveService.read_archived(session, conversation_id, 1)), None)
+
+        conversation.message_count = hot + archived
+        conversation.last_message_at = last.created_at if last else None
+        conversation.preview = message_preview(last.content) if last else None
+        session.add(conversation)
+        session.commit()
@@ -0,0 +1,244 @@
+"""Local fast path for simple task commands that do not need the model"""
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+# Serve matching messages without calling the model
+INTENT_FAST_PATH = True
+
+# Minimum confidence for a match to be handled locally
+INTENT_MIN_CONFIDENCE = 0.9
+
+# Confidence contributed by a pattern match and by the keyword check finding
+# nothing in the message that points elsewhere
+_PATTERN_CONFIDENCE = 0.6
+_CLASSIFIER_CONFIDENCE = 0.4
+
+_PLEASE = r"(?:(?:please|pls)\s+)?"
+_TASK_ID = r"#?(?P<task_id>\d{1,9})"
+_END = r"\s*[.!]*\s*(?:please|thanks|thank you)?[.!]*$"
+
+_TITLE = r"(?P<title>[^?\n]{1,255}?)"
+
+# Each intent is one tool call; patterns must match the whole message.
+# add/create/new are everyday verbs ("create a poem", "New York"), so adding
+# needs an explicit task noun or a "to my list"/"remind me" marker
+_PATTERNS: Dict[str, List[Pattern]] = {
+    "add_task": [
+        re.compile(
+            rf"^{_PLEASE}(?:(?:add|create)\s+(?:a\s+)?(?:new\s+)?|new\s+)(?:task|todo|to-do)\b\s*"
+            rf"(?:to\s+|called\s+|named\s+|:\s*)?{_TITLE}{_END}",
+            re.I,
+        ),
+        re.compile(rf"^{_PLEASE}(?:add|put)\s+{_TITLE}\s+(?:to|on)\s+my\s+(?:(?:task|todo|to-do)\s+)?list{_END}", re.I),
+        re.compile(rf"^{_PLEASE}remind me to\s+{_TITLE}{_END}", re.I),
+    ],
+    "list_tasks": [
+        re.compile(
+            rf"^{_PLEASE}(?:list|show|display|view|get|what are)(?:\s+me)?\s+(?:all\s+)?(?:of\s+)?(?:my\s+|the\s+)?"
+            r"(?:(?P<status>pending|open|incomplete|unfinished|remaining|completed|done|finished)\s+)?"
+            rf"(?:tasks|todos|to-dos|todo list)\s*\??{_END}",
+            re.I,
+        ),
+    ],
+    "complete_task": [
+        re.compile(rf"^{_PLEASE}(?:complete|finish|close|check off)\s+(?:task\s+)?{_TASK_ID}{_END}", re.I),
+        re.compile(rf"^{_PLEASE}mark\s+(?:task\s+)?{_TASK_ID}\s+(?:as\s+)?(?:done|complete|completed|finished){_END}", re.I),
+        re.compile(rf"^task\s+{_TASK_ID}\s+(?:is\s+)?(?:done|complete|completed|finished){_END}", re.I),
+    ],
+    "delete_task": [
+        re.compile(rf"^{_PLEASE}(?:delete|remove|drop)\s+task\s+{_TASK_ID}{_END}", re.I),
+    ],
+}
+
+# Keyword classifier: each word votes for the intents it suggests
+_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "add_task": ("add", "create", "new", "remind"),
+    "list_tasks": ("list", "show", "display", "view", "get", "what"),
+    "complete_task": ("complete", "finish", "close", "check", "mark", "done", "completed", "finished"),
+    "delete_task": ("delete", "remove", "drop"),
+}
+_KEYWORD_INTENTS: Dict[str, Tuple[str, ...]] = {}
+for _intent, _words in _KEYWORDS.items():
+    for _word in _words:
+        _KEYWORD_INTENTS[_word] = _KEYWORD_INTENTS.get(_word, ()) + (_intent,)
+
+# Words that make a message too nuanced for a template (negation, conditions, several actions)
+_HEDGES = frozenset({"not", "don't", "dont", "never", "if", "unless", "instead", "and", "then", "also", "but"})
+
+# "add a new task" names no task; let the model ask what to add
+_EMPTY_TITLES = frozenset({"", "task", "todo", "a task", "new task", "a new task", "something"})
+
+_WORD = re.compile(r"[a-z']+")
+
+_STATUS_ALIASES = {
+    "pending": "pending", "open": "pending", "incomplete": "pending",
+    "unfinished": "pending", "remaining": "pending",
+    "completed": "completed", "done": "completed", "finished": "completed",
+}
+
+
+@dataclass
+class Intent:
+    """A message recognised as a single tool call"""
+    tool: str
+    arguments: Dict[str, Any]
+    confidence: float
+
+
+def keyword_votes(message: str) -> Optional[Counter]:
+    """
+    Keyword vote over the message's words
+
+    Returns:
+        Votes per intent, or None if a hedge word makes the message unsafe
+        to template
+    """
+    votes: Counter = Counter()
+    for word in _WORD.findall(message.lower()):
+        if word in _HEDGES:
+            return None
+        votes.update(_KEYWORD_INTENTS.get(word, ()))
+    return votes
+
+
+def _nothing_points_elsewhere(tool: str, message: str, title: Optional[str]) -> bool:
+    # Second signal, independent of the verb the pattern matched: no hedge
+    # anywhere, and the user's own words (the title) name no other command
+    if keyword_votes(message) is None:
+        return False
+    return set(keyword_votes(title or "")) <= {tool}
+
+
+def match_intent(message: str) -> Optional[Intent]:
+    """
+    Recognise a simple command
+
+    Args:
+        message: User message
+
+    Returns:
+        The intent and its arguments, or None if the message should go to
+        the model
+    """
+    text = message.strip()
+    for tool, patterns in _PATTERNS.items():
+        for pattern in patterns:
+            found = pattern.match(text)
+            if found is None:
+                continue
+
+            arguments: Dict[str, Any] = {}
+            groups = found.groupdict()
+            if groups.get("title"):
+                arguments["title"] = groups["title"].strip().strip("\"'")
+                if arguments["title"].lower() in _EMPTY_TITLES:
+                    return None
+            if groups.get("task_id"):
+                arguments["task_id"] = int(groups["task_id"])
+            if tool == "list_tasks":
+                arguments["status"] = _STATUS_ALIASES.get((groups.get("status") or "").lower(), "all")
+
+            confidence = _PATTERN_CONFIDENCE
+            if _nothing_points_elsewhere(tool, text, arguments.get("title")):
+                confidence += _CLASSIFIER_CONFIDENCE
+            return Intent(tool, arguments, round(confidence, 2))
+    return None
+
+
+def render_response(intent: Intent, result: Any) -> str:
+    """Templated reply for a fast-path tool result"""
+    if isinstance(result, dict) and "error" in result:
+        return f"I couldn't do that: {result['error']}"
+
+    if intent.tool == "add_task":
+        return f"Added \"{result['title']}\" to your tasks (task #{result['task_id']})."
+    if intent.tool == "complete_task":
+        return f"Marked \"{result['title']}\" (task #{result['task_id']}) as complete."
+    if intent.tool == "delete_task":
+        return f"Deleted \"{result['title']}\" (task #{result['task_id']})."
+
+    status = intent.arguments.get("status", "all")
+    label = "" if status == "all" else f"{status} "
+    if not result["tasks"]:
+        return f"You have no {label}tasks."
+    lines = [f"- [{'x' if task['completed'] else ' '}] #{task['id']} {task['title']}" for task in result["tasks"]]
+    if result.get("next_cursor"):
+        lines.append("- …and more")
+    return f"Your {label}tasks:\n" + "\n".join(lines)
+
+
+@dataclass
+class IntentMetrics:
+    """Counters for the fast path (hit rate, tool errors, latency)"""
+    messages: int = 0
+    hits: Counter = field(default_factory=Counter)
+    low_confidence: int = 0
+    errors: Counter = field(default_factory=Counter)
+    seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_miss(self, intent: Optional[Intent]) -> None:
+        with self._lock:
+            self.messages += 1
+            if intent is not None:
+                self.low_confidence += 1
+
+    def record_hit(self, intent: Intent, result: Any, seconds: float) -> None:
+        with self._lock:
+            self.messages += 1
+            self.hits[intent.tool] += 1
+            self.seconds += seconds
+            if isinstance(result, dict) and "error" in result:
+                self.errors[intent.tool] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(self.hits.values())
+            errors = sum(self.errors.values())
+            return {
+                "messages": self.messages,
+                "hits": hits,
+                "hit_rate": hits / self.messages if self.messages else 0.0,
+                "hits_by_intent": dict(self.hits),
+                "low_confidence": self.low_confidence,
+                "tool_error_rate": errors / hits if hits else 0.0,
+                "avg_ms": 1000 * self.seconds / hits if hits else 0.0,
+            }
+
+
+intent_metrics = IntentMetrics()
+
+
+def evaluate(samples: Iterable[Tuple[str, Optional[str]]], min_confidence: float = INTENT_MIN_CONFIDENCE) -> Dict[str, float]:
+    """
+    Measure the matcher against labelled messages
+
+    Args:
+        samples: (message, expected tool or None for "send to the model")
+        min_confidence: Threshold used by the fast path
+
+    Returns:
+        precision (handled messages that picked the right tool), coverage
+        (share of command messages handled) and the raw counts
+    """
+    handled = correct = commands = 0
+    for message, expected in samples:
+        if expected is not None:
+            commands += 1
+        intent = match_intent(message)
+        if intent is None or intent.confidence < min_confidence:
+            continue
+        handled += 1
+        if intent.tool == expected:
+            correct += 1
+
+    return {
+        "precision": correct / handled if handled else 1.0,
+        "coverage": correct / commands if commands else 0.0,
+        "handled": handled,
+        "correct": correct,
+        "commands": commands,
+    }
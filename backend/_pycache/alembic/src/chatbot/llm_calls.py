@@ -0,0 +1,233 @@
+"""Concurrency limit, retries and deadlines for chat completion calls"""
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Union
+import openai
+from openai import AsyncOpenAI
+from .providers import ChatProvider, as_provider
+from .timing import current_timings
+
+logger = logging.getLogger(__name__)
+
+# Completion requests (including open streams) in flight per worker
+LLM_MAX_CONCURRENCY = 32
+
+# Longest a call waits for a free slot before the turn is refused as busy
+LLM_SLOT_WAIT_SECONDS = 10.0
+
+# Attempts per completion call, including the first
+LLM_MAX_ATTEMPTS = 3
+
+# Full-jitter exponential backoff: sleep uniform(0, min(MAX, BASE * 2**retry))
+LLM_BACKOFF_BASE_SECONDS = 0.5
+LLM_BACKOFF_MAX_SECONDS = 8.0
+
+# Total time one chat turn may spend on model calls, retries included
+LLM_TURN_DEADLINE_SECONDS = 60.0
+
+
+class LLMBusyError(Exception):
+    """No completion slot became free in time"""
+
+
+class LLMDeadlineExceeded(Exception):
+    """The turn ran out of time before the model answered"""
+
+
+class Deadline:
+    """Time budget shared by every model call of one turn"""
+
+    def __init__(self, seconds: float = LLM_TURN_DEADLINE_SECONDS):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+
+class LLMLimiter:
+    """
+    Caps concurrent completion calls in this worker
+
+    The semaphore is bound to the running event loop and recreated if the
+    loop changes (e.g. between test cases).
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight = 0
+        self.rejected = 0
+        self.retries = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.in_flight = 0
+        return self._semaphore
+
+    @asynccontextmanager
+    async def slot(self, wait: float = LLM_SLOT_WAIT_SECONDS) -> AsyncIterator[None]:
+        """
+        Hold one completion slot
+
+        Raises:
+            LLMBusyError: If no slot frees up within wait seconds
+        """
+        semaphore = self._get_semaphore()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), wait)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise LLMBusyError("Too many chat requests in progress, please try again shortly") from None
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring"""
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "rejected": self.rejected,
+            "retries": self.retries,
+        }
+
+
+llm_limiter = LLMLimiter()
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, 5xx responses, timeouts and connection failures are worth retrying"""
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(retry: int, retry_after: Optional[float] = None) -> float:
+    """
+    Seconds to wait before a retry
+
+    Args:
+        retry: 1 for the first retry, 2 for the second, ...
+        retry_after: Server-requested delay, used as a lower bound
+
+    Returns:
+        Jittered exponential backoff delay
+    """
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** retry))
+    return max(delay, retry_after) if retry_after is not None else delay
+
+
+async def _with_retries(deadline: Deadline, limiter: LLMLimiter, call) -> Any:
+    attempt = 0
+    while True:
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise LLMDeadlineExceeded("The assistant took too long to respond")
+        attempt += 1
+        try:
+            return await call(remaining)
+        except Exception as e:
+            if attempt >= LLM_MAX_ATTEMPTS or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt, _retry_after(e))
+            if delay >= deadline.remaining():
+                raise
+            limiter.retries += 1
+            timings = current_timings()
+            if timings is not None:
+                timings.retries += 1
+            logger.warning("Completion attempt %d failed (%s); retrying in %.2fs", attempt, e, delay)
+            await asyncio.sleep(delay)
+
+
+async def create_completion(
+    client: Union[ChatProvider, AsyncOpenAI],
+    deadline: Optional[Deadline] = None,
+    limiter: Optional[LLMLimiter] = None,
+    **kwargs: Any,
+) -> Any:
+    """
+    Run a non-streaming chat completion under the limiter, with retries
+
+    Args:
+        client: Chat provider or bare OpenAI client
+        deadline: Turn deadline (a fresh LLM_TURN_DEADLINE_SECONDS one if omitted)
+        limiter: Concurrency limiter (the worker-wide one if omitted)
+        **kwargs: Arguments for chat.completions.create
+
+    Raises:
+        LLMBusyError: If no slot frees up in time
+        LLMDeadlineExceeded: If the deadline passes before an answer
+        openai.OpenAIError: If the last attempt fails
+    """
+    provider = as_provider(client)
+    deadline = deadline or Deadline()
+    limiter = limiter or llm_limiter
+
+    async def call(remaining: float) -> Any:
+        async with limiter.slot(min(remaining, LLM_SLOT_WAIT_SECONDS)):
+            return await provider.complete(timeout=remaining, **kwargs)
+
+    response = await _with_retries(deadline, limiter, call)
+    timings = current_timings()
+    if timings is not None:
+        timings.add_usage(getattr(response, "usage", None))
+    return response
+
+
+@asynccontextmanager
+async def completion_stream(
+    client: Union[ChatProvider, AsyncOpenAI],
+    deadline: Optional[Deadline] = None,
+    limiter: Optional[LLMLimiter] = None,
+    **kwargs: Any,
+) -> AsyncIterator[Any]:
+    """
+    Open a streaming chat completion under the limiter, with retries
+
+    The slot is held until the block exits, so open streams count towards
+    the limit. Only opening the stream is retried; once chunks have been
+    handed out a failure is raised to the caller. The stream is closed when
+    the block exits, also when the caller stops reading early.
+    """
+    provider = as_provider(client)
+    deadline = deadline or Deadline()
+    limiter = limiter or llm_limiter
+
+    async with limiter.slot(min(deadline.remaining(), LLM_SLOT_WAIT_SECONDS)):
+        stream = await _with_retries(
+            deadline,
+            limiter,
+            lambda remaining: provider.open_stream(timeout=remaining, **kwargs),
+        )
+        try:
+            yield stream
+        finally:
+            await _close_stream(stream)
+
+
+async def _close_stream(stream: Any) -> None:
+    # OpenAI's AsyncStream has close(), plain async generators aclose()
+    close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+    if close is not None:
+        await close()
@@ -0,0 +1,263 @@
+"""Persistence of chat turns, optionally through a write-behind queue"""
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case, or_, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from .conversation_models import Conversation, Message
+from ..database import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+# "sync": a turn's messages are committed before the response is returned.
+# "write_behind": they are queued and committed in batches shortly after;
+# a crash can lose up to WRITE_BEHIND_FLUSH_SECONDS of turns.
+CHAT_DURABILITY = "sync"
+
+DURABILITY_MODES = ("sync", "write_behind")
+
+# Turns committed together by the write-behind worker
+WRITE_BEHIND_BATCH_SIZE = 200
+
+# Longest a queued turn waits for its batch to fill
+WRITE_BEHIND_FLUSH_SECONDS = 0.05
+
+# Queued turns allowed before callers fall back to writing synchronously
+WRITE_BEHIND_MAX_PENDING = 10000
+
+# Attempts per batch before its turns are dropped (and logged)
+WRITE_BEHIND_ATTEMPTS = 3
+
+# Length of the last-message preview stored on each conversation
+CONVERSATION_PREVIEW_CHARS = 120
+
+
+@dataclass
+class PendingTurn:
+    """Messages of one chat turn plus the conversation timestamp bump"""
+    conversation_id: int
+    user_id: str
+    messages: List[Tuple[str, str, datetime]]  # (role, content, created_at)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+    def to_messages(self) -> List[Message]:
+        return [
+            Message(
+                user_id=self.user_id,
+                conversation_id=self.conversation_id,
+                role=role,
+                content=content,
+                created_at=created_at,
+            )
+            for role, content, created_at in self.messages
+        ]
+
+
+def write_turns(session: Session, turns: List[PendingTurn]) -> None:
+    """
+    Insert the messages of several turns and update their conversations
+    (updated_at, message_count, last_message_at, preview) in one transaction
+
+    Args:
+        session: Database session
+        turns: Turns to write
+    """
+    counts: Counter = Counter()
+    latest: Dict[int, datetime] = {}
+    last_message: Dict[int, Tuple[datetime, str]] = {}
+    for turn in turns:
+        session.add_all(turn.to_messages())
+        cid = turn.conversation_id
+        counts[cid] += len(turn.messages)
+        latest[cid] = max(turn.updated_at, latest.get(cid, turn.updated_at))
+        for _, content, created_at in turn.messages:
+            if cid not in last_message or created_at >= last_message[cid][0]:
+                last_message[cid] = (created_at, content)
+
+    for conversation_id, updated_at in latest.items():
+        values = {
+            "message_count": Conversation.message_count + counts[conversation_id],
+            "updated_at": case(
+                (Conversation.updated_at < updated_at, updated_at),
+                else_=Conversation.updated_at,
+            ),
+        }
+        if conversation_id in last_message:
+            # Turns may commit out of order; only a newer message moves these
+            created_at, content = last_message[conversation_id]
+            newer = or_(Conversation.last_message_at.is_(None), Conversation.last_message_at < created_at)
+            values["last_message_at"] = case((newer, created_at), else_=Conversation.last_message_at)
+            values["preview"] = case((newer, message_preview(content)), else_=Conversation.preview)
+        session.execute(update(Conversation).where(Conversation.id == conversation_id).values(**values))
+    session.commit()
+
+
+def message_preview(content: str) -> str:
+    """First CONVERSATION_PREVIEW_CHARS characters of a message, on one line"""
+    text = " ".join(content.split())
+    if len(text) <= CONVERSATION_PREVIEW_CHARS:
+        return text
+    return text[:CONVERSATION_PREVIEW_CHARS - 1].rstrip() + "…"
+
+
+class MessageWriter:
+    """
+    Write-behind queue for chat turns
+
+    Turns are queued from the request path and committed by a background
+    task in batches of up to WRITE_BEHIND_BATCH_SIZE, across conversations.
+    Call close() on shutdown to flush everything still queued.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = WRITE_BEHIND_FLUSH_SECONDS,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+    ):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Counter = Counter()
+        self.written = 0
+        self.dropped = 0
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._task = loop.create_task(self._run())
+        return self._queue
+
+    def enqueue(self, turn: PendingTurn) -> bool:
+        """
+        Queue a turn for writing
+
+        Args:
+            turn: Turn to write
+
+        Returns:
+            False if the queue is full (or there is no running event loop)
+            and the caller must write the turn itself
+        """
+        try:
+            self._ensure_started().put_nowait(turn)
+        except (RuntimeError, asyncio.QueueFull):
+            return False
+        self._pending[turn.conversation_id] += 1
+        return True
+
+    def has_pending(self, conversation_id: int) -> bool:
+        """Whether a turn of this conversation is queued but not yet committed"""
+        return self._pending[conversation_id] > 0
+
+    async def flush(self) -> None:
+        """Wait until every turn queued so far is committed (or dropped)"""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush the queue and stop the background task; call on shutdown"""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._queue = None
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for monitoring"""
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._write_batch(batch)
+            finally:
+                for turn in batch:
+                    self._pending[turn.conversation_id] -= 1
+                    if self._pending[turn.conversation_id] <= 0:
+                        del self._pending[turn.conversation_id]
+                    queue.task_done()
+
+    async def _write_batch(self, batch: List[PendingTurn]) -> None:
+        def write() -> None:
+            with Session(self.engine if self.engine is not None else default_engine) as session:
+                write_turns(session, batch)
+
+        for attempt in range(1, WRITE_BEHIND_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(write)
+                self.written += len(batch)
+                return
+            except Exception:
+                logger.exception("Writing %d chat turns failed (attempt %d)", len(batch), attempt)
+                await asyncio.sleep(0.1 * 2 ** attempt)
+
+        self.dropped += len(batch)
+        logger.error("Dropped %d chat turns after %d attempts", len(batch), WRITE_BEHIND_ATTEMPTS)
+
+
+message_writer = MessageWriter()
+
+
+def set_durability_mode(mode: str) -> None:
+    """
+    Switch between "sync" and "write_behind" turn persistence
+
+    Raises:
+        ValueError: If mode is not one of DURABILITY_MODES
+    """
+    global CHAT_DURABILITY
+    if mode not in DURABILITY_MODES:
+        raise ValueError(f"Unknown durability mode {mode!r}; expected one of {DURABILITY_MODES}")
+    CHAT_DURABILITY = mode
+
+
+def record_turn(session: Session, turn: PendingTurn) -> None:
+    """
+    Persist a finished chat turn according to CHAT_DURABILITY
+
+    In write-behind mode the turn is queued; if the queue cannot take it the
+    turn is written synchronously instead.
+
+    Args:
+        session: Request session, used for synchronous writes
+        turn: The turn's messages and conversation
+    """
+    if CHAT_DURABILITY == "write_behind" and message_writer.enqueue(turn):
+        return
+    write_turns(session, [turn])
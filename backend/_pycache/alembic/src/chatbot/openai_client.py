@@ -0,0 +1,67 @@
+"""App-scoped async OpenAI client"""
+from typing import Optional
+import httpx
+from openai import AsyncOpenAI
+from ..config import settings
+
+
+# Chat model used by the agent
+OPENAI_MODEL = "gpt-4-turbo-preview"
+
+# Seconds allowed for a whole completion request / for opening a connection
+OPENAI_TIMEOUT_SECONDS = 60.0
+OPENAI_CONNECT_TIMEOUT_SECONDS = 5.0
+
+# SDK-level retries; off because llm_calls retries with jitter within the
+# turn deadline, and stacking both would multiply attempts
+OPENAI_MAX_RETRIES = 0
+
+# Connection pool shared by all chat requests in this worker
+OPENAI_MAX_CONNECTIONS = 100
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 20
+OPENAI_KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def create_openai_client() -> AsyncOpenAI:
+    """Build an AsyncOpenAI client with a tuned keep-alive connection pool"""
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS),
+    )
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        max_retries=OPENAI_MAX_RETRIES,
+        timeout=httpx.Timeout(OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS),
+        http_client=http_client,
+    )
+
+
+def init_openai_client() -> AsyncOpenAI:
+    """Create the shared client; call from the application lifespan on startup"""
+    global _client
+    if _client is None:
+        _client = create_openai_client()
+    return _client
+
+
+async def close_openai_client() -> None:
+    """Close the shared client's connections; call from the lifespan on shutdown"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Dependency returning the shared client
+
+    Falls back to creating it on first use if the lifespan has not.
+    """
+    return _client if _client is not None else init_openai_client()
@@ -0,0 +1,60 @@
+"""Chat completion providers used by the agent"""
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Optional, Union
+from openai import AsyncOpenAI
+from .openai_client import get_openai_client
+
+
+class ChatProvider(ABC):
+    """
+    Source of chat completions
+
+    Both methods take chat.completions.create arguments and return objects
+    shaped like the OpenAI SDK's ChatCompletion / ChatCompletionChunk, so
+    the agent code does not care which provider it talks to.
+    """
+
+    @abstractmethod
+    async def complete(self, **kwargs: Any) -> Any:
+        """Run a completion and return the full response"""
+
+    @abstractmethod
+    async def open_stream(self, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Start a streamed completion
+
+        Errors that happen before the first chunk (rate limits, 5xx) are
+        raised here, so callers can retry the open.
+        """
+
+
+class OpenAIProvider(ChatProvider):
+    """Provider backed by an AsyncOpenAI client"""
+
+    def __init__(self, client: AsyncOpenAI):
+        self.client = client
+
+    async def complete(self, **kwargs: Any) -> Any:
+        return await self.client.chat.completions.create(**kwargs)
+
+    async def open_stream(self, **kwargs: Any) -> AsyncIterator[Any]:
+        return await self.client.chat.completions.create(stream=True, **kwargs)
+
+
+def as_provider(client: Union[ChatProvider, AsyncOpenAI]) -> ChatProvider:
+    """Wrap a bare OpenAI client; providers are returned unchanged"""
+    return client if isinstance(client, ChatProvider) else OpenAIProvider(client)
+
+
+_provider: Optional[ChatProvider] = None
+
+
+def set_chat_provider(provider: Optional[ChatProvider]) -> None:
+    """Serve chat from another provider (e.g. FakeProvider for load tests); None restores OpenAI"""
+    global _provider
+    _provider = provider
+
+
+def get_chat_provider() -> ChatProvider:
+    """Dependency returning the active provider (the shared OpenAI client by default)"""
+    return _provider if _provider is not None else OpenAIProvider(get_openai_client())
@@ -1,34 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
 from typing import Optional
-from ..database import get_session
-from ..chatbot.conversation_models import Conversation, Message, ConversationCreate, MessageCreate
+from ..database import engine, get_session
+from ..chatbot.conversation_models import (
+    Conversation,
+    ConversationCreate,
+    ConversationPage,
+    ConversationRead,
+    MessagePage,
+    MessageRead,
+)
+from ..chatbot.history import ConversationHistoryService, HISTORY_DEFAULT_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE
 from ..chatbot.ai_agent_service import AIAgentService
+from ..chatbot.message_writer import PendingTurn, message_writer, record_turn
+from ..chatbot.providers import ChatProvider, get_chat_provider
+from ..chatbot.turn_coalescer import turn_coalescer
+from ..chatbot import timing
+from ..chatbot.timing import chat_metrics, span, track_turn
+from ..chatbot.intents import intent_metrics
+from ..chatbot.llm_calls import llm_limiter
 from datetime import datetime
+import json
 import uuid
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
-@router.post("")
-async def chat(
-    request: Request,
-    conversation_id: Optional[int] = None,
-    message: str = "",
-    session: Session = Depends(get_session)
-):
-    # Extract authenticated user_id from request state and convert to string
-    user_id = str(request.state.user_id)
-    """
-    Chat endpoint that receives user messages and returns AI responses.
-    Maintains conversation state in the database.
-    """
-    if not message:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Message content is required"
-        )
 
-    # Get or create conversation
+def _get_or_create_conversation(session: Session, conversation_id: Optional[int], user_id: str) -> Conversation:
+    """Load the user's conversation, or start a new one if no ID is given"""
     if conversation_id:
         # Check if conversation exists and belongs to user
         conversation = session.exec(
@@ -50,49 +50,246 @@ async def chat(
         session.add(conversation)
         session.commit()
         session.refresh(conversation)
+
+    return conversation
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("")
+async def chat(
+    request: Request,
+    response: Response,
+    conversation_id: Optional[int] = None,
+    message: str = "",
+    session: Session = Depends(get_session),
+    chat_provider: ChatProvider = Depends(get_chat_provider),
+):
+    # Extract authenticated user_id from request state and convert to string
+    user_id = str(request.state.user_id)
+    """
+    Chat endpoint that receives user messages and returns AI responses.
+    Maintains conversation state in the database.
+    """
+    if not message:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Message content is required"
+        )
+
+    with track_turn() as timings:
+        with span("conversation"):
+            conversation = _get_or_create_conversation(session, conversation_id, user_id)
         conversation_id = conversation.id
+        agent_service = AIAgentService(chat_provider)
+        result = await _run_chat_turn(session, agent_service, conversation_id, user_id, message)
 
-    # Store user message in database
-    user_message = MessageCreate(
-        user_id=user_id,
-        conversation_id=conversation_id,
-        role="user",
-        content=message
+    if timing.CHAT_SERVER_TIMING:
+        response.headers["Server-Timing"] = timings.server_timing()
+
+    return {
+        "conversation_id": conversation_id,
+        "response": result["response"],
+        "tool_calls": result["tool_calls"]
+    }
+
+
+async def _run_chat_turn(
+    session: Session,
+    agent_service: AIAgentService,
+    conversation_id: int,
+    user_id: str,
+    message: str,
+) -> dict:
+    """Answer one message and persist the turn, one turn at a time per conversation"""
+    async def run_turn():
+        started_at = datetime.utcnow()
+
+        # The previous turn may still be in the write-behind queue
+        if message_writer.has_pending(conversation_id):
+            await message_writer.flush()
+
+        # Process with AI agent
+        result = await agent_service.process_conversation(
+            session=session,
+            conversation_id=conversation_id,
+            user_id=user_id,
+            user_message=message
+        )
+
+        # Store both messages and bump the conversation in one write
+        with span("persist"):
+            record_turn(session, PendingTurn(
+                conversation_id=conversation_id,
+                user_id=user_id,
+                messages=[("user", message, started_at), ("assistant", result["response"], datetime.utcnow())],
+            ))
+        return result
+
+    # One turn at a time per conversation; a double-submit shares the running turn
+    result, _ = await turn_coalescer.run(conversation_id, message, run_turn)
+    return result
+
+
+@router.post("/stream")
+async def chat_stream(
+    request: Request,
+    conversation_id: Optional[int] = None,
+    message: str = "",
+    session: Session = Depends(get_session),
+    chat_provider: ChatProvider = Depends(get_chat_provider),
+) -> StreamingResponse:
+    """
+    Streaming variant of the chat endpoint using Server-Sent Events
+
+    Emits a "conversation" event with the conversation ID, then "token",
+    "tool_call" and "tool_result" events as the reply is generated, and a
+    final "done" event once the assistant message has been saved.
+    """
+    user_id = str(request.state.user_id)
+    if not message:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Message content is required"
+        )
+
+    conversation = _get_or_create_conversation(session, conversation_id, user_id)
+    conversation_id = conversation.id
+
+    # A stream cannot be shared, so a double-submit is refused instead
+    if turn_coalescer.is_running(conversation_id, message):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This message is already being answered"
+        )
+
+    agent_service = AIAgentService(chat_provider)
+
+    async def event_stream():
+        yield _sse("conversation", {"conversation_id": conversation_id})
+
+        with track_turn():
+            async for chunk in _stream_turn():
+                yield chunk
+
+    async def _stream_turn():
+        async with turn_coalescer.exclusive(conversation_id, message):
+            started_at = datetime.utcnow()
+            if message_writer.has_pending(conversation_id):
+                await message_writer.flush()
+
+            # The request-scoped session is closed once the handler returns,
+            # so the stream uses its own session for history and the final write
+            with Session(engine) as stream_session:
+                turn = PendingTurn(conversation_id=conversation_id, user_id=user_id, messages=[("user", message, started_at)])
+                partial = []
+                try:
+                    async for event in agent_service.stream_conversation(
+                        session=stream_session,
+                        conversation_id=conversation_id,
+                        user_id=user_id,
+                        user_message=message
+                    ):
+                        name = event.pop("event")
+                        if name == "token":
+                            partial.append(event["content"])
+                        elif name == "done":
+                            turn.messages.append(("assistant", event["response"], datetime.utcnow()))
+                            turn.updated_at = datetime.utcnow()
+                            with span("persist"):
+                                record_turn(stream_session, turn)
+                            turn = None
+                            event["conversation_id"] = conversation_id
+                        yield _sse(name, event)
+                finally:
+                    # Client went away mid-reply: keep the question and what was sent
+                    if turn is not None:
+                        if partial:
+                            turn.messages.append(("assistant", "".join(partial), datetime.utcnow()))
+                        record_turn(stream_session, turn)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    db_user_message = Message.from_orm(user_message) if hasattr(Message, 'from_orm') else Message(**user_message.dict())
-    session.add(db_user_message)
-    session.commit()
-
-    # Process with AI agent
-    agent_service = AIAgentService()
-    result = await agent_service.process_conversation(
-        session=session,
-        conversation_id=conversation_id,
-        user_id=user_id,
-        user_message=message
+
+
+@router.get("/conversations")
+async def list_conversations(
+    request: Request,
+    limit: int = Query(HISTORY_DEFAULT_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_session),
+) -> ConversationPage:
+    """
+    List the user's conversations, newest first
+
+    Args:
+        request: HTTP request (contains user_id in state)
+        limit: Page size
+        cursor: next_cursor from the previous page
+        session: Database session
+
+    Returns:
+        ConversationPage with message counts, last activity and previews
+    """
+    user_id = str(request.state.user_id)
+    conversations, next_cursor = ConversationHistoryService.list_conversations(
+        session, user_id, limit=limit, cursor=cursor
     )
+    return ConversationPage(
+        conversations=[ConversationRead.model_validate(c, from_attributes=True) for c in conversations],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/conversations/{conversation_id}/messages")
+async def list_messages(
+    request: Request,
+    conversation_id: int,
+    limit: int = Query(HISTORY_DEFAULT_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_session),
+) -> MessagePage:
+    """
+    Page backwards through a conversation's messages, newest first
 
-    ai_response = result["response"]
-    tool_calls = result["tool_calls"]
+    Args:
+        request: HTTP request (contains user_id in state)
+        conversation_id: Conversation ID
+        limit: Page size
+        cursor: next_cursor from the previous page
+        session: Database session
 
-    # Store AI response in database
-    ai_message = MessageCreate(
-        user_id=user_id,
+    Returns:
+        MessagePage with the messages and the cursor of the next (older) page
+    """
+    user_id = str(request.state.user_id)
+    # Queued write-behind turns would otherwise be missing from the page
+    if message_writer.has_pending(conversation_id):
+        await message_writer.flush()
+    messages, next_cursor = ConversationHistoryService.list_messages(
+        session, conversation_id, user_id, limit=limit, cursor=cursor
+    )
+    return MessagePage(
         conversation_id=conversation_id,
-        role="assistant",
-        content=ai_response
+        messages=[MessageRead.model_validate(m, from_attributes=True) for m in messages],
+        next_cursor=next_cursor,
     )
-    db_ai_message = Message.from_orm(ai_message) if hasattr(Message, 'from_orm') else Message(**ai_message.dict())
-    session.add(db_ai_message)
-    session.commit()
 
-    # Update conversation timestamp
-    conversation.updated_at = datetime.utcnow()
-    session.add(conversation)
-    session.commit()
 
+@router.get("/metrics")
+async def chat_metrics_snapshot():
+    """
+    Latency, token and retry histograms for chat turns in this worker,
+    plus model-call and intent fast-path counters
+    """
     return {
-        "conversation_id": conversation_id,
-        "response": ai_response,
-        "tool_calls": tool_calls
-    }
\ No newline at end of file
+        "turns": chat_metrics.snapshot(),
+        "llm": llm_limiter.stats(),
+        "intents": intent_metrics.stats(),
+    }
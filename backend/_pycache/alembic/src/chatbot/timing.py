@@ -0,0 +1,163 @@
+"""Per-phase latency, token and retry metrics for chat turns"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+# Attach a Server-Timing header with the phase breakdown to /chat responses
+CHAT_SERVER_TIMING = False
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+RETRY_BUCKETS = (0, 1, 2, 3, 5)
+
+
+class Histogram:
+    """Fixed-bucket histogram with approximate percentiles"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile (inf if beyond the last)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            buckets = {f"le_{bound}": n for bound, n in zip(self.buckets, self.counts)}
+            buckets["le_inf"] = self.counts[-1]
+            count, total = self.count, self.sum
+        return {
+            "count": count,
+            "mean": total / count if count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": buckets,
+        }
+
+
+class TurnTimings:
+    """Measurements for one chat turn"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.ttft_ms: Optional[float] = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.retries = 0
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time a phase; repeated phases of the same name add up"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] = self.spans.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+    def first_token(self) -> None:
+        """Record time-to-first-token (only the first call counts)"""
+        if self.ttft_ms is None:
+            self.ttft_ms = (time.perf_counter() - self.started) * 1000
+
+    def add_usage(self, usage: Any) -> None:
+        """Add token counts from a completion's usage block"""
+        if usage is not None:
+            self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+            self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. ``context;dur=3.1, llm;dur=812.4, total;dur=830.0``"""
+        entries = [f"{name};dur={ms:.1f}" for name, ms in self.spans.items()]
+        if self.ttft_ms is not None:
+            entries.append(f"ttft;dur={self.ttft_ms:.1f}")
+        entries.append(f"total;dur={self.total_ms():.1f}")
+        return ", ".join(entries)
+
+
+class ChatMetrics:
+    """Histograms aggregated over all turns in this worker"""
+
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, buckets: Sequence[float] = LATENCY_BUCKETS_MS) -> Histogram:
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(buckets)
+            return self._histograms[name]
+
+    def observe(self, timings: TurnTimings) -> None:
+        for name, ms in timings.spans.items():
+            self.histogram(f"{name}_ms").observe(ms)
+        if timings.ttft_ms is not None:
+            self.histogram("ttft_ms").observe(timings.ttft_ms)
+        self.histogram("total_ms").observe(timings.total_ms())
+        self.histogram("prompt_tokens", TOKEN_BUCKETS).observe(timings.prompt_tokens)
+        self.histogram("completion_tokens", TOKEN_BUCKETS).observe(timings.completion_tokens)
+        self.histogram("retries", RETRY_BUCKETS).observe(timings.retries)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histogram.snapshot() for name, histogram in sorted(histograms.items())}
+
+
+chat_metrics = ChatMetrics()
+
+_current: ContextVar[Optional[TurnTimings]] = ContextVar("chat_turn_timings", default=None)
+
+
+def current_timings() -> Optional[TurnTimings]:
+    """Timings of the turn being handled, if one is being tracked"""
+    return _current.get()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a phase of the current turn (no-op outside track_turn)"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    with timings.span(name):
+        yield
+
+
+@contextmanager
+def track_turn(metrics: Optional[ChatMetrics] = None) -> Iterator[TurnTimings]:
+    """Collect timings for the code inside the block and record them when it ends"""
+    timings = TurnTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+        (metrics or chat_metrics).observe(timings)
@@ -0,0 +1,69 @@
+"""In-process execution of the chatbot's task tools"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from .tool_registry import TOOL_REGISTRY, ToolArgs, ToolArgumentsError, ToolRegistry
+from ..database import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+
+class ToolExecutor:
+    """
+    Runs tool calls for one user directly against TaskService
+
+    Calls are always scoped to the authenticated user; a ``user_id`` the model
+    puts in the arguments is ignored. Each call gets its own session in a
+    worker thread, so the calls from one model response run concurrently.
+    """
+
+    def __init__(self, user_id: str, engine: Optional[Engine] = None, registry: ToolRegistry = TOOL_REGISTRY):
+        self.user_id = user_id
+        self.engine = engine if engine is not None else default_engine
+        self.registry = registry
+
+    def _run_sync(self, name: str, args: ToolArgs) -> Any:
+        with Session(self.engine) as session:
+            return self.registry.call(session, name, args)
+
+    async def run(self, name: str, args: Dict[str, Any]) -> Any:
+        """
+        Execute one tool call
+
+        Args:
+            name: Tool name
+            args: Parsed tool arguments
+
+        Returns:
+            The tool result, or {"error": ...} if it was invalid, failed or
+            timed out
+        """
+        try:
+            validated = self.registry.validate(name, args, user_id=self.user_id)
+        except ToolArgumentsError as e:
+            return {"error": str(e)}
+
+        timeout = self.registry.get(name).timeout
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(self._run_sync, name, validated), timeout)
+        except asyncio.TimeoutError:
+            # The worker thread cannot be interrupted; its result is discarded
+            logger.warning("Tool %s timed out after %ss", name, timeout)
+            return {"error": f"{name} timed out"}
+        except Exception as e:
+            logger.exception("Tool %s failed", name)
+            return {"error": str(e)}
+
+    async def run_all(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Execute the tool calls of one model response concurrently
+
+        Args:
+            calls: (name, arguments) pairs
+
+        Returns:
+            Results in the same order as calls
+        """
+        return list(await asyncio.gather(*(self.run(name, args) for name, args in calls)))
@@ -0,0 +1,569 @@
+"""Single definition of the task tools shared by the chat agent and the MCP server"""
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Type, Union
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from sqlalchemy import and_, delete, insert, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import Session, select
+from ..tasks.changes import record_change
+from ..tasks.models import Task
+from .pagination import decode_cursor, encode_cursor
+from ..tasks.service import TaskService
+
+# Seconds a single tool call may take before it is reported as timed out
+TOOL_TIMEOUT_SECONDS = 10.0
+
+
+class ToolArgs(BaseModel):
+    """Arguments common to every tool"""
+    model_config = ConfigDict(extra="ignore")
+
+    user_id: str = Field(description="User identifier")
+
+
+class AddTaskArgs(ToolArgs):
+    title: str = Field(min_length=1, max_length=255, description="Task title")
+    description: Optional[str] = Field(default=None, max_length=5000, description="Task description (optional)")
+
+
+# Page size of list_tasks when the caller gives no limit, and the largest it may ask for
+LIST_TASKS_DEFAULT_LIMIT = 50
+LIST_TASKS_MAX_LIMIT = 200
+
+# Estimated tokens one list_tasks result may take; longer pages are cut short
+# with a next_cursor so a large list never floods the model's context
+LIST_TASKS_MAX_TOKENS = 2000
+
+TaskField = Literal["id", "title", "description", "completed", "due_date", "created_at", "updated_at"]
+
+# Fields returned when the caller doesn't pick any
+LIST_TASKS_DEFAULT_FIELDS = ("id", "title", "description", "completed")
+
+
+class ListTasksArgs(ToolArgs):
+    status: Literal["all", "pending", "completed"] = Field(
+        default="all", description="Filter by status: all, pending, completed (optional)"
+    )
+    due_before: Optional[date] = Field(default=None, description="Only tasks due on or before this date, YYYY-MM-DD (optional)")
+    due_after: Optional[date] = Field(default=None, description="Only tasks due on or after this date, YYYY-MM-DD (optional)")
+    fields: Optional[List[TaskField]] = Field(
+        default=None, description="Fields to return; id is always included (optional, default id, title, description, completed)"
+    )
+    limit: int = Field(
+        default=LIST_TASKS_DEFAULT_LIMIT, ge=1, le=LIST_TASKS_MAX_LIMIT, description="Most tasks to return (optional)"
+    )
+    cursor: Optional[str] = Field(default=None, description="next_cursor of a previous call, to get the next page (optional)")
+
+
+class CompleteTaskArgs(ToolArgs):
+    task_id: int = Field(description="Task ID to complete")
+
+
+class DeleteTaskArgs(ToolArgs):
+    task_id: int = Field(description="Task ID to delete")
+
+
+class UpdateTaskArgs(ToolArgs):
+    task_id: int = Field(description="Task ID to update")
+    title: Optional[str] = Field(default=None, min_length=1, max_length=255, description="New task title (optional)")
+    description: Optional[str] = Field(default=None, max_length=5000, description="New task description (optional)")
+
+
+# Most operations one batch tool call may carry
+BATCH_MAX_OPERATIONS = 50
+
+
+class BatchOperation(BaseModel):
+    tool: Literal["add_task", "complete_task", "update_task", "delete_task"] = Field(description="Operation to run")
+    arguments: Dict[str, Any] = Field(
+        default_factory=dict, description="Arguments of that tool, without user_id (the batch's user_id applies)"
+    )
+
+
+class BatchArgs(ToolArgs):
+    operations: List[BatchOperation] = Field(
+        min_length=1, max_length=BATCH_MAX_OPERATIONS, description="Operations to run, in order"
+    )
+
+
+def _compact(prop: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    if "$ref" in prop:
+        prop = {**defs[prop["$ref"].rsplit("/", 1)[-1]], **{k: v for k, v in prop.items() if k != "$ref"}}
+    prop = {key: value for key, value in prop.items() if key not in ("title", "default")}
+    # Optional[X] is rendered as anyOf [X, null]; the tools only need X
+    if "anyOf" in prop:
+        variants = [variant for variant in prop.pop("anyOf") if variant.get("type") != "null"]
+        prop = {**_compact(variants[0], defs), **prop}
+    # Nested models (e.g. batch operations) are inlined rather than referenced
+    if "items" in prop:
+        prop["items"] = _compact(prop["items"], defs)
+    if "properties" in prop:
+        prop["properties"] = {name: _compact(value, defs) for name, value in prop["properties"].items()}
+    return prop
+
+
+def _parameters_schema(model: Type[BaseModel], exclude: tuple = ()) -> Dict[str, Any]:
+    """JSON schema for a tool's arguments, in the compact form tool APIs expect"""
+    schema = model.model_json_schema()
+    defs = schema.get("$defs", {})
+    properties = {
+        name: _compact(prop, defs)
+        for name, prop in schema["properties"].items()
+        if name not in exclude
+    }
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": [name for name in schema.get("required", []) if name not in exclude],
+    }
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """One tool: its schema, argument validator and implementation"""
+    name: str
+    description: str
+    args_model: Type[ToolArgs]
+    handler: Optional[Callable[[Session, Any], Any]]
+    timeout: float = TOOL_TIMEOUT_SECONDS
+    # Same operation on an AsyncSession, as single statements, for the MCP server
+    async_handler: Optional[Callable[[AsyncSession, Any], Awaitable[Any]]] = None
+    # Offered to the chat agent; MCP-only tools set this to False
+    agent: bool = True
+
+
+class ToolArgumentsError(ValueError):
+    """Tool arguments failed validation"""
+
+
+class ToolRegistry:
+    """
+    Tool definitions keyed by name
+
+    The OpenAI and MCP schema lists are built once and cached; they are
+    rebuilt only when a tool is registered.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, ToolSpec] = {}
+        self._openai_tools: Optional[List[Dict[str, Any]]] = None
+        self._mcp_tools: Optional[List[Dict[str, Any]]] = None
+
+    def register(self, spec: ToolSpec) -> ToolSpec:
+        self._tools[spec.name] = spec
+        self._openai_tools = None
+        self._mcp_tools = None
+        return spec
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self._tools.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def openai_tools(self) -> List[Dict[str, Any]]:
+        """
+        Tool definitions for the chat completions API
+
+        user_id is left out: the agent always acts for the authenticated user.
+        """
+        if self._openai_tools is None:
+            self._openai_tools = [
+                {
+                    "type": "function",
+                    "function": {
+                        "name": spec.name,
+                        "description": spec.description,
+                        "parameters": _parameters_schema(spec.args_model, exclude=("user_id",)),
+                    },
+                }
+                for spec in self._tools.values()
+                if spec.agent
+            ]
+        return self._openai_tools
+
+    def mcp_tools(self) -> List[Dict[str, Any]]:
+        """Tool definitions for MCP tools/list (name, description, inputSchema)"""
+        if self._mcp_tools is None:
+            self._mcp_tools = [
+                {
+                    "name": spec.name,
+                    "description": spec.description,
+                    "inputSchema": _parameters_schema(spec.args_model),
+                }
+                for spec in self._tools.values()
+            ]
+        return self._mcp_tools
+
+    def validate(self, name: str, arguments: Union[str, Dict[str, Any], None], **overrides: Any) -> ToolArgs:
+        """
+        Validate tool arguments
+
+        Args:
+            name: Tool name
+            arguments: JSON string or dict of arguments
+            overrides: Values that replace whatever the caller supplied
+                (e.g. the authenticated user_id)
+
+        Returns:
+            Validated arguments model
+
+        Raises:
+            ToolArgumentsError: If the tool is unknown or the arguments are invalid
+        """
+        spec = self._tools.get(name)
+        if spec is None:
+            raise ToolArgumentsError(f"Unknown function: {name}")
+        try:
+            if isinstance(arguments, str):
+                if not overrides:
+                    return spec.args_model.model_validate_json(arguments or "{}")
+                arguments = json.loads(arguments or "{}")
+            if not isinstance(arguments, dict):
+                raise ToolArgumentsError(f"Arguments for {name} must be an object")
+            return spec.args_model.model_validate({**arguments, **overrides})
+        except ValidationError as e:
+            raise ToolArgumentsError(_describe(name, e)) from None
+        except json.JSONDecodeError:
+            raise ToolArgumentsError(f"Arguments for {name} are not valid JSON") from None
+
+    def call(self, session: Session, name: str, args: ToolArgs) -> Any:
+        """
+        Run a tool with validated arguments
+
+        Task errors (not found, not owned) are returned as {"error": ...}
+        so they can be shown to the model instead of failing the turn.
+
+        Raises:
+            ToolArgumentsError: If the tool only runs on an async session
+        """
+        spec = self._tools[name]
+        if spec.handler is None:
+            raise ToolArgumentsError(f"{name} is only available through the MCP server")
+        try:
+            return spec.handler(session, args)
+        except HTTPException as e:
+            detail = e.detail.get("detail") if isinstance(e.detail, dict) else e.detail
+            return {"error": detail}
+
+    async def acall(self, session: AsyncSession, name: str, args: ToolArgs) -> Any:
+        """
+        Run a tool's async handler with validated arguments
+
+        The caller owns the transaction. Errors a task operation reports
+        (e.g. not found) come back as {"error": ...}, as with call().
+
+        Raises:
+            ToolArgumentsError: If the tool has no async handler
+        """
+        spec = self._tools[name]
+        if spec.async_handler is None:
+            raise ToolArgumentsError(f"{name} cannot run on an async session")
+        try:
+            return await spec.async_handler(session, args)
+        except HTTPException as e:
+            detail = e.detail.get("detail") if isinstance(e.detail, dict) else e.detail
+            return {"error": detail}
+
+
+def _describe(name: str, error: ValidationError) -> str:
+    problems = "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'arguments'}: {item['msg']}"
+        for item in error.errors()
+    )
+    return f"Invalid arguments for {name}: {problems}"
+
+
+def _task_result(task: Task, status: str) -> Dict[str, Any]:
+    return {"task_id": task.id, "status": status, "title": task.title}
+
+
+def _add_task(session: Session, args: AddTaskArgs) -> Dict[str, Any]:
+    task = TaskService.create_task(session, args.user_id, args.title, args.description)
+    return _task_result(task, "created")
+
+
+def _list_fields(args: ListTasksArgs) -> List[str]:
+    if not args.fields:
+        return list(LIST_TASKS_DEFAULT_FIELDS)
+    return ["id"] + [field for field in dict.fromkeys(args.fields) if field != "id"]
+
+
+def _list_tasks_query(args: ListTasksArgs):
+    """
+    One page of the user's tasks, newest first, with filters and projection in SQL
+
+    Selects only the requested columns plus the (created_at, id) keyset, and
+    one row past the limit so the caller can tell whether more remain.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    columns = [getattr(Task, field) for field in dict.fromkeys(_list_fields(args) + ["created_at"])]
+    query = select(*columns).where(Task.user_id == args.user_id)
+    if args.status == "pending":
+        query = query.where(Task.completed == False)
+    elif args.status == "completed":
+        query = query.where(Task.completed == True)
+    if args.due_before is not None:
+        query = query.where(Task.due_date <= args.due_before)
+    if args.due_after is not None:
+        query = query.where(Task.due_date >= args.due_after)
+    if args.cursor:
+        created_at, task_id = decode_cursor(args.cursor)
+        query = query.where(or_(
+            Task.created_at < created_at,
+            and_(Task.created_at == created_at, Task.id < task_id),
+        ))
+    return query.order_by(Task.created_at.desc(), Task.id.desc()).limit(args.limit + 1)
+
+
+def _task_page(rows: List[Any], args: ListTasksArgs) -> Dict[str, Any]:
+    """
+    Shape query rows into {"tasks": [...]}, within LIST_TASKS_MAX_TOKENS
+
+    When rows are left over, either past the limit or past the token budget,
+    adds next_cursor and a truncated note telling the model how to continue.
+    """
+    fields = _list_fields(args)
+    more = len(rows) > args.limit
+    tasks, tokens, last = [], 0, None
+    for row in rows[:args.limit]:
+        task = {field: getattr(row, field) for field in fields}
+        for field in ("due_date", "created_at", "updated_at"):
+            if task.get(field) is not None:
+                task[field] = task[field].isoformat()
+        cost = (len(json.dumps(task)) + 3) // 4
+        # Always return at least one task, however long
+        if tasks and tokens + cost > LIST_TASKS_MAX_TOKENS:
+            more = True
+            break
+        tasks.append(task)
+        tokens += cost
+        last = row
+
+    page: Dict[str, Any] = {"tasks": tasks}
+    if more:
+        page["next_cursor"] = encode_cursor(last.created_at, last.id)
+        page["truncated"] = (
+            f"Showing {len(tasks)} tasks; more match. Call list_tasks again with the same filters and "
+            f"cursor set to next_cursor for the next page, or narrow the result with status, "
+            f"due_before, due_after or fields."
+        )
+    return page
+
+
+def _list_tasks(session: Session, args: ListTasksArgs) -> Dict[str, Any]:
+    return _task_page(session.exec(_list_tasks_query(args)).all(), args)
+
+
+def _complete_task(session: Session, args: CompleteTaskArgs) -> Dict[str, Any]:
+    task = TaskService.update_task(session, args.task_id, args.user_id, completed=True)
+    return _task_result(task, "completed")
+
+
+def _delete_task(session: Session, args: DeleteTaskArgs) -> Dict[str, Any]:
+    task = TaskService.get_task(session, args.task_id, args.user_id)
+    result = _task_result(task, "deleted")
+    TaskService.delete_task(session, task.id, args.user_id)
+    return result
+
+
+def _update_task(session: Session, args: UpdateTaskArgs) -> Dict[str, Any]:
+    task = TaskService.update_task(
+        session, args.task_id, args.user_id, title=args.title, description=args.description
+    )
+    return _task_result(task, "updated")
+
+
+# Async variants: one statement each (RETURNING instead of read-modify-write).
+# Ownership is part of the WHERE clause, so another user's task reads as
+# not found. These statements bypass the ORM's Task events, so each records
+# its changes for the change bus itself.
+
+_TASK_NOT_FOUND = {"error": "Task not found"}
+
+
+def _returned(row, status: str) -> Dict[str, Any]:
+    return {"task_id": row.id, "status": status, "title": row.title} if row is not None else _TASK_NOT_FOUND
+
+
+async def _add_task_async(session: AsyncSession, args: AddTaskArgs) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    result = await session.execute(
+        insert(Task)
+        .values(
+            user_id=args.user_id,
+            title=args.title,
+            description=args.description,
+            completed=False,
+            created_at=now,
+            updated_at=now,
+        )
+        .returning(Task.id, Task.title)
+    )
+    row = result.one()
+    record_change(session, args.user_id, row.id, "created")
+    return _returned(row, "created")
+
+
+async def _list_tasks_async(session: AsyncSession, args: ListTasksArgs) -> Dict[str, Any]:
+    rows = await session.execute(_list_tasks_query(args))
+    return _task_page(rows.all(), args)
+
+
+async def _update_owned(session: AsyncSession, args: ToolArgs, status: str, **values: Any) -> Dict[str, Any]:
+    result = await session.execute(
+        update(Task)
+        .where(Task.id == args.task_id, Task.user_id == args.user_id)
+        .values(updated_at=datetime.utcnow(), **values)
+        .returning(Task.id, Task.title)
+    )
+    row = result.first()
+    if row is not None:
+        record_change(session, args.user_id, row.id, "updated")
+    return _returned(row, status)
+
+
+async def _complete_task_async(session: AsyncSession, args: CompleteTaskArgs) -> Dict[str, Any]:
+    return await _update_owned(session, args, "completed", completed=True)
+
+
+async def _update_task_async(session: AsyncSession, args: UpdateTaskArgs) -> Dict[str, Any]:
+    values = {key: value for key, value in (("title", args.title), ("description", args.description)) if value is not None}
+    return await _update_owned(session, args, "updated", **values)
+
+
+async def _delete_task_async(session: AsyncSession, args: DeleteTaskArgs) -> Dict[str, Any]:
+    result = await session.execute(
+        delete(Task)
+        .where(Task.id == args.task_id, Task.user_id == args.user_id)
+        .returning(Task.id, Task.title)
+    )
+    row = result.first()
+    if row is not None:
+        record_change(session, args.user_id, row.id, "deleted")
+    return _returned(row, "deleted")
+
+
+# Batch: consecutive operations of the same kind run together (one
+# executemany INSERT, UPDATE/DELETE ... WHERE id IN). update_task values
+# differ per task, so each of those stays its own UPDATE.
+
+async def _bulk_add(session: AsyncSession, user_id: str, ops: List[AddTaskArgs]) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    # executemany with RETURNING in parameter order, so row i belongs to
+    # operation i. Databases don't promise id or RETURNING order for a
+    # multi-row VALUES; SQLAlchemy batches this where it can keep the order
+    # (PostgreSQL) and inserts row by row where it can't (SQLite).
+    rows = await session.execute(
+        insert(Task).returning(Task.id, Task.title, sort_by_parameter_order=True),
+        [
+            {
+                "user_id": user_id,
+                "title": op.title,
+                "description": op.description,
+                "completed": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for op in ops
+        ],
+    )
+    rows = rows.all()
+    for row in rows:
+        record_change(session, user_id, row.id, "created")
+    return [_returned(row, "created") for row in rows]
+
+
+async def _bulk_complete(session: AsyncSession, user_id: str, ops: List[CompleteTaskArgs]) -> List[Dict[str, Any]]:
+    rows = await session.execute(
+        update(Task)
+        .where(Task.user_id == user_id, Task.id.in_({op.task_id for op in ops}))
+        .values(completed=True, updated_at=datetime.utcnow())
+        .returning(Task.id, Task.title)
+    )
+    found = {row.id: row for row in rows}
+    for task_id in found:
+        record_change(session, user_id, task_id, "updated")
+    return [_returned(found.get(op.task_id), "completed") for op in ops]
+
+
+async def _bulk_delete(session: AsyncSession, user_id: str, ops: List[DeleteTaskArgs]) -> List[Dict[str, Any]]:
+    rows = await session.execute(
+        delete(Task)
+        .where(Task.user_id == user_id, Task.id.in_({op.task_id for op in ops}))
+        .returning(Task.id, Task.title)
+    )
+    found = {row.id: row for row in rows}
+    for task_id in found:
+        record_change(session, user_id, task_id, "deleted")
+    # Deleting the same task twice: only the first operation finds it
+    return [_returned(found.pop(op.task_id, None), "deleted") for op in ops]
+
+
+async def _bulk_update(session: AsyncSession, user_id: str, ops: List[UpdateTaskArgs]) -> List[Dict[str, Any]]:
+    return [await _update_task_async(session, op) for op in ops]
+
+
+_BULK_RUNNERS = {
+    "add_task": _bulk_add,
+    "complete_task": _bulk_complete,
+    "delete_task": _bulk_delete,
+    "update_task": _bulk_update,
+}
+
+
+async def _batch_async(session: AsyncSession, args: BatchArgs) -> Dict[str, Any]:
+    results: List[Optional[Dict[str, Any]]] = [None] * len(args.operations)
+    runs: List[tuple] = []  # (tool, [(index, validated args)])
+    for index, op in enumerate(args.operations):
+        try:
+            validated = TOOL_REGISTRY.validate(op.tool, op.arguments, user_id=args.user_id)
+        except ToolArgumentsError as e:
+            results[index] = {"error": str(e)}
+            continue
+        if runs and runs[-1][0] == op.tool:
+            runs[-1][1].append((index, validated))
+        else:
+            runs.append((op.tool, [(index, validated)]))
+
+    for tool, ops in runs:
+        outcomes = await _BULK_RUNNERS[tool](session, args.user_id, [validated for _, validated in ops])
+        for (index, _), outcome in zip(ops, outcomes):
+            results[index] = outcome
+
+    failed = sum(1 for result in results if "error" in result)
+    return {
+        "results": [{"tool": op.tool, **result} for op, result in zip(args.operations, results)],
+        "succeeded": len(results) - failed,
+        "failed": failed,
+    }
+
+
+TOOL_REGISTRY = ToolRegistry()
+TOOL_REGISTRY.register(ToolSpec("add_task", "Create a new task", AddTaskArgs, _add_task, async_handler=_add_task_async))
+TOOL_REGISTRY.register(ToolSpec(
+    "list_tasks", "Retrieve tasks from the list", ListTasksArgs, _list_tasks, timeout=5.0, async_handler=_list_tasks_async
+))
+TOOL_REGISTRY.register(ToolSpec(
+    "complete_task", "Mark a task as complete", CompleteTaskArgs, _complete_task, async_handler=_complete_task_async
+))
+TOOL_REGISTRY.register(ToolSpec(
+    "delete_task", "Remove a task from the list", DeleteTaskArgs, _delete_task, async_handler=_delete_task_async
+))
+TOOL_REGISTRY.register(ToolSpec(
+    "update_task", "Modify task title or description", UpdateTaskArgs, _update_task, async_handler=_update_task_async
+))
+TOOL_REGISTRY.register(ToolSpec(
+    "batch",
+    "Run several add_task, complete_task, update_task and delete_task operations in order, in one "
+    "transaction, and return a result for each. Prefer this over separate calls when changing several tasks.",
+    BatchArgs,
+    None,
+    async_handler=_batch_async,
+    agent=False,
+))
@@ -0,0 +1,94 @@
+"""Per-conversation serialisation and de-duplication of chat turns"""
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class TurnCoalescer:
+    """
+    Runs one turn at a time per conversation
+
+    A submission identical to the turn currently running for the same
+    conversation (a double-submit from the UI) does not start a second turn;
+    it waits for and shares the running turn's result. Different messages
+    for the same conversation queue behind each other, so every turn sees
+    the history written by the one before it.
+
+    State is per worker process.
+    """
+
+    def __init__(self):
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._users: Counter = Counter()
+        self._running: Dict[int, Tuple[str, asyncio.Future]] = {}
+        self.coalesced = 0
+
+    def is_running(self, conversation_id: int, message: str) -> bool:
+        """Whether this exact message is being answered for the conversation"""
+        running = self._running.get(conversation_id)
+        return running is not None and running[0] == message
+
+    @asynccontextmanager
+    async def exclusive(self, conversation_id: int, message: str) -> AsyncIterator[asyncio.Future]:
+        """
+        Hold the conversation's turn lock
+
+        Yields:
+            A future the holder may resolve with its result, which is what
+            coalesced duplicates of this message receive
+        """
+        lock = self._locks.setdefault(conversation_id, asyncio.Lock())
+        self._users[conversation_id] += 1
+        try:
+            async with lock:
+                future = asyncio.get_running_loop().create_future()
+                # Nobody may be waiting; don't warn about unretrieved errors
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                self._running[conversation_id] = (message, future)
+                try:
+                    yield future
+                except BaseException as e:
+                    if not future.done():
+                        if isinstance(e, Exception):
+                            future.set_exception(e)
+                        else:
+                            future.cancel()
+                    raise
+                finally:
+                    if not future.done():
+                        future.cancel()
+                    del self._running[conversation_id]
+        finally:
+            self._users[conversation_id] -= 1
+            if self._users[conversation_id] <= 0:
+                del self._users[conversation_id]
+                del self._locks[conversation_id]
+
+    async def run(self, conversation_id: int, message: str, turn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Run a turn, or join an identical one already running
+
+        Args:
+            conversation_id: Conversation ID
+            message: User message
+            turn: Coroutine function performing the turn
+
+        Returns:
+            (result, coalesced) where coalesced is True if the result came
+            from a turn started by another request
+        """
+        running = self._running.get(conversation_id)
+        if running is not None and running[0] == message:
+            self.coalesced += 1
+            return await asyncio.shield(running[1]), True
+
+        async with self.exclusive(conversation_id, message) as future:
+            result = await turn()
+            future.set_result(result)
+            return result, False
+
+
+turn_coalescer = TurnCoalescer()
@@ -0,0 +1,39 @@
+"""
+Run the todo MCP server
+
+Usage:
+    python -m src.mcp_server [--transport stdio|http] [--host localhost] [--port 3000]
+        [--path /mcp] [--stateless] [--json-response] [--database-url URL]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from typing import List, Optional
+from .db import create_mcp_engine
+from .server import TRANSPORTS, TodoMCPServer
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="todo-mcp", description="Todo MCP server")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="stdio")
+    parser.add_argument("--host", default="localhost", help="HTTP bind address")
+    parser.add_argument("--port", type=int, default=3000, help="HTTP port")
+    parser.add_argument("--path", default="/mcp", help="HTTP endpoint path")
+    parser.add_argument("--stateless", action="store_true", help="HTTP: no per-client session state")
+    parser.add_argument("--json-response", action="store_true", help="HTTP: plain JSON responses instead of SSE")
+    parser.add_argument("--database-url", help="Overrides DATABASE_URL")
+    args = parser.parse_args(argv)
+
+    # stdout carries the protocol on stdio, so logs go to stderr
+    logging.basicConfig(stream=sys.stderr, level=logging.WARNING)
+
+    server = TodoMCPServer(create_mcp_engine(args.database_url))
+    options = {}
+    if args.transport == "http":
+        options = {"path": args.path, "stateless": args.stateless, "json_response": args.json_response}
+    asyncio.run(server.serve(host=args.host, port=args.port, transport=args.transport, **options))
+
+
+if __name__ == "__main__":
+    main()
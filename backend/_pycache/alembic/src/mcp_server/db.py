@@ -0,0 +1,78 @@
+"""Async database engine and per-call transactions for the MCP server"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from ..config import settings
+
+# Connections kept open by the MCP server's own pool, separate from the API's
+MCP_POOL_SIZE = 10
+
+# Extra connections allowed under bursts, closed again when returned
+MCP_MAX_OVERFLOW = 10
+
+# Seconds a tool call waits for a pooled connection before failing
+MCP_POOL_TIMEOUT_SECONDS = 5.0
+
+# Async driver for each sync URL scheme
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "postgres": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Rewrite a database URL to use an async driver
+
+    psycopg 3 speaks asyncio; SQLite (the default DATABASE_URL) needs
+    aiosqlite.
+
+    Raises:
+        ValueError: If there is no async driver for the URL's scheme
+    """
+    scheme, sep, rest = url.partition("://")
+    if scheme in _ASYNC_DRIVERS.values():
+        return url
+    if scheme not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for database URL scheme {scheme!r}")
+    return f"{_ASYNC_DRIVERS[scheme]}{sep}{rest}"
+
+
+def create_mcp_engine(
+    url: Optional[str] = None,
+    pool_size: int = MCP_POOL_SIZE,
+    max_overflow: int = MCP_MAX_OVERFLOW,
+) -> AsyncEngine:
+    """
+    Create the MCP server's async engine with its own sized pool
+
+    Args:
+        url: Database URL (settings.DATABASE_URL if omitted)
+        pool_size: Connections kept open
+        max_overflow: Extra connections allowed under load
+
+    Returns:
+        Async engine; dispose() it on shutdown
+    """
+    url = async_database_url(url or settings.DATABASE_URL)
+    options = {"pool_pre_ping": True}
+    # In-memory SQLite lives in a single connection, so it cannot be pooled
+    if not url.startswith("sqlite") or (":memory:" not in url and not url.endswith("://")):
+        options.update(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=MCP_POOL_TIMEOUT_SECONDS)
+    return create_async_engine(url, **options)
+
+
+@asynccontextmanager
+async def transaction(engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
+    """
+    Session for one tool call, inside a single transaction
+
+    Commits when the block exits normally and rolls back if it raises.
+    Objects stay readable after the commit (expire_on_commit is off).
+    """
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        async with session.begin():
+            yield session
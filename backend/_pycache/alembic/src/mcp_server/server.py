@@ -1,260 +1,241 @@
 import asyncio
-from typing import Dict, Any, List
-from mcp import server
-from mcp.server import MCPServer
-from mcp.protocol import (
-    InitializeRequest,
-    ToolsListResult,
-    Tool,
-    CallToolRequest,
-    SendConfigurationRequest,
-    GetPromptRequest,
-    Prompt,
-    SendTelemetryRequest,
-)
-from sqlmodel import Session, select
-from ..database import get_session
-from ..tasks.models import Task, TaskCreate, TaskUpdate
-from ..chatbot.conversation_models import Conversation, Message
-from datetime import datetime
+import contextlib
+import json
+import logging
+import weakref
+from collections import defaultdict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+from urllib.parse import quote, unquote
+from mcp import types
+from mcp.server.lowlevel import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.server.session import ServerSession
+from mcp.server.stdio import stdio_server
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from ..chatbot.tool_registry import TOOL_REGISTRY, ToolArgumentsError
+from ..tasks.changes import TaskChange, task_changes
+from .db import create_mcp_engine, transaction
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ("stdio", "http")
+
+# A user's task list as a subscribable resource; reading it returns the
+# first list_tasks page
+TASKS_URI_TEMPLATE = "todo://tasks/{user_id}"
+_TASKS_URI_PREFIX = TASKS_URI_TEMPLATE.split("{")[0]
+
+
+def tasks_uri(user_id: str) -> str:
+    """Resource URI of a user's task list"""
+    return _TASKS_URI_PREFIX + quote(user_id, safe="")
+
+
+def _tasks_user_id(uri: str) -> str:
+    """
+    User ID of a task list URI
+
+    Raises:
+        ValueError: If uri is not a task list URI
+    """
+    if not uri.startswith(_TASKS_URI_PREFIX) or len(uri) == len(_TASKS_URI_PREFIX):
+        raise ValueError(f"Unknown resource {uri}")
+    return unquote(uri[len(_TASKS_URI_PREFIX):])
+
+
+class ToolError(Exception):
+    """A tool reported an error; sent to the client as an isError result"""
+
+
+class _Server(Server):
+    # The low-level server always reports resources.subscribe as false
+    def get_capabilities(self, *args: Any) -> types.ServerCapabilities:
+        capabilities = super().get_capabilities(*args)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
 
 
 class TodoMCPServer:
-    def __init__(self):
-        self.server = MCPServer()
+    def __init__(self, engine: Optional[AsyncEngine] = None):
+        self.server = _Server("todo-mcp", version="1.0.0")
+        # Own async engine and pool, separate from the API's sync engine
+        self.engine = engine or create_mcp_engine()
+        # Built once from the shared registry; tools/list returns this list
+        self._tools = [
+            types.Tool(name=tool["name"], description=tool["description"], inputSchema=tool["inputSchema"])
+            for tool in TOOL_REGISTRY.mcp_tools()
+        ]
+        # Client sessions subscribed to each task list URI
+        self._subscriptions: Dict[str, "weakref.WeakSet[ServerSession]"] = defaultdict(weakref.WeakSet)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._unwatch: Optional[Callable[[], None]] = None
+        self._sends: Set[asyncio.Task] = set()
         self._setup_routes()
-    
+
     def _setup_routes(self):
-        @self.server.on_initialize
-        async def initialize(request: InitializeRequest) -> Dict[str, Any]:
-            return {
-                "server_info": {
-                    "name": "Todo AI Chatbot MCP Server",
-                    "version": "1.0.0"
-                },
-                "capabilities": {
-                    "tools": {},
-                    "prompts": {},
-                    "configuration": {}
-                }
-            }
-        
-        @self.server.list_tools
-        async def list_tools() -> ToolsListResult:
-            tools = [
-                Tool(
-                    name="add_task",
-                    description="Create a new task",
-                    input_schema={
-                        "type": "object",
-                        "properties": {
-                            "user_id": {"type": "string", "description": "User identifier"},
-                            "title": {"type": "string", "description": "Task title"},
-                            "description": {"type": "string", "description": "Task description (optional)"}
-                        },
-                        "required": ["user_id", "title"]
-                    }
-                ),
-                Tool(
-                    name="list_tasks",
-                    description="Retrieve tasks from the list",
-                    input_schema={
-                        "type": "object",
-                        "properties": {
-                            "user_id": {"type": "string", "description": "User identifier"},
-                            "status": {"type": "string", "description": "Filter by status: all, pending, completed (optional)"}
-                        },
-                        "required": ["user_id"]
-                    }
-                ),
-                Tool(
-                    name="complete_task",
-                    description="Mark a task as complete",
-                    input_schema={
-                        "type": "object",
-                        "properties": {
-                            "user_id": {"type": "string", "description": "User identifier"},
-                            "task_id": {"type": "integer", "description": "Task ID to complete"}
-                        },
-                        "required": ["user_id", "task_id"]
-                    }
-                ),
-                Tool(
-                    name="delete_task",
-                    description="Remove a task from the list",
-                    input_schema={
-                        "type": "object",
-                        "properties": {
-                            "user_id": {"type": "string", "description": "User identifier"},
-                            "task_id": {"type": "integer", "description": "Task ID to delete"}
-                        },
-                        "required": ["user_id", "task_id"]
-                    }
-                ),
-                Tool(
-                    name="update_task",
-                    description="Modify task title or description",
-                    input_schema={
-                        "type": "object",
-                        "properties": {
-                            "user_id": {"type": "string", "description": "User identifier"},
-                            "task_id": {"type": "integer", "description": "Task ID to update"},
-                            "title": {"type": "string", "description": "New task title (optional)"},
-                            "description": {"type": "string", "description": "New task description (optional)"}
-                        },
-                        "required": ["user_id", "task_id"]
-                    }
-                )
-            ]
-            return ToolsListResult(tools=tools)
-        
-        @self.server.call_tool
-        async def call_tool(request: CallToolRequest) -> Any:
-            tool_name = request.name
-            arguments = request.arguments
-            
-            # Create a new session for each tool call
-            session_gen = get_session()
-            session = next(session_gen)
-            
-            try:
-                if tool_name == "add_task":
-                    return await self.add_task(session, arguments)
-                elif tool_name == "list_tasks":
-                    return await self.list_tasks(session, arguments)
-                elif tool_name == "complete_task":
-                    return await self.complete_task(session, arguments)
-                elif tool_name == "delete_task":
-                    return await self.delete_task(session, arguments)
-                elif tool_name == "update_task":
-                    return await self.update_task(session, arguments)
-                else:
-                    return {"error": f"Unknown tool: {tool_name}"}
-            finally:
-                session.close()
-    
-    async def add_task(self, session: Session, args: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            # Create Task object directly since TaskCreate doesn't include user_id
-            db_task = Task(
-                user_id=args["user_id"],
-                title=args["title"],
-                description=args.get("description"),
-                completed=False
+        @self.server.list_tools()
+        async def list_tools() -> List[types.Tool]:
+            return self._tools
+
+        # Arguments are validated by the registry's models, not the JSON schema
+        @self.server.call_tool(validate_input=False)
+        async def call_tool(name: str, arguments: dict) -> List[types.TextContent]:
+            result = await self.call(name, arguments)
+            if isinstance(result, dict) and set(result) == {"error"}:
+                raise ToolError(result["error"])
+            return [types.TextContent(type="text", text=json.dumps(result, default=str))]
+
+        @self.server.list_resources()
+        async def list_resources() -> List[types.Resource]:
+            return []
+
+        @self.server.list_resource_templates()
+        async def list_resource_templates() -> List[types.ResourceTemplate]:
+            return [types.ResourceTemplate(
+                name="tasks",
+                uriTemplate=TASKS_URI_TEMPLATE,
+                description="A user's tasks, newest first. Subscribe to be notified when any of them changes.",
+                mimeType="application/json",
+            )]
+
+        @self.server.read_resource()
+        async def read_resource(uri) -> List[ReadResourceContents]:
+            result = await self.call("list_tasks", {"user_id": _tasks_user_id(str(uri))})
+            if isinstance(result, dict) and set(result) == {"error"}:
+                raise ToolError(result["error"])
+            return [ReadResourceContents(content=json.dumps(result, default=str), mime_type="application/json")]
+
+        @self.server.subscribe_resource()
+        async def subscribe_resource(uri) -> None:
+            uri = str(uri)
+            _tasks_user_id(uri)
+            self._watch()
+            self._subscriptions[uri].add(self.server.request_context.session)
+
+        @self.server.unsubscribe_resource()
+        async def unsubscribe_resource(uri) -> None:
+            subscribers = self._subscriptions.get(str(uri))
+            if subscribers is not None:
+                subscribers.discard(self.server.request_context.session)
+
+    def _watch(self) -> None:
+        """Start listening to the task change bus (once, on the serving loop)"""
+        if self._unwatch is None:
+            self._loop = asyncio.get_running_loop()
+            self._unwatch = task_changes.subscribe(self._on_changes)
+
+    def _on_changes(self, changes: List[TaskChange]) -> None:
+        # Called on whichever thread committed (API worker or this loop)
+        self._loop.call_soon_threadsafe(self._notify, changes)
+
+    def _notify(self, changes: List[TaskChange]) -> None:
+        """Send one resources/updated per affected task list to its subscribers"""
+        by_user: Dict[str, List[TaskChange]] = defaultdict(list)
+        for change in changes:
+            by_user[change.user_id].append(change)
+        for user_id, user_changes in by_user.items():
+            uri = tasks_uri(user_id)
+            sessions = list(self._subscriptions.get(uri, ()))
+            if not sessions:
+                continue
+            # The changed IDs ride along in _meta so clients can update
+            # incrementally instead of re-reading the whole list
+            params = types.ResourceUpdatedNotificationParams(
+                uri=uri,
+                _meta={"changes": [{"task_id": c.task_id, "action": c.action} for c in user_changes]},
             )
-            session.add(db_task)
-            session.commit()
-            session.refresh(db_task)
-
-            return {
-                "task_id": db_task.id,
-                "status": "created",
-                "title": db_task.title
-            }
-        except Exception as e:
-            return {"error": str(e)}
-    
-    async def list_tasks(self, session: Session, args: Dict[str, Any]) -> List[Dict[str, Any]]:
-        try:
-            user_id = args["user_id"]
-            status = args.get("status", "all")  # Default to "all"
-            
-            query = select(Task).where(Task.user_id == user_id)
-            
-            if status == "pending":
-                query = query.where(Task.completed == False)
-            elif status == "completed":
-                query = query.where(Task.completed == True)
-            
-            tasks = session.exec(query).all()
-            
-            return [
-                {
-                    "id": task.id,
-                    "title": task.title,
-                    "description": task.description,
-                    "completed": task.completed
-                }
-                for task in tasks
-            ]
-        except Exception as e:
-            return [{"error": str(e)}]
-    
-    async def complete_task(self, session: Session, args: Dict[str, Any]) -> Dict[str, Any]:
+            notification = types.ServerNotification(types.ResourceUpdatedNotification(params=params))
+            for session in sessions:
+                task = asyncio.ensure_future(self._send(session, uri, notification))
+                self._sends.add(task)
+                task.add_done_callback(self._sends.discard)
+
+    async def _send(self, session: ServerSession, uri: str, notification: types.ServerNotification) -> None:
         try:
-            task_id = args["task_id"]
-            user_id = args["user_id"]
-            
-            task = session.exec(select(Task).where(Task.id == task_id, Task.user_id == user_id)).first()
-            
-            if not task:
-                return {"error": "Task not found"}
-            
-            task.completed = True
-            task.updated_at = datetime.utcnow()
-            session.add(task)
-            session.commit()
-            session.refresh(task)
-            
-            return {
-                "task_id": task.id,
-                "status": "completed",
-                "title": task.title
-            }
-        except Exception as e:
-            return {"error": str(e)}
-    
-    async def delete_task(self, session: Session, args: Dict[str, Any]) -> Dict[str, Any]:
+            await session.send_notification(notification)
+        except Exception:
+            # The client went away; drop its subscription
+            logger.debug("Dropping subscription to %s", uri, exc_info=True)
+            self._subscriptions[uri].discard(session)
+
+    async def call(self, name: str, arguments: Optional[dict]) -> Any:
+        """
+        Run one tool call, independent of the transport
+
+        Args:
+            name: Tool name
+            arguments: Tool arguments, including user_id
+
+        Returns:
+            The tool result, or {"error": ...}
+        """
         try:
-            task_id = args["task_id"]
-            user_id = args["user_id"]
-            
-            task = session.exec(select(Task).where(Task.id == task_id, Task.user_id == user_id)).first()
-            
-            if not task:
-                return {"error": "Task not found"}
-            
-            session.delete(task)
-            session.commit()
-            
-            return {
-                "task_id": task_id,
-                "status": "deleted",
-                "title": task.title
-            }
-        except Exception as e:
+            args = TOOL_REGISTRY.validate(name, arguments or {})
+        except ToolArgumentsError as e:
             return {"error": str(e)}
-    
-    async def update_task(self, session: Session, args: Dict[str, Any]) -> Dict[str, Any]:
+
+        # One pooled connection and one transaction per call
         try:
-            task_id = args["task_id"]
-            user_id = args["user_id"]
-            
-            task = session.exec(select(Task).where(Task.id == task_id, Task.user_id == user_id)).first()
-            
-            if not task:
-                return {"error": "Task not found"}
-            
-            # Update fields if provided
-            if "title" in args and args["title"] is not None:
-                task.title = args["title"]
-            if "description" in args and args["description"] is not None:
-                task.description = args["description"]
-            
-            task.updated_at = datetime.utcnow()
-            session.add(task)
-            session.commit()
-            session.refresh(task)
-            
-            return {
-                "task_id": task.id,
-                "status": "updated",
-                "title": task.title
-            }
+            async with transaction(self.engine) as session:
+                return await TOOL_REGISTRY.acall(session, name, args)
         except Exception as e:
             return {"error": str(e)}
-    
-    async def serve(self, host: str = "localhost", port: int = 3000):
-        await self.server.start(host=host, port=port)
 
+    async def serve_stdio(self) -> None:
+        """Serve one client over stdin/stdout (the client launches this process)"""
+        async with stdio_server() as (read_stream, write_stream):
+            await self.server.run(read_stream, write_stream, self.server.create_initialization_options())
+
+    def http_app(self, path: str = "/mcp", stateless: bool = False, json_response: bool = False) -> Starlette:
+        """
+        ASGI app serving the streamable-HTTP transport at path
+
+        Args:
+            path: Endpoint path
+            stateless: Don't keep a session per client (for load-balanced replicas)
+            json_response: Answer with plain JSON instead of an SSE stream
+        """
+        manager = StreamableHTTPSessionManager(app=self.server, stateless=stateless, json_response=json_response)
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            async with manager.run():
+                yield
+
+        return Starlette(routes=[Mount(path, app=manager.handle_request)], lifespan=lifespan)
+
+    async def serve_http(self, host: str = "localhost", port: int = 3000, **options: Any) -> None:
+        """Serve the streamable-HTTP transport with uvicorn; options go to http_app"""
+        import uvicorn
+
+        config = uvicorn.Config(self.http_app(**options), host=host, port=port, log_level="warning")
+        await uvicorn.Server(config).serve()
+
+    async def serve(self, host: str = "localhost", port: int = 3000, transport: str = "http", **options: Any):
+        """
+        Run until the transport closes, then close()
+
+        Raises:
+            ValueError: If transport is not one of TRANSPORTS
+        """
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown transport {transport!r}; expected one of {TRANSPORTS}")
+        try:
+            if transport == "stdio":
+                await self.serve_stdio()
+            else:
+                await self.serve_http(host, port, **options)
+        finally:
+            await self.close()
 
+    async def close(self) -> None:
+        """Stop listening for task changes and release the database pool"""
+        if self._unwatch is not None:
+            self._unwatch()
+            self._unwatch = None
+        self._subscriptions.clear()
+        await self.engine.dispose()
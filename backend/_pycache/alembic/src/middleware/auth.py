@@ -1,9 +1,11 @@
+from typing import Optional
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
-from src.auth.jwt import get_user_id_from_token
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.auth.token_cache import token_cache
 
 
-PUBLIC_ROUTES = [
+PUBLIC_ROUTES = frozenset({
     "/api/auth/login",
     "/api/auth/register",
     "/api/auth/refresh",
@@ -13,41 +15,91 @@ PUBLIC_ROUTES = [
     "/openapi.json",
     "/health",
     "/"
-]
+})
 
-async def verify_token_middleware(request: Request, call_next):
-    # ✅ Allow CORS preflight requests (OPTIONS)
-    if request.method == "OPTIONS":
-        return await call_next(request)
-    
-    # ✅ Allow public routes
-    if request.url.path in PUBLIC_ROUTES:
-        return await call_next(request)
 
-    auth_header = request.headers.get("Authorization")
+def _unauthorized(error: str, detail: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        content={"error": error, "detail": detail},
+    )
+
+
+def authenticate(auth_header: Optional[str]) -> tuple[Optional[int], Optional[JSONResponse]]:
+    """
+    Resolve the user ID for an Authorization header value
+
+    Args:
+        auth_header: Raw Authorization header, or None if absent
 
+    Returns:
+        Tuple of (user_id, None) on success or (None, 401 response) on failure
+    """
     if not auth_header:
-        return JSONResponse(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            content={"error": "unauthorized", "detail": "Authorization header missing"},
-        )
+        return None, _unauthorized("unauthorized", "Authorization header missing")
 
     try:
         scheme, token = auth_header.split()
         if scheme.lower() != "bearer":
             raise ValueError
     except ValueError:
-        return JSONResponse(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            content={"error": "invalid_token", "detail": "Invalid authorization format"},
-        )
+        return None, _unauthorized("invalid_token", "Invalid authorization format")
 
-    user_id = get_user_id_from_token(token)
+    # Verified tokens are cached until their expiry, so repeat calls skip decoding
+    user_id = token_cache.get_user_id(token)
     if not user_id:
-        return JSONResponse(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            content={"error": "invalid_token", "detail": "Token expired or invalid"},
-        )
+        return None, _unauthorized("invalid_token", "Token expired or invalid")
+
+    return user_id, None
+
+
+class AuthMiddleware:
+    """
+    Pure ASGI authentication middleware
+
+    Register with ``app.add_middleware(AuthMiddleware)``. Unlike a
+    ``BaseHTTPMiddleware`` dispatch function this does not wrap the request
+    in an extra task and response stream; it only inspects the scope and
+    either rejects the request or passes it straight through.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # ✅ Allow CORS preflight requests (OPTIONS) and public routes
+        if scope["method"] == "OPTIONS" or scope["path"] in PUBLIC_ROUTES:
+            await self.app(scope, receive, send)
+            return
+
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+                break
+
+        user_id, error_response = authenticate(auth_header)
+        if error_response is not None:
+            await error_response(scope, receive, send)
+            return
+
+        # request.state is backed by scope["state"]
+        scope.setdefault("state", {})["user_id"] = user_id
+        await self.app(scope, receive, send)
+
+
+async def verify_token_middleware(request: Request, call_next):
+    """Function-style equivalent of AuthMiddleware for BaseHTTPMiddleware"""
+    if request.method == "OPTIONS" or request.url.path in PUBLIC_ROUTES:
+        return await call_next(request)
+
+    user_id, error_response = authenticate(request.headers.get("Authorization"))
+    if error_response is not None:
+        return error_response
 
     request.state.user_id = user_id
     return await call_next(request)
@@ -0,0 +1,110 @@
+"""In-process bus of task changes, published once the writing transaction commits"""
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# session.info key holding the changes of the open transaction
+_PENDING = "task_changes"
+
+
+class TaskChange(NamedTuple):
+    """One task created, updated or deleted"""
+    user_id: str
+    task_id: Optional[int]
+    action: str
+
+
+Subscriber = Callable[[List[TaskChange]], None]
+
+
+class TaskChangeBus:
+    """
+    Fan-out of committed task changes to in-process subscribers
+
+    Subscribers are called synchronously, on the thread that committed, with
+    every change of one transaction at once. They must return quickly and
+    hand real work to their own thread or event loop. A subscriber that
+    raises is logged and does not affect the others or the writer.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Subscriber] = {}
+        self._next_token = 0
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """
+        Register a callback for committed changes
+
+        Returns:
+            Function that removes the subscription again
+        """
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = callback
+
+        def unsubscribe() -> None:
+            with self._lock:
+                self._subscribers.pop(token, None)
+
+        return unsubscribe
+
+    def publish(self, changes: List[TaskChange]) -> None:
+        if not changes:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for callback in subscribers:
+            try:
+                callback(changes)
+            except Exception:
+                logger.exception("Task change subscriber failed")
+
+
+task_changes = TaskChangeBus()
+
+
+def record_change(session, user_id: str, task_id: Optional[int], action: str) -> None:
+    """
+    Queue a change on the session's transaction
+
+    ORM writes to Task are recorded automatically; statements that bypass
+    the ORM unit of work (bulk insert/update/delete) must call this.
+
+    Args:
+        session: Sync or async session running the write
+        user_id: Owner of the task
+        task_id: Task ID
+        action: created, updated or deleted
+    """
+    session = getattr(session, "sync_session", session)
+    session.info.setdefault(_PENDING, []).append(TaskChange(user_id, task_id, action))
+
+
+def _recorder(action: str):
+    def record(mapper, connection, target: Task) -> None:
+        session = object_session(target)
+        if session is not None:
+            record_change(session, target.user_id, target.id, action)
+    return record
+
+
+event.listen(Task, "after_insert", _recorder("created"))
+event.listen(Task, "after_update", _recorder("updated"))
+event.listen(Task, "after_delete", _recorder("deleted"))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    task_changes.publish(session.info.pop(_PENDING, []))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING, None)
@@ -3,6 +3,7 @@ from sqlmodel import Session, select
 from datetime import datetime
 from typing import Optional
 from .models import Task
+from . import changes  # registers the Task write events that feed the change bus
 from ..exceptions import TaskNotFoundError, UnauthorizedAccessException
 
 
@@ -16,6 +17,7 @@ class TaskService:
         title: str,
         description: Optional[str] = None,
         due_date: Optional[str] = None,
+        commit: bool = True,
     ) -> Task:
         """
         Create a new task for user
@@ -26,6 +28,8 @@ class TaskService:
             title: Task title
             description: Optional task description
             due_date: Optional due date (ISO format)
+            commit: Commit immediately; if False the task is only flushed so
+                it joins the caller's transaction
 
         Returns:
             Created Task object
@@ -41,8 +45,11 @@ class TaskService:
         )
 
         session.add(task)
-        session.commit()
-        session.refresh(task)
+        if commit:
+            session.commit()
+            session.refresh(task)
+        else:
+            session.flush()
         return task
 
     @staticmethod
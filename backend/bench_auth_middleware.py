@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request overhead of the auth middleware on /api/tasks
+
+Compares the BaseHTTPMiddleware dispatch function (verify_token_middleware)
+against the pure ASGI AuthMiddleware. Requests are driven straight through
+the ASGI interface so no network or server overhead is included.
+
+Usage:
+    python bench_auth_middleware.py [requests]
+"""
+import asyncio
+import sys
+import time
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware
+from src.auth.jwt import create_access_token
+from src.middleware.auth import AuthMiddleware, verify_token_middleware
+
+
+def build_app(middleware: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/tasks")
+    async def list_tasks():
+        return {"tasks": [], "total": 0}
+
+    if middleware == "base_http":
+        app.add_middleware(BaseHTTPMiddleware, dispatch=verify_token_middleware)
+    elif middleware == "asgi":
+        app.add_middleware(AuthMiddleware)
+    return app
+
+
+async def run(app: FastAPI, token: str, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/tasks",
+        "raw_path": b"/api/tasks",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message["status"]
+
+    # Warm up routing and the token cache
+    for _ in range(100):
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return time.perf_counter() - start
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    token = create_access_token(1, "bench@example.com")
+
+    results = {}
+    for name in ("none", "base_http", "asgi"):
+        elapsed = asyncio.run(run(build_app(name), token, requests))
+        results[name] = elapsed / requests * 1e6
+        print(f"{name:>10}: {results[name]:8.1f} us/request  ({requests / elapsed:,.0f} req/s)")
+
+    print(f"\nMiddleware overhead (BaseHTTPMiddleware): {results['base_http'] - results['none']:.1f} us/request")
+    print(f"Middleware overhead (pure ASGI):          {results['asgi'] - results['none']:.1f} us/request")
+    print(f"Removed per request:                      {results['base_http'] - results['asgi']:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Load test the chat endpoints against a simulated model
+
+Replaces the OpenAI provider with FakeProvider, so runs need no API key
+and are repeatable: the same seed and flags give the same replies, tool
+calls and injected errors. Requests go straight through the ASGI app
+(middleware, routes, database and message writes included); only the
+model is simulated.
+
+Each simulated user holds one conversation and sends --turns messages one
+after another; --conversations users run concurrently. The server's phase
+breakdown is read from the Server-Timing header (non-streaming) and
+time-to-first-token is measured client-side (--stream).
+
+Usage:
+    python bench_chat_load.py [--conversations 50] [--turns 5]
+        [--latency lognormal:0.4,0.5] [--token-interval 0.02]
+        [--tool-rate 0.3] [--error-rate 0.05] [--stream] [--seed 0]
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+import httpx
+from src.auth.jwt import create_access_token
+from src.chatbot import timing
+from src.chatbot.fake_provider import FakeProvider, Latency
+from src.chatbot.providers import set_chat_provider
+
+MESSAGES = (
+    "add buy milk to my list",
+    "what tasks do I have?",
+    "show me what is still pending",
+    "remind me to call the dentist tomorrow",
+    "could you tidy up my list a little?",
+    "what should I focus on this afternoon?",
+)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    phases = {}
+    for entry in filter(None, (part.strip() for part in header.split(","))):
+        name, _, duration = entry.partition(";dur=")
+        if duration:
+            phases[name] = float(duration)
+    return phases
+
+
+class Results:
+    def __init__(self):
+        self.phases: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[int, int] = defaultdict(int)
+        self.turns = 0
+
+    def add(self, status: int, phases: Dict[str, float]) -> None:
+        self.statuses[status] += 1
+        if status == 200:
+            self.turns += 1
+            for name, ms in phases.items():
+                self.phases[name].append(ms)
+
+
+async def send_turn(client: httpx.AsyncClient, app, headers: dict, conversation_id: Optional[int], message: str, stream: bool):
+    params = {"message": message}
+    if conversation_id:
+        params["conversation_id"] = conversation_id
+
+    started = time.perf_counter()
+    if not stream:
+        response = await client.post("/chat", params=params, headers=headers)
+        phases = parse_server_timing(response.headers.get("server-timing", ""))
+        phases.setdefault("client_total", (time.perf_counter() - started) * 1000)
+        body = response.json() if response.status_code == 200 else {}
+        return response.status_code, body.get("conversation_id", conversation_id), phases
+
+    return await stream_turn(app, headers, params, started)
+
+
+async def stream_turn(app, headers: dict, params: dict, started: float):
+    """
+    POST /chat/stream through the raw ASGI interface
+
+    httpx's ASGITransport buffers the whole body before returning, which
+    would hide time-to-first-token, so chunks are timestamped as the app
+    sends them.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/chat/stream",
+        "raw_path": b"/chat/stream",
+        "query_string": urlencode(params).encode(),
+        "root_path": "",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    finished = asyncio.Event()
+    phases: Dict[str, float] = {}
+    state = {"status": 0, "conversation_id": params.get("conversation_id"), "buffer": ""}
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+            return
+        state["buffer"] += message.get("body", b"").decode()
+        while "\n\n" in state["buffer"]:
+            raw, state["buffer"] = state["buffer"].split("\n\n", 1)
+            lines = dict(line.split(": ", 1) for line in raw.splitlines() if ": " in line)
+            event = lines.get("event")
+            if event == "conversation":
+                state["conversation_id"] = json.loads(lines["data"])["conversation_id"]
+            elif event in ("token", "tool_call") and "client_ttft" not in phases:
+                phases["client_ttft"] = (time.perf_counter() - started) * 1000
+        if not message.get("more_body", False):
+            finished.set()
+
+    await app(scope, receive, send)
+    finished.set()
+    phases["client_total"] = (time.perf_counter() - started) * 1000
+    return state["status"], state["conversation_id"], phases
+
+
+async def user_session(client: httpx.AsyncClient, app, user_id: int, turns: int, stream: bool, results: Results) -> None:
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, f'load{user_id}@example.com')}"}
+    conversation_id = None
+    for turn in range(turns):
+        message = MESSAGES[(user_id + turn) % len(MESSAGES)]
+        status, conversation_id, phases = await send_turn(client, app, headers, conversation_id, message, stream)
+        results.add(status, phases)
+
+
+async def main(args: argparse.Namespace) -> None:
+    module, _, attribute = args.app.partition(":")
+    app = getattr(importlib.import_module(module), attribute)
+
+    provider = FakeProvider(
+        latency=Latency.parse(args.latency),
+        token_interval=Latency.parse(args.token_interval),
+        reply_tokens=args.reply_tokens,
+        tool_call_rate=args.tool_rate,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    set_chat_provider(provider)
+    timing.CHAT_SERVER_TIMING = True
+
+    results = Results()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            user_session(client, app, args.first_user_id + i, args.turns, args.stream, results)
+            for i in range(args.conversations)
+        ))
+        elapsed = time.perf_counter() - started
+    set_chat_provider(None)
+
+    mode = "stream" if args.stream else "chat"
+    print(f"{mode}: {args.conversations} conversations x {args.turns} turns, latency {provider.latency}, "
+          f"tool rate {args.tool_rate}, error rate {args.error_rate}")
+    print(f"  {results.turns} turns ok in {elapsed:.2f}s ({results.turns / elapsed:.1f} turns/s)")
+    print(f"  statuses {dict(results.statuses)}, model calls {provider.calls}, injected errors {provider.errors}")
+    print(f"  {'phase':<14}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name in sorted(results.phases):
+        values = results.phases[name]
+        print(f"  {name:<14}{len(values):>6}" + "".join(
+            f"{percentile(values, q):>10.1f}" for q in (0.5, 0.95, 0.99)
+        ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--app", default="src.main:app", help="ASGI app to load, module:attribute")
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--latency", default="lognormal:0.4,0.5", help="Model latency, e.g. 0.2 or uniform:0.1,0.5")
+    parser.add_argument("--token-interval", default="0.02", help="Delay between streamed tokens")
+    parser.add_argument("--reply-tokens", type=int, default=30)
+    parser.add_argument("--tool-rate", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stream", action="store_true", help="Use /chat/stream and measure TTFT")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--first-user-id", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+MCP tool call throughput: per-call sync sessions vs the pooled async engine
+
+"sync" reproduces the previous TodoMCPServer.call_tool: a new session per
+call from a sync engine, with the synchronous TaskService handlers running
+inside the async handler (each commit and refresh a separate round trip,
+blocking the event loop). "async" is the current path: a pooled async
+engine and one transaction per call with single-statement handlers.
+
+Each of --clients concurrent clients loops over a mix of add, list,
+complete and update calls for its own user.
+
+Usage:
+    python bench_mcp_tools.py [--url sqlite:///bench_mcp.db] [--calls 2000] [--clients 1,8,32]
+"""
+import argparse
+import asyncio
+import os
+import time
+from sqlmodel import SQLModel, Session, create_engine
+from src.chatbot.tool_registry import TOOL_REGISTRY
+from src.mcp_server.db import create_mcp_engine, transaction
+
+MIX = ("add_task", "list_tasks", "complete_task", "update_task")
+
+
+def arguments(name: str, user_id: str, task_id: int) -> dict:
+    if name == "add_task":
+        return {"user_id": user_id, "title": "Benchmark task", "description": "created by bench_mcp_tools"}
+    if name == "list_tasks":
+        return {"user_id": user_id, "status": "pending"}
+    if name == "update_task":
+        return {"user_id": user_id, "task_id": task_id, "title": "Renamed task"}
+    return {"user_id": user_id, "task_id": task_id}
+
+
+async def client(call, user_id: str, calls: int) -> None:
+    task_id = 0
+    for i in range(calls):
+        name = MIX[i % len(MIX)]
+        result = await call(name, TOOL_REGISTRY.validate(name, arguments(name, user_id, task_id)))
+        if name == "add_task":
+            task_id = result["task_id"]
+
+
+async def run(call, clients: int, calls: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(client(call, f"bench-{clients}-{i}", calls // clients) for i in range(clients)))
+    return (calls // clients) * clients / (time.perf_counter() - start)
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.url.startswith("sqlite:///") and os.path.exists(args.url[len("sqlite:///"):]):
+        os.remove(args.url[len("sqlite:///"):])
+    sync_engine = create_engine(args.url)
+    SQLModel.metadata.create_all(sync_engine)
+    if args.url.startswith("sqlite"):
+        # Concurrent writers starve behind readers in rollback-journal mode
+        with sync_engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    async_engine = create_mcp_engine(args.url)
+
+    async def sync_call(name, validated):
+        session = Session(sync_engine)
+        try:
+            return TOOL_REGISTRY.call(session, name, validated)
+        finally:
+            session.close()
+
+    async def async_call(name, validated):
+        async with transaction(async_engine) as session:
+            return await TOOL_REGISTRY.acall(session, name, validated)
+
+    print(f"{'clients':>8} {'sync calls/s':>14} {'async calls/s':>14}")
+    for clients in args.clients:
+        sync_rate = await run(sync_call, clients, args.calls)
+        async_rate = await run(async_call, clients, args.calls)
+        print(f"{clients:>8} {sync_rate:>14,.0f} {async_rate:>14,.0f}")
+
+    await async_engine.dispose()
+    sync_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--url", default="sqlite:///bench_mcp.db", help="Database URL (sync form)")
+    parser.add_argument("--calls", type=int, default=2000, help="Tool calls per run")
+    parser.add_argument("--clients", type=lambda v: [int(c) for c in v.split(",")], default=[1, 8, 32])
+    asyncio.run(main(parser.parse_args()))
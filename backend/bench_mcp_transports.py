@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Per-tool round-trip latency and throughput of the MCP server by transport
+
+Runs the same sequence of tool calls against a scratch SQLite database:
+
+    direct   TodoMCPServer.call, no protocol (the database floor)
+    memory   MCP protocol over in-process streams, no transport
+    stdio    server launched as a subprocess speaking over stdin/stdout
+    http     server launched as a subprocess with the streamable-HTTP transport
+
+With --concurrency above 1, that many callers share one client session.
+
+Usage:
+    python bench_mcp_transports.py [--calls 200] [--concurrency 1]
+        [--transports direct,memory,stdio,http] [--db bench_mcp_transports.db]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.memory import create_connected_server_and_client_session
+from sqlmodel import SQLModel, create_engine
+from src.mcp_server.db import create_mcp_engine
+from src.mcp_server.server import TodoMCPServer
+
+USER_ID = "bench"
+
+
+def arguments(tool: str, n: int, task_ids: List[int]) -> dict:
+    if tool == "add_task":
+        return {"user_id": USER_ID, "title": f"Task {n}", "description": "created by bench_mcp_transports"}
+    if tool == "list_tasks":
+        return {"user_id": USER_ID, "status": "pending"}
+    if tool == "update_task":
+        return {"user_id": USER_ID, "task_id": task_ids[n % len(task_ids)], "title": f"Renamed {n}"}
+    if tool == "complete_task":
+        return {"user_id": USER_ID, "task_id": task_ids[n % len(task_ids)]}
+    return {"user_id": USER_ID, "operations": [
+        {"tool": "add_task", "arguments": {"title": f"Batch {n}.{i}"}} for i in range(5)
+    ]}
+
+
+TOOLS = ("add_task", "list_tasks", "update_task", "complete_task", "batch")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def protocol_caller(read_stream, write_stream) -> AsyncIterator[Callable]:
+    async with ClientSession(read_stream, write_stream) as session:
+        await session.initialize()
+
+        async def call(tool: str, args: dict):
+            result = await session.call_tool(tool, args)
+            if result.isError:
+                raise RuntimeError(result.content[0].text)
+            return json.loads(result.content[0].text)
+
+        yield call
+
+
+@asynccontextmanager
+async def open_transport(name: str, url: str, server_command: List[str]) -> AsyncIterator[Callable]:
+    if name in ("direct", "memory"):
+        server = TodoMCPServer(create_mcp_engine(url))
+        try:
+            if name == "direct":
+                async def call(tool: str, args: dict):
+                    return await server.call(tool, args)
+                yield call
+            else:
+                async with create_connected_server_and_client_session(server.server) as session:
+                    async def call(tool: str, args: dict):
+                        return json.loads((await session.call_tool(tool, args)).content[0].text)
+                    yield call
+        finally:
+            await server.engine.dispose()
+
+    elif name == "stdio":
+        params = StdioServerParameters(
+            command=server_command[0],
+            args=server_command[1:] + ["--transport", "stdio", "--database-url", url],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        async with stdio_client(params) as (read_stream, write_stream):
+            async with protocol_caller(read_stream, write_stream) as call:
+                yield call
+
+    else:
+        port = free_port()
+        process = subprocess.Popen(
+            server_command + ["--transport", "http", "--port", str(port), "--database-url", url],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        try:
+            for _ in range(100):
+                with socket.socket() as sock:
+                    if sock.connect_ex(("127.0.0.1", port)) == 0:
+                        break
+                await asyncio.sleep(0.1)
+            async with streamablehttp_client(f"http://127.0.0.1:{port}/mcp") as (read_stream, write_stream, _):
+                async with protocol_caller(read_stream, write_stream) as call:
+                    yield call
+        finally:
+            process.terminate()
+            process.wait()
+
+
+async def measure(call: Callable, calls: int, concurrency: int) -> Dict[str, tuple]:
+    task_ids: List[int] = []
+    results = {}
+    for tool in TOOLS:
+        latencies: List[float] = []
+
+        async def worker(offset: int):
+            for n in range(offset, calls, concurrency):
+                start = time.perf_counter()
+                result = await call(tool, arguments(tool, n, task_ids))
+                latencies.append(time.perf_counter() - start)
+                if tool == "add_task":
+                    task_ids.append(result["task_id"])
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        results[tool] = (
+            latencies[len(latencies) // 2] * 1000,
+            latencies[int(len(latencies) * 0.95)] * 1000,
+            latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+            len(latencies) / elapsed,
+        )
+    return results
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"{'transport':<10} {'tool':<14} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'calls/s':>9}")
+    for transport in args.transports:
+        if os.path.exists(args.db):
+            os.remove(args.db)
+        url = f"sqlite:///{os.path.abspath(args.db)}"
+        engine = create_engine(url)
+        SQLModel.metadata.create_all(engine)
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        engine.dispose()
+
+        async with open_transport(transport, url, args.server_command) as call:
+            results = await measure(call, args.calls, args.concurrency)
+        for tool, (p50, p95, p99, rate) in results.items():
+            print(f"{transport:<10} {tool:<14} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f} {rate:>9,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--calls", type=int, default=200, help="Calls per tool")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--transports", type=lambda v: v.split(","), default=["direct", "memory", "stdio", "http"])
+    parser.add_argument("--db", default="bench_mcp_transports.db")
+    parser.add_argument(
+        "--server-command",
+        type=shlex.split,
+        default=[sys.executable, "-m", "src.mcp_server"],
+        help="Command that starts the server (transport flags are appended)",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Hot messages table size and query latency before and after archival
+
+Fills a scratch SQLite database with chat history spread over the past
+year, measures the messages table and the latency of the history and
+per-user queries, archives everything past the retention period and
+measures again. Also reports the compression achieved by the archive.
+
+Usage:
+    python bench_message_archive.py [conversations] [retention_days] [db_path]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, text
+from sqlmodel import SQLModel, Session, create_engine, select
+from src.chatbot.archive import MessageArchiveService
+from src.chatbot.conversation_models import Conversation, Message
+from src.chatbot.history import ConversationHistoryService
+
+MESSAGES_PER_CONVERSATION = 40
+USERS = 500
+
+PHRASES = (
+    "add buy milk to my list", "what tasks do I have today?", "mark the dentist task as done",
+    "Sure, I've added that task for you.", "Here are your pending tasks:", "Done! Anything else?",
+)
+
+
+def fill(engine, conversations: int) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Conversation), [
+            {"user_id": str(i % USERS), "created_at": now, "updated_at": now, "message_count": MESSAGES_PER_CONVERSATION}
+            for i in range(conversations)
+        ])
+        rows = []
+        for conversation_id in range(1, conversations + 1):
+            started = now - timedelta(days=random.uniform(0, 365))
+            for n in range(MESSAGES_PER_CONVERSATION):
+                rows.append({
+                    "user_id": str((conversation_id - 1) % USERS),
+                    "conversation_id": conversation_id,
+                    "role": "user" if n % 2 == 0 else "assistant",
+                    "content": " ".join(random.choices(PHRASES, k=random.randint(1, 6))),
+                    "created_at": started + timedelta(minutes=n),
+                })
+            if len(rows) >= 50000:
+                conn.execute(insert(Message), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Message), rows)
+
+
+def table_size(engine) -> tuple[int, int, int]:
+    """(rows, content bytes, bytes on disk) of the messages table and its indexes"""
+    with engine.connect() as conn:
+        rows, content = conn.execute(text("SELECT count(*), coalesce(sum(length(content)), 0) FROM messages")).one()
+        disk = conn.execute(text(
+            "SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name = 'messages' OR name LIKE 'ix_messages_%'"
+        )).scalar()
+    return rows, content, disk
+
+
+def time_queries(engine, conversations: int, samples: int = 300) -> dict[str, float]:
+    """Median latency in ms of the history page and per-user recent-messages queries"""
+    latencies = {"history_page": [], "user_recent": []}
+    with Session(engine) as session:
+        for _ in range(samples):
+            conversation_id = random.randint(1, conversations)
+            start = time.perf_counter()
+            ConversationHistoryService.list_messages(session, conversation_id, str((conversation_id - 1) % USERS))
+            latencies["history_page"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            session.exec(
+                select(Message).where(Message.user_id == str(conversation_id % USERS))
+                .order_by(Message.created_at.desc()).limit(50)
+            ).all()
+            latencies["user_recent"].append(time.perf_counter() - start)
+    return {name: statistics.median(values) * 1000 for name, values in latencies.items()}
+
+
+def report(label: str, engine, conversations: int) -> None:
+    rows, content, disk = table_size(engine)
+    queries = time_queries(engine, conversations)
+    print(f"{label:<8} {rows:>10,} {content / 1e6:>10.1f} {disk / 1e6:>10.1f} "
+          f"{queries['history_page']:>10.3f} {queries['user_recent']:>10.3f}")
+
+
+def main():
+    conversations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    retention_days = float(sys.argv[2]) if len(sys.argv) > 2 else 90
+    db_path = sys.argv[3] if len(sys.argv) > 3 else "bench_message_archive.db"
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    random.seed(0)
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine)
+    fill(engine, conversations)
+
+    print(f"{'':<8} {'hot rows':>10} {'text MB':>10} {'disk MB':>10} {'page ms':>10} {'recent ms':>10}")
+    report("before", engine, conversations)
+
+    start = time.perf_counter()
+    with Session(engine) as session:
+        stats = MessageArchiveService.archive_old_messages(session, retention_days=retention_days)
+    elapsed = time.perf_counter() - start
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+
+    report("after", engine, conversations)
+    ratio = stats["raw_bytes"] / stats["compressed_bytes"] if stats["compressed_bytes"] else 0
+    print(f"archived {stats['messages']:,} messages into {stats['blocks']:,} blocks in {elapsed:.1f}s: "
+          f"{stats['raw_bytes'] / 1e6:.1f} MB -> {stats['compressed_bytes'] / 1e6:.1f} MB ({ratio:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Refresh latency benchmark as the refresh_tokens table grows
+
+Fills a scratch SQLite database with refresh tokens in steps (a mix of live,
+expired and revoked rows spread over many users) and, at each size, times the
+/api/auth/refresh database work: hashed lookup, rotation and commit. Finally
+runs the batch pruner and reports how long it takes to clear dead rows.
+
+Usage:
+    python bench_refresh_tokens.py [max_rows] [db_path]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, create_engine, func, select
+from src.auth.refresh_token_model import RefreshToken, hash_refresh_token
+from src.auth.refresh_token_service import RefreshTokenService
+
+
+def fill(engine, start: int, count: int, users: int) -> None:
+    now = datetime.utcnow()
+    chunk = 50000
+    with engine.begin() as conn:
+        for offset in range(start, start + count, chunk):
+            rows = []
+            for i in range(offset, min(offset + chunk, start + count)):
+                expired = i % 3 == 0
+                rows.append({
+                    "token_hash": hash_refresh_token(f"bench-{i}"),
+                    "user_id": i % users,
+                    "expires_at": now - timedelta(days=1) if expired else now + timedelta(days=30),
+                    "created_at": now,
+                    "revoked": i % 7 == 0,
+                })
+            conn.execute(insert(RefreshToken), rows)
+
+
+def time_refreshes(engine, user_ids: list[int], samples: int) -> list[float]:
+    latencies = []
+    for _ in range(samples):
+        with Session(engine) as session:
+            user_id = random.choice(user_ids)
+            token = RefreshTokenService.issue(session, user_id)
+            session.commit()
+
+            start = time.perf_counter()
+            refresh_token_obj = RefreshTokenService.get_valid(session, token)
+            RefreshTokenService.rotate(session, refresh_token_obj)
+            session.commit()
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    max_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    db_path = sys.argv[2] if len(sys.argv) > 2 else "bench_refresh_tokens.db"
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    SQLModel.metadata.create_all(engine, tables=[RefreshToken.__table__])
+    users = max(1, max_rows // 20)
+
+    print(f"{'rows':>10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    size = 0
+    target = 10_000
+    while size < max_rows:
+        target = min(target, max_rows)
+        fill(engine, size, target - size, users)
+        size = target
+        latencies = sorted(time_refreshes(engine, list(range(users)), 200))
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000
+        print(f"{size:>10,} {p50:>8.3f} {p95:>8.3f} {latencies[-1] * 1000:>8.3f}")
+        target *= 10 if target < 1_000_000 else 2
+
+    with Session(engine) as session:
+        before = session.exec(select(func.count(RefreshToken.id))).one()
+        start = time.perf_counter()
+        batches = 0
+        while RefreshTokenService.prune(session) > 0:
+            batches += 1
+        elapsed = time.perf_counter() - start
+        after = session.exec(select(func.count(RefreshToken.id))).one()
+
+    print(f"\nPruned {before - after:,} dead rows in {batches} batches ({elapsed:.2f}s); {after:,} live rows remain")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Local fake of the OpenAI chat completions endpoint for tests
+
+Serves scripted responses from a background thread so an AsyncOpenAI client
+can be pointed at it with base_url. Each request to /v1/chat/completions pops
+the next scripted entry:
+    - a list of chunk dicts is sent as a Server-Sent Events stream
+    - a dict is sent as a regular JSON completion
+    - an int is sent as an error response with that HTTP status
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, List, Optional
+
+
+def completion(content: Optional[str] = None, tool_calls: Optional[list] = None) -> dict:
+    """Build a non-streaming chat completion"""
+    message = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "fake",
+        "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+
+def chunk(delta: dict, finish_reason: Optional[str] = None) -> dict:
+    """Build one streaming chunk"""
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "fake",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def text_chunks(*parts: str) -> List[dict]:
+    """Stream of chunks carrying the given text fragments"""
+    chunks = [chunk({"role": "assistant", "content": ""})]
+    chunks += [chunk({"content": part}) for part in parts]
+    chunks.append(chunk({}, "stop"))
+    return chunks
+
+
+def tool_call_chunks(name: str, arguments: dict, call_id: str = "call_1", index: int = 0) -> List[dict]:
+    """Stream of chunks for one tool call, with the arguments split across chunks"""
+    args = json.dumps(arguments)
+    middle = len(args) // 2
+    return [
+        chunk({"role": "assistant", "tool_calls": [
+            {"index": index, "id": call_id, "type": "function", "function": {"name": name, "arguments": ""}}
+        ]}),
+        chunk({"tool_calls": [{"index": index, "function": {"arguments": args[:middle]}}]}),
+        chunk({"tool_calls": [{"index": index, "function": {"arguments": args[middle:]}}]}),
+        chunk({}, "tool_calls"),
+    ]
+
+
+class FakeCompletionServer:
+    """Scripted chat completions server on 127.0.0.1 (use as a context manager)"""
+
+    def __init__(self, responses: List[Any], chunk_delay: float = 0.0, response_delay: float = 0.0):
+        self.responses = list(responses)
+        self.chunk_delay = chunk_delay
+        self.response_delay = response_delay
+        self.requests: List[dict] = []
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    def _next_response(self, body: dict) -> Any:
+        with self._lock:
+            self.requests.append(body)
+            if not self.responses:
+                return completion("(no scripted response)")
+            return self.responses.pop(0)
+
+    def __enter__(self) -> "FakeCompletionServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                response = server._next_response(body)
+                if server.response_delay:
+                    time.sleep(server.response_delay)
+
+                if isinstance(response, int):
+                    payload = json.dumps({"error": {"message": f"fake error {response}", "type": "fake"}}).encode()
+                    self.send_response(response)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+
+                if isinstance(response, list):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.send_header("Connection", "close")
+                    self.end_headers()
+                    for item in response:
+                        self.wfile.write(f"data: {json.dumps(item)}\n\n".encode())
+                        self.wfile.flush()
+                        if server.chunk_delay:
+                            time.sleep(server.chunk_delay)
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                    self.close_connection = True
+                    return
+
+                payload = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,139 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.auth import throttle
+from src.auth.models import User
+from src.auth.refresh_token_model import RefreshToken
+from src.auth.routes import router as auth_router
+from src.auth.signup_with_task import router as signup_router
+from src.auth.throttle import InMemoryRateLimitBackend
+from src.database import get_session
+from src.tasks.models import Task
+from src.tasks.service import TaskService
+
+PASSWORD = "Passw0rd1"
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(name="reads_after_commit")
+def reads_after_commit_fixture(engine):
+    """SELECTs run after a request's transaction has committed"""
+    state = {"committed": False, "reads": []}
+
+    @event.listens_for(engine, "commit")
+    def committed(connection):
+        state["committed"] = True
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def executing(connection, cursor, statement, parameters, context, executemany):
+        if state["committed"] and statement.lstrip().upper().startswith("SELECT"):
+            state["reads"].append(statement)
+
+    return state
+
+
+@pytest.fixture(name="client")
+def client_fixture(engine, monkeypatch):
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.include_router(signup_router)
+    app.dependency_overrides[get_session] = session_override
+
+    monkeypatch.setattr(throttle, "_backend", InMemoryRateLimitBackend())
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+def stored(engine, model) -> list:
+    with Session(engine) as session:
+        return session.exec(select(model)).all()
+
+
+@pytest.mark.asyncio
+async def test_register_commits_user_task_and_refresh_token(client, engine, reads_after_commit):
+    async with client:
+        response = await client.post("/api/auth/register", json={"email": "a@example.com", "password": PASSWORD})
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["user"]["email"] == "a@example.com" and body["access_token"] and body["refresh_token"]
+    assert reads_after_commit["reads"] == []
+
+    [user] = stored(engine, User)
+    assert body["user"]["id"] == user.id
+    assert [task.user_id for task in stored(engine, Task)] == [str(user.id)]
+    assert [token.user_id for token in stored(engine, RefreshToken)] == [user.id]
+
+
+@pytest.mark.asyncio
+async def test_register_rejects_a_taken_email(client, engine):
+    async with client:
+        first = await client.post("/api/auth/register", json={"email": "a@example.com", "password": PASSWORD})
+        second = await client.post("/api/auth/register", json={"email": "a@example.com", "password": PASSWORD})
+
+    assert first.status_code == 201
+    assert second.status_code == 400
+    assert len(stored(engine, User)) == 1
+
+
+@pytest.mark.asyncio
+async def test_signup_creates_user_and_first_task_together(client, engine, reads_after_commit):
+    async with client:
+        response = await client.post(
+            "/api/signup-with-task",
+            params={"initial_task_title": "Plan the week"},
+            json={"email": "b@example.com", "password": PASSWORD},
+        )
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["initial_task"]["title"] == "Plan the week"
+    assert body["initial_task"]["user_id"] == str(body["user"]["id"])
+    assert reads_after_commit["reads"] == []
+    assert [task.id for task in stored(engine, Task)] == [body["initial_task"]["id"]]
+
+
+@pytest.mark.asyncio
+async def test_signup_leaves_nothing_behind_when_the_task_fails(client, engine, monkeypatch):
+    def create_task(*args, **kwargs):
+        raise RuntimeError("task insert failed")
+
+    monkeypatch.setattr(TaskService, "create_task", staticmethod(create_task))
+    async with client:
+        response = await client.post("/api/signup-with-task", json={"email": "c@example.com", "password": PASSWORD})
+
+    assert response.status_code == 500
+    assert stored(engine, User) == []
+    assert stored(engine, Task) == []
+    assert stored(engine, RefreshToken) == []
+
+
+@pytest.mark.asyncio
+async def test_login_returns_tokens_without_reloading_the_user(client, engine, reads_after_commit):
+    async with client:
+        registered = await client.post("/api/auth/register", json={"email": "d@example.com", "password": PASSWORD})
+        wrong = await client.post("/api/auth/login", json={"email": "d@example.com", "password": "WrongPass1"})
+        reads_after_commit.update(committed=False, reads=[])
+        response = await client.post("/api/auth/login", json={"email": "d@example.com", "password": PASSWORD})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["user"] == registered.json()["user"]
+    assert body["access_token"] and body["refresh_token"] != registered.json()["refresh_token"]
+    assert reads_after_commit["reads"] == []
+    assert wrong.status_code == 401
+    assert len(stored(engine, RefreshToken)) == 2
@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+from openai import AsyncOpenAI
+from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.pool import StaticPool
+
+from src.chatbot.context import ContextBuilder, estimate_tokens
+from src.chatbot.conversation_models import Conversation, Message
+from fake_openai_server import FakeCompletionServer, completion
+
+
+@pytest.fixture(name="engine")
+def engine_fixture():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture(name="session")
+def session_fixture(engine):
+    with Session(engine) as session:
+        yield session
+
+
+def add_conversation(session: Session, turns: int, content: str = "message") -> Conversation:
+    conversation = Conversation(user_id="testuser")
+    session.add(conversation)
+    session.commit()
+    start = datetime.utcnow() - timedelta(hours=1)
+    for i in range(turns):
+        session.add(Message(
+            user_id="testuser",
+            conversation_id=conversation.id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"{content} {i}",
+            created_at=start + timedelta(seconds=i),
+        ))
+    session.commit()
+    session.refresh(conversation)
+    return conversation
+
+
+def test_estimate_tokens_grows_with_length():
+    assert estimate_tokens("") < estimate_tokens("short") < estimate_tokens("a much longer message " * 10)
+
+
+def test_short_conversation_is_sent_whole(session: Session):
+    conversation = add_conversation(session, 4)
+    context = ContextBuilder(client=None).build(session, conversation.id, "next")
+
+    assert [m["content"] for m in context] == ["message 0", "message 1", "message 2", "message 3", "next"]
+
+
+def test_stored_user_message_is_not_duplicated(session: Session):
+    conversation = add_conversation(session, 3)
+    context = ContextBuilder(client=None).build(session, conversation.id, "message 2")
+
+    assert [m["content"] for m in context] == ["message 0", "message 1", "message 2"]
+
+
+def test_history_is_cut_to_token_budget_keeping_newest(session: Session):
+    conversation = add_conversation(session, 6, content="x" * 400)
+    budget = estimate_tokens("next") + 3 * estimate_tokens("x" * 400 + " 0")
+    context = ContextBuilder(client=None, token_budget=budget).build(session, conversation.id, "next")
+
+    assert [m["content"][-1] for m in context[:-1]] == ["3", "4", "5"]
+
+
+def test_summary_replaces_summarized_messages(session: Session):
+    conversation = add_conversation(session, 6)
+    messages = session.exec(Message.__table__.select().order_by(Message.created_at)).all()
+    conversation.summary = "User asked about groceries."
+    conversation.summary_until = messages[3].created_at
+    session.add(conversation)
+    session.commit()
+
+    context = ContextBuilder(client=None).build(session, conversation.id, "next")
+
+    assert context[0]["role"] == "system"
+    assert "groceries" in context[0]["content"]
+    assert [m["content"] for m in context[1:]] == ["message 4", "message 5", "next"]
+
+
+@pytest.mark.asyncio
+async def test_full_window_triggers_background_summary(engine, session: Session):
+    conversation = add_conversation(session, 30)
+
+    with FakeCompletionServer([completion("Earlier: 20 messages about tasks.")]) as server:
+        client = AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        with patch("src.chatbot.context.engine", engine):
+            context = ContextBuilder(client, max_messages=10).build(session, conversation.id, "next")
+            await asyncio.gather(*ContextBuilder._tasks)
+        await client.close()
+
+    assert len(context) == 11
+    session.expire_all()
+    summarized = session.get(Conversation, conversation.id)
+    assert summarized.summary == "Earlier: 20 messages about tasks."
+    assert "message 19" in server.requests[0]["messages"][1]["content"]
+    assert "message 20" not in server.requests[0]["messages"][1]["content"]
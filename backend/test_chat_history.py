@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.chatbot.conversation_models import Conversation
+from src.chatbot.history import ConversationHistoryService, decode_cursor
+from src.chatbot.message_writer import PendingTurn, message_preview, write_turns
+from src.chatbot.routes import router
+from src.database import get_session
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def new_conversation(session: Session, user_id: str = "testuser", created_at: datetime = START) -> Conversation:
+    conversation = Conversation(user_id=user_id, created_at=created_at)
+    session.add(conversation)
+    session.commit()
+    session.refresh(conversation)
+    return conversation
+
+
+def turn(conversation: Conversation, n: int, answer: str = None) -> PendingTurn:
+    at = START + timedelta(minutes=n)
+    return PendingTurn(
+        conversation_id=conversation.id,
+        user_id=conversation.user_id,
+        messages=[("user", f"question {n}", at), ("assistant", answer or f"answer {n}", at + timedelta(seconds=1))],
+        updated_at=at,
+    )
+
+
+def test_write_path_maintains_conversation_summary(engine):
+    with Session(engine) as session:
+        conversation = new_conversation(session)
+        write_turns(session, [turn(conversation, 2), turn(conversation, 1)])
+        session.refresh(conversation)
+
+        assert conversation.message_count == 4
+        assert conversation.last_message_at == START + timedelta(minutes=2, seconds=1)
+        assert conversation.preview == "answer 2"
+
+        # A late batch holding an older turn only adds to the count
+        write_turns(session, [turn(conversation, 0)])
+        session.refresh(conversation)
+        assert conversation.message_count == 6
+        assert conversation.preview == "answer 2"
+
+
+def test_preview_is_truncated_to_one_line():
+    preview = message_preview("line one\n\nline two " + "x" * 300)
+    assert preview.startswith("line one line two")
+    assert len(preview) == 120 and preview.endswith("…")
+
+
+def test_conversation_pages_cover_all_rows_without_overlap(engine):
+    with Session(engine) as session:
+        ids = [new_conversation(session, created_at=START + timedelta(minutes=i // 2)).id for i in range(7)]
+        new_conversation(session, user_id="someoneelse")
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = ConversationHistoryService.list_conversations(session, "testuser", limit=3, cursor=cursor)
+            seen += [c.id for c in page]
+            if cursor is None:
+                break
+
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_listing_conversations_does_not_touch_messages(engine):
+    with Session(engine) as session:
+        conversation = new_conversation(session)
+        write_turns(session, [turn(conversation, 1)])
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        ConversationHistoryService.list_conversations(session, "testuser")
+
+    assert statements and all("messages" not in sql for sql in statements)
+
+
+def test_message_pages_and_ownership(engine):
+    with Session(engine) as session:
+        conversation = new_conversation(session)
+        write_turns(session, [turn(conversation, n) for n in range(5)])
+
+        first, cursor = ConversationHistoryService.list_messages(session, conversation.id, "testuser", limit=4)
+        second, last_cursor = ConversationHistoryService.list_messages(
+            session, conversation.id, "testuser", limit=10, cursor=cursor
+        )
+
+        assert [m.content for m in first] == ["answer 4", "question 4", "answer 3", "question 3"]
+        assert len(second) == 6 and second[-1].content == "question 0"
+        assert last_cursor is None
+
+        with pytest.raises(HTTPException) as exc:
+            ConversationHistoryService.list_messages(session, conversation.id, "someoneelse")
+        assert exc.value.status_code == 404
+
+
+def test_refresh_stats_backfills_summary(engine):
+    with Session(engine) as session:
+        conversation = new_conversation(session)
+        write_turns(session, [turn(conversation, 1)])
+        conversation.message_count, conversation.preview, conversation.last_message_at = 0, None, None
+        session.add(conversation)
+        session.commit()
+
+        ConversationHistoryService.refresh_stats(session, conversation.id)
+        session.refresh(conversation)
+
+        assert conversation.message_count == 2
+        assert conversation.preview == "answer 1"
+
+
+def test_history_endpoints(engine):
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def set_user(request: Request, call_next):
+        request.state.user_id = "testuser"
+        return await call_next(request)
+
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.include_router(router)
+    app.dependency_overrides[get_session] = session_override
+    client = TestClient(app)
+
+    with Session(engine) as session:
+        conversation = new_conversation(session)
+        write_turns(session, [turn(conversation, n, answer="done " * 50) for n in range(3)])
+        conversation_id = conversation.id
+
+    listing = client.get("/chat/conversations").json()
+    assert listing["next_cursor"] is None
+    assert listing["conversations"][0]["message_count"] == 6
+    assert listing["conversations"][0]["preview"].startswith("done done")
+
+    page = client.get(f"/chat/conversations/{conversation_id}/messages", params={"limit": 2}).json()
+    assert [m["role"] for m in page["messages"]] == ["assistant", "user"]
+    assert decode_cursor(page["next_cursor"])[1] == page["messages"][-1]["id"]
+
+    assert client.get("/chat/conversations", params={"cursor": "!!"}).status_code == 400
+    assert client.get("/chat/conversations", params={"limit": 0}).status_code == 422
+    assert client.get("/chat/conversations/999/messages").status_code == 404
@@ -0,0 +1,108 @@
+import json
+import pytest
+from openai import AsyncOpenAI
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.chatbot.ai_agent_service import AIAgentService
+from src.chatbot.conversation_models import Conversation
+from src.tasks.models import Task
+from fake_openai_server import FakeCompletionServer, text_chunks, tool_call_chunks
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path):
+    # File-backed so tool calls can use their own connections from worker threads
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(name="session")
+def session_fixture(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture(name="conversation")
+def conversation_fixture(session: Session):
+    conversation = Conversation(user_id="testuser")
+    session.add(conversation)
+    session.commit()
+    session.refresh(conversation)
+    return conversation
+
+
+async def collect(service: AIAgentService, session: Session, conversation: Conversation, message: str):
+    return [
+        event async for event in service.stream_conversation(
+            session=session,
+            conversation_id=conversation.id,
+            user_id="testuser",
+            user_message=message,
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_streamed_as_they_arrive(session: Session, conversation: Conversation):
+    with FakeCompletionServer([text_chunks("Hel", "lo ", "there")]) as server:
+        client = AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        events = await collect(AIAgentService(client, session.get_bind()), session, conversation, "Hi")
+        await client.close()
+
+    assert [e["content"] for e in events if e["event"] == "token"] == ["Hel", "lo ", "there"]
+    assert events[-1] == {"event": "done", "response": "Hello there", "tool_calls": []}
+    assert server.requests[0]["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_reported_and_followed_by_final_stream(session: Session, conversation: Conversation):
+    arguments = {"user_id": "testuser", "title": "Buy milk"}
+    with FakeCompletionServer([
+        tool_call_chunks("add_task", arguments),
+        text_chunks("Added ", "Buy milk."),
+    ]) as server:
+        client = AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        events = await collect(AIAgentService(client, session.get_bind()), session, conversation, "could you put buy milk on my list?")
+        await client.close()
+
+    names = [e["event"] for e in events]
+    assert names == ["tool_call", "tool_result", "token", "token", "done"]
+    assert events[1]["result"]["title"] == "Buy milk"
+    assert events[0]["arguments"] == arguments
+    assert events[-1]["response"] == "Added Buy milk."
+    assert events[-1]["tool_calls"] == [{"name": "add_task", "arguments": arguments}]
+
+    follow_up = server.requests[1]["messages"]
+    assert follow_up[-2]["tool_calls"][0]["function"]["name"] == "add_task"
+    assert follow_up[-1]["role"] == "tool"
+    assert follow_up[-1]["tool_call_id"] == "call_1"
+    assert json.loads(follow_up[-1]["content"])["status"] == "created"
+    assert session.exec(select(Task)).one().title == "Buy milk"
+
+
+@pytest.mark.asyncio
+async def test_model_error_ends_stream_with_error_and_done(session: Session, conversation: Conversation):
+    with FakeCompletionServer([400]) as server:
+        client = AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        events = await collect(AIAgentService(client, session.get_bind()), session, conversation, "Hi")
+        await client.close()
+
+    assert [e["event"] for e in events] == ["error", "done"]
+    assert events[-1]["response"].startswith("Sorry, I encountered an error")
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_in_one_response_share_one_follow_up(session: Session, conversation: Conversation):
+    first = tool_call_chunks("add_task", {"user_id": "testuser", "title": "Buy milk"}, "call_1", 0)
+    second = tool_call_chunks("add_task", {"user_id": "testuser", "title": "Buy eggs"}, "call_2", 1)
+    with FakeCompletionServer([first[:-1] + second, text_chunks("Added both.")]) as server:
+        client = AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        events = await collect(AIAgentService(client, session.get_bind()), session, conversation, "add milk and eggs")
+        await client.close()
+
+    assert [e["event"] for e in events] == ["tool_call", "tool_call", "tool_result", "tool_result", "token", "done"]
+    assert len(server.requests) == 2
+    assert [m["tool_call_id"] for m in server.requests[1]["messages"] if m["role"] == "tool"] == ["call_1", "call_2"]
+    assert sorted(task.title for task in session.exec(select(Task)).all()) == ["Buy eggs", "Buy milk"]
@@ -127,23 +127,36 @@ async def test_ai_agent_service():
     """Test the AI agent service integration"""
     from src.chatbot.ai_agent_service import AIAgentService
 
-    # Mock the OpenAI client to avoid actual API calls
-    with patch('src.chatbot.ai_agent_service.OpenAI') as mock_openai:
-        mock_client_instance = AsyncMock()
-        mock_completion = AsyncMock()
-        mock_completion.choices = [AsyncMock()]
-        mock_completion.choices[0].message = AsyncMock()
-        mock_completion.choices[0].message.content = "Test response"
-        mock_completion.choices[0].message.tool_calls = []
-
-        mock_client_instance.chat.completions.create.return_value = mock_completion
-        mock_openai.return_value = mock_client_instance
-
-        agent_service = AIAgentService()
-
-        # Since we're mocking, we'll just test that the method can be called without error
-        # In a real scenario, we'd test the actual integration
-        assert agent_service is not None
+    # Mock the shared async OpenAI client to avoid actual API calls
+    mock_client_instance = AsyncMock()
+    mock_completion = AsyncMock()
+    mock_completion.choices = [AsyncMock()]
+    mock_completion.choices[0].message = AsyncMock()
+    mock_completion.choices[0].message.content = "Test response"
+    mock_completion.choices[0].message.tool_calls = []
+
+    mock_client_instance.chat.completions.create.return_value = mock_completion
+
+    agent_service = AIAgentService(mock_client_instance)
+
+    # Since we're mocking, we'll just test that the method can be called without error
+    # In a real scenario, we'd test the actual integration
+    assert agent_service is not None
+    assert agent_service.client is mock_client_instance
+
+
+def test_openai_client_is_shared():
+    """Test that chat requests reuse one app-scoped client"""
+    from src.chatbot import openai_client
+
+    with patch.object(openai_client, "create_openai_client") as create_client:
+        openai_client._client = None
+        first = openai_client.get_openai_client()
+        second = openai_client.get_openai_client()
+        openai_client._client = None
+
+    assert first is second
+    create_client.assert_called_once()
 
 
 if __name__ == "__main__":
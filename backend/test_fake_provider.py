@@ -0,0 +1,129 @@
+import random
+import time
+import openai
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.chatbot.ai_agent_service import AIAgentService
+from src.chatbot.conversation_models import Conversation
+from src.chatbot.fake_provider import FakeProvider, Latency
+from src.chatbot.llm_calls import LLMLimiter, create_completion
+from src.chatbot.providers import ChatProvider
+from src.chatbot.tool_registry import TOOL_REGISTRY
+from src.tasks.models import Task
+
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_provider_interface_is_abstract():
+    class CompleteOnly(ChatProvider):
+        async def complete(self, **kwargs):
+            return None
+
+    with pytest.raises(TypeError):
+        ChatProvider()
+    with pytest.raises(TypeError):
+        CompleteOnly()
+    assert isinstance(FakeProvider(), ChatProvider)
+
+
+def test_latency_specs_parse():
+    rng = random.Random(1)
+    assert Latency.parse("0.25").sample(rng) == 0.25
+    assert 0.1 <= Latency.parse("uniform:0.1,0.2").sample(rng) <= 0.2
+    assert Latency.parse("lognormal:0.3,0.5").sample(rng) > 0
+    with pytest.raises(ValueError):
+        Latency.parse("gamma:1,2")
+
+
+@pytest.mark.asyncio
+async def test_replies_are_deterministic_per_seed():
+    first = await FakeProvider(seed=7).complete(model="fake", messages=MESSAGES)
+    again = await FakeProvider(seed=7).complete(model="fake", messages=MESSAGES)
+    other = await FakeProvider(seed=8).complete(model="fake", messages=MESSAGES)
+
+    assert first.choices[0].message.content == again.choices[0].message.content
+    assert first.choices[0].message.content != other.choices[0].message.content
+    assert first.usage.completion_tokens == 30
+
+
+@pytest.mark.asyncio
+async def test_stream_matches_completion_and_reports_usage():
+    provider = FakeProvider(seed=3, reply_tokens=5)
+    full = await provider.complete(model="fake", messages=MESSAGES)
+    stream = await provider.open_stream(
+        model="fake", messages=MESSAGES, extra_body={"stream_options": {"include_usage": True}}
+    )
+    chunks = [chunk async for chunk in stream]
+
+    text = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+    assert text == full.choices[0].message.content
+    assert chunks[-2].choices[0].finish_reason == "stop"
+    assert chunks[-1].usage.completion_tokens == 5
+
+
+@pytest.mark.asyncio
+async def test_latency_applies_and_respects_timeout():
+    provider = FakeProvider(latency=Latency("constant", 0.2))
+    started = time.perf_counter()
+    await provider.complete(model="fake", messages=MESSAGES)
+    assert time.perf_counter() - started >= 0.2
+
+    with pytest.raises(openai.APITimeoutError):
+        await provider.complete(model="fake", messages=MESSAGES, timeout=0.05)
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_retried():
+    provider = FakeProvider(error_rate=0.5, error_statuses=(503,), seed=1)
+    limiter = LLMLimiter()
+    for _ in range(10):
+        try:
+            await create_completion(provider, None, limiter, model="fake", messages=MESSAGES)
+        except openai.InternalServerError:
+            pass
+
+    assert provider.errors > 0
+    assert limiter.retries > 0
+
+
+@pytest.mark.asyncio
+async def test_agent_runs_tool_calls_end_to_end_offline(engine):
+    provider = FakeProvider(tool_call_rate=1.0)
+    with Session(engine, expire_on_commit=False) as session:
+        conversation = Conversation(user_id="testuser")
+        session.add(conversation)
+        session.commit()
+
+        result = await AIAgentService(provider, engine).process_conversation(
+            session, conversation.id, "testuser", "remember the dentist appointment please, thanks?"
+        )
+
+        assert result["tool_calls"][0]["name"] == "add_task"
+        assert session.exec(select(Task)).one().title.startswith("remember the dentist")
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_tool_calls_offline(engine):
+    provider = FakeProvider(tool_call_rate=1.0)
+    with Session(engine) as session:
+        events = [
+            event async for event in AIAgentService(provider, engine).stream_conversation(
+                session, 1, "testuser", "what is on my list today?"
+            )
+        ]
+
+    assert [e["event"] for e in events][:2] == ["tool_call", "tool_result"]
+    assert events[0]["name"] == "list_tasks"
+    assert events[-1]["event"] == "done"
+    assert TOOL_REGISTRY.get("list_tasks") is not None
@@ -0,0 +1,93 @@
+import pytest
+from openai import AsyncOpenAI
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.chatbot.ai_agent_service import AIAgentService
+from src.chatbot.intents import IntentMetrics, evaluate, match_intent, render_response
+from src.tasks.models import Task
+from fake_openai_server import FakeCompletionServer
+
+
+LABELLED = [
+    ("add a task to buy milk", "add_task"),
+    ("Please add a task to call mom.", "add_task"),
+    ("add buy milk to my list", "add_task"),
+    ("new todo: renew passport", "add_task"),
+    ("remind me to water the plants", "add_task"),
+    ("list my pending tasks", "list_tasks"),
+    ("show me all my tasks", "list_tasks"),
+    ("What are my completed tasks?", "list_tasks"),
+    ("complete task 12", "complete_task"),
+    ("mark task #4 as done", "complete_task"),
+    ("delete task 7", "delete_task"),
+    ("add buy milk and delete task 3", None),
+    ("don't add buy milk", None),
+    ("add a new task", None),
+    ("what should I work on today?", None),
+    ("add buy milk", None),
+    ("add a task to show the slides", None),
+    ("create a poem about cats", None),
+    ("Create a summary of our chat", None),
+    ("New York is great", None),
+    ("add up 2+2", None),
+    ("complete the report by friday", None),
+    ("hello there", None),
+]
+
+
+@pytest.mark.parametrize("message, expected", LABELLED)
+def test_only_confident_simple_commands_are_handled(message, expected):
+    intent = match_intent(message)
+    handled = intent is not None and intent.confidence >= 0.9
+    assert (intent.tool if handled else None) == expected
+
+
+def test_arguments_are_extracted():
+    assert match_intent("add a task to call mom.").arguments == {"title": "call mom"}
+    assert match_intent("list my open tasks").arguments == {"status": "pending"}
+    assert match_intent("show my tasks").arguments == {"status": "all"}
+    assert match_intent("mark task #4 as done").arguments == {"task_id": 4}
+
+
+def test_labelled_set_precision_and_coverage():
+    scores = evaluate(LABELLED)
+    assert scores["precision"] == 1.0
+    assert scores["coverage"] == 1.0
+
+
+def test_templated_responses():
+    intent = match_intent("list my tasks")
+    assert render_response(intent, {"tasks": []}) == "You have no tasks."
+    assert render_response(intent, {"tasks": [{"id": 1, "title": "Milk", "completed": True}]}) == "Your tasks:\n- [x] #1 Milk"
+    assert render_response(match_intent("delete task 9"), {"error": "Task not found"}) == "I couldn't do that: Task not found"
+
+
+def test_metrics_report_hit_rate_and_errors():
+    metrics = IntentMetrics()
+    metrics.record_hit(match_intent("add milk to my list"), {"task_id": 1, "title": "milk"}, 0.002)
+    metrics.record_hit(match_intent("delete task 9"), {"error": "Task not found"}, 0.002)
+    metrics.record_miss(None)
+    metrics.record_miss(match_intent("add a task to buy milk and eggs"))
+
+    stats = metrics.stats()
+    assert stats["hit_rate"] == 0.5
+    assert stats["tool_error_rate"] == 0.5
+    assert stats["low_confidence"] == 1
+    assert stats["hits_by_intent"] == {"add_task": 1, "delete_task": 1}
+
+
+@pytest.mark.asyncio
+async def test_simple_command_skips_the_model(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+
+    with FakeCompletionServer([]) as server, Session(engine) as session:
+        client = AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        result = await AIAgentService(client, engine).process_conversation(session, 1, "alice", "add buy milk to my list")
+        await client.close()
+
+        assert server.requests == []
+        assert result["response"].startswith('Added "buy milk"')
+        assert result["tool_calls"] == [{"name": "add_task", "arguments": {"title": "buy milk"}}]
+        assert session.exec(select(Task)).one().user_id == "alice"
+    engine.dispose()
@@ -0,0 +1,98 @@
+import base64
+import json
+import time
+
+import pytest
+
+from src.auth.jwt_codecs import HS256Codec, JWTCodec, JoseCodec, TokenDecodeError
+
+SECRET = "s" * 40
+
+
+def claims(ttl: int = 3600) -> dict:
+    return {"sub": "42", "exp": int(time.time()) + ttl, "jti": "abc123"}
+
+
+def segment(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).rstrip(b"=").decode()
+
+
+def test_codec_interface_is_abstract():
+    with pytest.raises(TypeError):
+        JWTCodec(SECRET)
+
+
+def test_round_trip_and_jose_compatibility():
+    codec, jose = HS256Codec(SECRET), JoseCodec(SECRET)
+    payload = claims()
+
+    token = codec.encode(payload)
+    assert codec.decode(token) == payload
+    assert token == jose.encode(payload)
+    assert jose.decode(token) == payload
+    assert codec.decode(jose.encode(payload)) == payload
+
+
+def test_tampered_signature_is_rejected():
+    codec = HS256Codec(SECRET)
+    header, body, signature = codec.encode(claims()).split(".")
+    flipped = signature[:-2] + ("A" if signature[-2] != "A" else "B") + signature[-1]
+
+    for bad in (flipped, signature + "!", signature + "AAAA", ""):
+        with pytest.raises(TokenDecodeError):
+            codec.decode(f"{header}.{body}.{bad}")
+
+
+def test_tampered_payload_is_rejected():
+    codec = HS256Codec(SECRET)
+    header, _, signature = codec.encode(claims()).split(".")
+    forged = segment({**claims(), "sub": "1"})
+
+    with pytest.raises(TokenDecodeError, match="Signature"):
+        codec.decode(f"{header}.{forged}.{signature}")
+
+
+def test_expired_and_not_yet_valid_tokens_are_rejected():
+    codec = HS256Codec(SECRET)
+    with pytest.raises(TokenDecodeError, match="expired"):
+        codec.decode(codec.encode(claims(ttl=-1)))
+    with pytest.raises(TokenDecodeError, match="nbf"):
+        codec.decode(codec.encode({**claims(), "nbf": int(time.time()) + 60}))
+    with pytest.raises(TokenDecodeError):
+        codec.decode(codec.encode({**claims(), "exp": "soon"}))
+
+
+@pytest.mark.parametrize("alg", ["none", "HS512", "RS256", None])
+def test_other_alg_headers_are_rejected(alg):
+    codec = HS256Codec(SECRET)
+    _, body, signature = codec.encode(claims()).split(".")
+    header = segment({"alg": alg, "typ": "JWT"})
+
+    with pytest.raises(TokenDecodeError, match="alg"):
+        codec.decode(f"{header}.{body}.{signature}")
+    with pytest.raises(TokenDecodeError):
+        codec.decode(f"{header}.{body}.")
+
+
+def test_token_signed_with_another_key_is_rejected():
+    token = HS256Codec("k" * 40).encode(claims())
+    with pytest.raises(TokenDecodeError, match="Signature"):
+        HS256Codec(SECRET).decode(token)
+
+
+@pytest.mark.parametrize("token", ["", "abc", "a.b", "a.b.c.d", "!!!.@@@.###", "é.é.é"])
+def test_malformed_tokens_are_rejected(token):
+    with pytest.raises(TokenDecodeError):
+        HS256Codec(SECRET).decode(token)
+
+
+def test_non_ascii_payload_segment_is_malformed():
+    codec = HS256Codec(SECRET)
+    header, _, signature = codec.encode(claims()).split(".")
+    with pytest.raises(TokenDecodeError, match="Malformed"):
+        codec.decode(f"{header}.é.{signature}")
+
+
+def test_only_hs256_is_supported():
+    with pytest.raises(ValueError):
+        HS256Codec(SECRET, algorithm="HS512")
@@ -0,0 +1,109 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.chatbot import tool_registry
+from src.chatbot.tool_registry import TOOL_REGISTRY
+from src.mcp_server.db import create_mcp_engine, transaction
+from src.tasks.models import Task
+
+
+@pytest.fixture(name="db_path")
+def db_path_fixture(tmp_path):
+    path = tmp_path / "list.db"
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(bind=engine)
+    start = datetime(2025, 1, 1)
+    with Session(engine) as session:
+        for n in range(12):
+            session.add(Task(
+                user_id="alice",
+                title=f"Task {n}",
+                description="x" * 40,
+                completed=n % 3 == 0,
+                due_date=date(2025, 2, 1) + timedelta(days=n),
+                # Pairs share a timestamp so the id tie-break is exercised
+                created_at=start + timedelta(minutes=n // 2),
+            ))
+        session.add(Task(user_id="mallory", title="Other", created_at=start))
+        session.commit()
+    engine.dispose()
+    return path
+
+
+def list_sync(db_path, **arguments):
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        result = TOOL_REGISTRY.call(session, "list_tasks", TOOL_REGISTRY.validate("list_tasks", arguments))
+    engine.dispose()
+    return result
+
+
+def titles(page):
+    return [task["title"] for task in page["tasks"]]
+
+
+def test_cursor_walks_every_task_once_newest_first(db_path):
+    seen, cursor = [], None
+    while True:
+        page = list_sync(db_path, user_id="alice", limit=5, **({"cursor": cursor} if cursor else {}))
+        seen += titles(page)
+        cursor = page.get("next_cursor")
+        if cursor is None:
+            assert "truncated" not in page
+            break
+        assert "cursor" in page["truncated"]
+
+    assert seen == [f"Task {n}" for n in reversed(range(12))]
+
+
+def test_fields_and_filters_are_pushed_into_sql(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with Session(engine) as session:
+        args = TOOL_REGISTRY.validate("list_tasks", {
+            "user_id": "alice", "status": "pending", "fields": ["title", "due_date"],
+            "due_after": "2025-02-03", "due_before": "2025-02-06",
+        })
+        page = TOOL_REGISTRY.call(session, "list_tasks", args)
+
+    assert page == {"tasks": [
+        {"id": 6, "title": "Task 5", "due_date": "2025-02-06"},
+        {"id": 5, "title": "Task 4", "due_date": "2025-02-05"},
+        {"id": 3, "title": "Task 2", "due_date": "2025-02-03"},
+    ]}
+    select_sql = statements[-1]
+    assert "description" not in select_sql and "LIMIT" in select_sql
+
+
+def test_token_budget_truncates_with_a_cursor(db_path, monkeypatch):
+    monkeypatch.setattr(tool_registry, "LIST_TASKS_MAX_TOKENS", 80)
+
+    page = list_sync(db_path, user_id="alice")
+    assert 0 < len(page["tasks"]) < 12
+    assert page["next_cursor"] and "next_cursor" in page["truncated"]
+
+    rest = list_sync(db_path, user_id="alice", fields=["title"], cursor=page["next_cursor"])
+    assert titles(page) + titles(rest) == [f"Task {n}" for n in reversed(range(12))]
+    assert "next_cursor" not in rest
+
+
+def test_invalid_cursor_is_a_tool_error(db_path):
+    assert list_sync(db_path, user_id="alice", cursor="not-a-cursor") == {"error": "Invalid cursor"}
+
+
+@pytest.mark.asyncio
+async def test_async_handler_returns_the_same_pages(db_path):
+    engine = create_mcp_engine(f"sqlite:///{db_path}")
+    try:
+        arguments = {"user_id": "alice", "status": "completed", "limit": 2, "fields": ["completed"]}
+        async with transaction(engine) as session:
+            page = await TOOL_REGISTRY.acall(session, "list_tasks", TOOL_REGISTRY.validate("list_tasks", arguments))
+    finally:
+        await engine.dispose()
+
+    assert page == list_sync(db_path, **arguments)
+    assert page["tasks"] == [{"id": 10, "completed": True}, {"id": 7, "completed": True}]
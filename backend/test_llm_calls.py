@@ -0,0 +1,177 @@
+import asyncio
+import time
+from unittest.mock import patch
+import openai
+import pytest
+from openai import AsyncOpenAI
+
+from src.chatbot import llm_calls
+from src.chatbot.llm_calls import (
+    Deadline, LLMBusyError, LLMDeadlineExceeded, LLMLimiter, completion_stream, create_completion,
+)
+from src.chatbot.turn_coalescer import TurnCoalescer
+from fake_openai_server import FakeCompletionServer, completion, text_chunks
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff():
+    with patch.object(llm_calls, "LLM_BACKOFF_BASE_SECONDS", 0.01):
+        yield
+
+
+async def complete(server: FakeCompletionServer, limiter: LLMLimiter, deadline: Deadline = None):
+    client = AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+    try:
+        response = await create_completion(
+            client, deadline, limiter, model="fake", messages=[{"role": "user", "content": "hi"}]
+        )
+        return response.choices[0].message.content
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_and_server_errors_are_retried():
+    limiter = LLMLimiter()
+    with FakeCompletionServer([429, 503, completion("ok")]) as server:
+        assert await complete(server, limiter) == "ok"
+
+    assert len(server.requests) == 3
+    assert limiter.stats()["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_attempts_are_bounded():
+    with FakeCompletionServer([500, 500, 500, completion("too late")]) as server:
+        with pytest.raises(openai.InternalServerError):
+            await complete(server, LLMLimiter())
+
+    assert len(server.requests) == llm_calls.LLM_MAX_ATTEMPTS
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    with FakeCompletionServer([400, completion("unused")]) as server:
+        with pytest.raises(openai.BadRequestError):
+            await complete(server, LLMLimiter())
+
+    assert len(server.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_turn_deadline_bounds_total_time():
+    with FakeCompletionServer([completion("slow")], response_delay=0.5) as server:
+        started = time.perf_counter()
+        with pytest.raises(openai.APITimeoutError):
+            await complete(server, LLMLimiter(), Deadline(0.2))
+        assert time.perf_counter() - started < 0.45
+
+    with pytest.raises(LLMDeadlineExceeded):
+        await create_completion(None, Deadline(0), LLMLimiter(), model="fake", messages=[])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_capped():
+    limiter = LLMLimiter(max_concurrency=2)
+    with FakeCompletionServer([completion("ok")] * 4, response_delay=0.2) as server:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(complete(server, limiter) for _ in range(4)))
+        elapsed = time.perf_counter() - started
+
+    assert results == ["ok"] * 4
+    assert elapsed >= 0.4
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_call_is_refused_when_no_slot_frees_up():
+    limiter = LLMLimiter(max_concurrency=1)
+    with patch.object(llm_calls, "LLM_SLOT_WAIT_SECONDS", 0.05), \
+            FakeCompletionServer([completion("ok")] * 2, response_delay=0.3) as server:
+        results = await asyncio.gather(complete(server, limiter), complete(server, limiter), return_exceptions=True)
+
+    assert sum(isinstance(r, LLMBusyError) for r in results) == 1
+    assert limiter.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_holds_slot_until_consumed():
+    limiter = LLMLimiter(max_concurrency=1)
+    with FakeCompletionServer([503, text_chunks("a", "b")]) as server:
+        client = AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        async with completion_stream(client, None, limiter, model="fake", messages=[]) as stream:
+            assert limiter.in_flight == 1
+            parts = [chunk.choices[0].delta.content async for chunk in stream if chunk.choices]
+        await client.close()
+
+    assert "".join(p for p in parts if p) == "ab"
+    assert limiter.in_flight == 0
+    assert limiter.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_is_closed_when_the_reader_stops_early():
+    limiter = LLMLimiter(max_concurrency=1)
+    with FakeCompletionServer([text_chunks(*"abcdef")]) as server:
+        client = AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        async with completion_stream(client, None, limiter, model="fake", messages=[]) as stream:
+            async for chunk in stream:
+                break
+            assert not stream.response.is_closed
+        await client.close()
+
+    assert stream.response.is_closed
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_duplicate_submission_shares_the_running_turn():
+    coalescer = TurnCoalescer()
+    calls = []
+
+    async def turn():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"response": "done"}
+
+    first, second = await asyncio.gather(
+        coalescer.run(1, "add milk", turn),
+        coalescer.run(1, "add milk", turn),
+    )
+
+    assert len(calls) == 1
+    assert first == ({"response": "done"}, False)
+    assert second == ({"response": "done"}, True)
+
+
+@pytest.mark.asyncio
+async def test_different_messages_in_one_conversation_run_in_order():
+    coalescer = TurnCoalescer()
+    log = []
+
+    def turn(name):
+        async def run():
+            log.append(f"start {name}")
+            await asyncio.sleep(0.02)
+            log.append(f"end {name}")
+            return name
+        return run
+
+    await asyncio.gather(coalescer.run(1, "a", turn("a")), coalescer.run(1, "b", turn("b")), coalescer.run(2, "c", turn("c")))
+
+    assert log.index("end a") < log.index("start b")
+    assert log.index("start c") < log.index("end a")
+    assert coalescer._locks == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_turn_fails_its_duplicates():
+    coalescer = TurnCoalescer()
+
+    async def turn():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(coalescer.run(1, "x", turn), coalescer.run(1, "x", turn), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
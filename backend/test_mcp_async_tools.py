@@ -0,0 +1,159 @@
+import pytest
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.chatbot.tool_registry import TOOL_REGISTRY
+from src.mcp_server.db import async_database_url, create_mcp_engine, transaction
+from src.tasks.models import Task
+
+
+@pytest.fixture(name="db_path")
+def db_path_fixture(tmp_path):
+    path = tmp_path / "mcp.db"
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(bind=engine)
+    engine.dispose()
+    return path
+
+
+async def call(engine, name: str, **arguments):
+    args = TOOL_REGISTRY.validate(name, arguments)
+    async with transaction(engine) as session:
+        return await TOOL_REGISTRY.acall(session, name, args)
+
+
+def test_async_database_url():
+    assert async_database_url("postgresql://u:p@db/todo") == "postgresql+psycopg://u:p@db/todo"
+    assert async_database_url("postgresql+psycopg2://db/todo") == "postgresql+psycopg://db/todo"
+    assert async_database_url("sqlite:///./todo.db") == "sqlite+aiosqlite:///./todo.db"
+    assert async_database_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://db/todo")
+
+
+@pytest.mark.asyncio
+async def test_every_tool_has_an_async_handler(db_path):
+    engine = create_mcp_engine(f"sqlite:///{db_path}", pool_size=2)
+    try:
+        created = await call(engine, "add_task", user_id="alice", title="Buy milk", description="2 litres")
+        task_id = created["task_id"]
+        assert created == {"task_id": task_id, "status": "created", "title": "Buy milk"}
+
+        assert await call(engine, "update_task", user_id="alice", task_id=task_id, title="Buy oat milk") == {
+            "task_id": task_id, "status": "updated", "title": "Buy oat milk"
+        }
+        assert (await call(engine, "complete_task", user_id="alice", task_id=task_id))["status"] == "completed"
+        assert await call(engine, "list_tasks", user_id="alice", status="completed") == {"tasks": [
+            {"id": task_id, "title": "Buy oat milk", "description": "2 litres", "completed": True}
+        ]}
+        assert await call(engine, "list_tasks", user_id="alice", status="pending") == {"tasks": []}
+        assert (await call(engine, "delete_task", user_id="alice", task_id=task_id))["status"] == "deleted"
+        assert await call(engine, "list_tasks", user_id="alice") == {"tasks": []}
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_other_users_tasks_read_as_not_found(db_path):
+    engine = create_mcp_engine(f"sqlite:///{db_path}")
+    try:
+        task_id = (await call(engine, "add_task", user_id="alice", title="Private"))["task_id"]
+
+        for name in ("complete_task", "delete_task", "update_task"):
+            assert await call(engine, name, user_id="mallory", task_id=task_id) == {"error": "Task not found"}
+        assert await call(engine, "list_tasks", user_id="mallory") == {"tasks": []}
+    finally:
+        await engine.dispose()
+
+    with Session(create_engine(f"sqlite:///{db_path}")) as session:
+        task = session.exec(select(Task)).one()
+        assert task.title == "Private" and not task.completed
+
+
+@pytest.mark.asyncio
+async def test_transaction_rolls_back_on_error(db_path):
+    engine = create_mcp_engine(f"sqlite:///{db_path}")
+    try:
+        with pytest.raises(RuntimeError):
+            async with transaction(engine) as session:
+                await TOOL_REGISTRY.acall(session, "add_task", TOOL_REGISTRY.validate("add_task", {"user_id": "a", "title": "x"}))
+                raise RuntimeError("tool failed")
+
+        assert await call(engine, "list_tasks", user_id="a") == {"tasks": []}
+    finally:
+        await engine.dispose()
+
+
+async def batch(engine, user_id: str, *operations):
+    args = TOOL_REGISTRY.validate(
+        "batch", {"user_id": user_id, "operations": [{"tool": tool, "arguments": arguments} for tool, arguments in operations]}
+    )
+    async with transaction(engine) as session:
+        return await TOOL_REGISTRY.acall(session, "batch", args)
+
+
+def test_batch_schema_is_inlined_and_mcp_only():
+    mcp = {tool["name"]: tool for tool in TOOL_REGISTRY.mcp_tools()}
+    operations = mcp["batch"]["inputSchema"]["properties"]["operations"]
+
+    assert operations["maxItems"] == 50
+    assert operations["items"]["properties"]["tool"]["enum"] == ["add_task", "complete_task", "update_task", "delete_task"]
+    assert "$ref" not in str(mcp["batch"]) and "$defs" not in str(mcp["batch"])
+    assert "batch" not in [tool["function"]["name"] for tool in TOOL_REGISTRY.openai_tools()]
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_operations_in_order_with_bulk_statements(db_path):
+    engine = create_mcp_engine(f"sqlite:///{db_path}")
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    try:
+        added = await batch(engine, "alice", *[("add_task", {"title": f"Task {n}"}) for n in range(5)])
+        ids = [result["task_id"] for result in added["results"]]
+        assert [result["title"] for result in added["results"]] == [f"Task {n}" for n in range(5)]
+        # Each result is the row its own operation inserted
+        with Session(create_engine(f"sqlite:///{db_path}")) as session:
+            stored = {task.id: task.title for task in session.exec(select(Task))}
+        assert [stored[task_id] for task_id in ids] == [f"Task {n}" for n in range(5)]
+
+        statements.clear()
+        result = await batch(
+            engine, "alice",
+            ("complete_task", {"task_id": ids[0]}),
+            ("complete_task", {"task_id": ids[1]}),
+            ("complete_task", {"task_id": 9999}),
+            ("update_task", {"task_id": ids[2], "title": "Renamed"}),
+            ("delete_task", {"task_id": ids[3]}),
+            ("delete_task", {"task_id": ids[3]}),
+            ("add_task", {"title": ""}),
+        )
+        assert sum(sql.startswith("UPDATE") for sql in statements) == 2
+        assert [r.get("status", r.get("error")) for r in result["results"]] == [
+            "completed", "completed", "Task not found", "updated", "deleted", "Task not found",
+            result["results"][-1]["error"],
+        ]
+        assert result["results"][-1]["error"].startswith("Invalid arguments for add_task")
+        assert (result["succeeded"], result["failed"]) == (4, 3)
+
+        remaining = (await call(engine, "list_tasks", user_id="alice"))["tasks"]
+        assert {task["title"]: task["completed"] for task in remaining} == {
+            "Task 0": True, "Task 1": True, "Renamed": False, "Task 4": False
+        }
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_batch_cannot_touch_other_users_tasks(db_path):
+    engine = create_mcp_engine(f"sqlite:///{db_path}")
+    try:
+        task_id = (await call(engine, "add_task", user_id="alice", title="Private"))["task_id"]
+        result = await batch(
+            engine, "mallory",
+            ("complete_task", {"task_id": task_id, "user_id": "alice"}),
+            ("delete_task", {"task_id": task_id}),
+        )
+        assert result["failed"] == 2
+        assert (await call(engine, "list_tasks", user_id="alice"))["tasks"][0]["completed"] is False
+    finally:
+        await engine.dispose()
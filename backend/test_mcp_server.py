@@ -0,0 +1,93 @@
+import json
+import anyio
+import pytest
+from mcp import types
+from mcp.shared.memory import create_connected_server_and_client_session
+from pydantic import AnyUrl
+from sqlmodel import SQLModel, create_engine
+
+from src.mcp_server.__main__ import main
+from src.mcp_server.db import create_mcp_engine
+from src.mcp_server.server import TodoMCPServer, tasks_uri
+
+
+@pytest.fixture(name="mcp_server")
+def mcp_server_fixture(tmp_path):
+    url = f"sqlite:///{tmp_path / 'mcp.db'}"
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(bind=engine)
+    engine.dispose()
+    # The async engine connects lazily, inside the test's event loop
+    return TodoMCPServer(create_mcp_engine(url))
+
+
+def payload(result) -> object:
+    return json.loads(result.content[0].text)
+
+
+@pytest.mark.asyncio
+async def test_tools_are_listed_and_callable_over_the_protocol(mcp_server):
+    async with create_connected_server_and_client_session(mcp_server.server) as client:
+        tools = await client.list_tools()
+        assert [tool.name for tool in tools.tools] == [
+            "add_task", "list_tasks", "complete_task", "delete_task", "update_task", "batch"
+        ]
+
+        created = await client.call_tool("add_task", {"user_id": "alice", "title": "Buy milk"})
+        assert not created.isError
+        assert payload(created)["status"] == "created"
+
+        listed = await client.call_tool("list_tasks", {"user_id": "alice"})
+        assert [task["title"] for task in payload(listed)["tasks"]] == ["Buy milk"]
+    await mcp_server.engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_tool_errors_are_reported_as_errors(mcp_server):
+    async with create_connected_server_and_client_session(mcp_server.server) as client:
+        missing = await client.call_tool("complete_task", {"user_id": "alice", "task_id": 42})
+        invalid = await client.call_tool("add_task", {"user_id": "alice"})
+    await mcp_server.engine.dispose()
+
+    assert missing.isError and "Task not found" in missing.content[0].text
+    assert invalid.isError and "Invalid arguments for add_task" in invalid.content[0].text
+
+
+def test_entry_point_rejects_unknown_transport(capsys):
+    with pytest.raises(SystemExit):
+        main(["--transport", "websocket"])
+    assert "invalid choice" in capsys.readouterr().err
+
+
+@pytest.mark.asyncio
+async def test_subscribers_are_notified_of_task_changes(mcp_server):
+    notifications = []
+
+    async def on_message(message):
+        if isinstance(message, types.ServerNotification):
+            notifications.append(message.root)
+
+    async with create_connected_server_and_client_session(mcp_server.server, message_handler=on_message) as client:
+        assert client.get_server_capabilities().resources.subscribe
+        templates = await client.list_resource_templates()
+        assert [template.uriTemplate for template in templates.resourceTemplates] == ["todo://tasks/{user_id}"]
+
+        uri = AnyUrl(tasks_uri("alice@example.com"))
+        await client.subscribe_resource(uri)
+        created = payload(await client.call_tool("add_task", {"user_id": "alice@example.com", "title": "Buy milk"}))
+        await client.call_tool("add_task", {"user_id": "bob", "title": "Not alice's"})
+        for _ in range(50):
+            if notifications:
+                break
+            await anyio.sleep(0.01)
+
+        contents = (await client.read_resource(uri)).contents[0]
+        await client.unsubscribe_resource(uri)
+        await client.call_tool("complete_task", {"user_id": "alice@example.com", "task_id": created["task_id"]})
+        await anyio.sleep(0.05)
+    await mcp_server.close()
+
+    assert len(notifications) == 1
+    assert str(notifications[0].params.uri) == str(uri)
+    assert notifications[0].params.meta.changes == [{"task_id": created["task_id"], "action": "created"}]
+    assert [task["title"] for task in json.loads(contents.text)["tasks"]] == ["Buy milk"]
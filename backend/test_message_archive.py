@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, func, select
+
+from src.chatbot import archive as archive_module
+from src.chatbot.archive import MessageArchiveService, set_archive_codec, unpack_messages
+from src.chatbot.conversation_models import Conversation, Message, MessageArchive
+from src.chatbot.history import ConversationHistoryService
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def seed(session: Session, conversations: int = 3, per_conversation: int = 10) -> list:
+    """Messages one day apart, the oldest per_conversation days ago"""
+    now = datetime.utcnow()
+    ids = []
+    for _ in range(conversations):
+        conversation = Conversation(user_id="testuser", message_count=per_conversation)
+        session.add(conversation)
+        session.commit()
+        ids.append(conversation.id)
+        session.add_all([
+            Message(
+                user_id="testuser",
+                conversation_id=conversation.id,
+                role="user" if n % 2 == 0 else "assistant",
+                content=f"message {n} " + "lorem ipsum " * 20,
+                created_at=now - timedelta(days=per_conversation - n, minutes=1),
+            )
+            for n in range(per_conversation)
+        ])
+    session.commit()
+    return ids
+
+
+def test_old_messages_move_to_compressed_blocks(engine):
+    with Session(engine) as session:
+        seed(session)
+
+        stats = MessageArchiveService.archive_old_messages(session, retention_days=4, batch_size=7)
+
+        assert stats["messages"] == 21
+        assert stats["compressed_bytes"] < stats["raw_bytes"] / 3
+        hot = session.exec(select(Message)).all()
+        assert len(hot) == 9
+        assert min(m.created_at for m in hot) > datetime.utcnow() - timedelta(days=4)
+
+        blocks = session.exec(select(MessageArchive)).all()
+        assert all(len({m.conversation_id for m in unpack_messages(b)}) == 1 for b in blocks)
+        assert sum(b.message_count for b in blocks) == 21
+
+
+def test_archiving_is_idempotent(engine):
+    with Session(engine) as session:
+        seed(session)
+        MessageArchiveService.archive_old_messages(session, retention_days=4)
+
+        assert MessageArchiveService.archive_old_messages(session, retention_days=4)["messages"] == 0
+
+
+def test_history_pages_continue_into_archive(engine):
+    with Session(engine) as session:
+        conversation_id = seed(session, conversations=1, per_conversation=25)[0]
+        before = [m.id for m in ConversationHistoryService.list_messages(session, conversation_id, "testuser", limit=100)[0]]
+
+        MessageArchiveService.archive_old_messages(session, retention_days=12, batch_size=5)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = ConversationHistoryService.list_messages(
+                session, conversation_id, "testuser", limit=4, cursor=cursor
+            )
+            seen += [m.id for m in page]
+            if cursor is None:
+                break
+
+    assert seen == before
+
+
+def test_refresh_stats_counts_archived_messages(engine):
+    with Session(engine) as session:
+        conversation_id = seed(session, conversations=1)[0]
+        MessageArchiveService.archive_old_messages(session, retention_days=0.001)
+        ConversationHistoryService.refresh_stats(session, conversation_id)
+
+        conversation = session.get(Conversation, conversation_id)
+        assert session.exec(select(func.count()).select_from(Message)).one() == 0
+        assert conversation.message_count == 10
+        assert conversation.preview.startswith("message 9")
+
+
+def test_zstd_codec_requires_zstandard(monkeypatch):
+    monkeypatch.setattr(archive_module, "ARCHIVE_CODEC", "zlib")
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        with pytest.raises(ImportError):
+            set_archive_codec("zstd")
+        assert archive_module.ARCHIVE_CODEC == "zlib"
+    with pytest.raises(ValueError):
+        set_archive_codec("lz4")
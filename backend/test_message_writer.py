@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.chatbot import message_writer as writer_module
+from src.chatbot.conversation_models import Conversation, Message
+from src.chatbot.message_writer import MessageWriter, PendingTurn, record_turn, set_durability_mode
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(name="conversations")
+def conversations_fixture(engine):
+    with Session(engine, expire_on_commit=False) as session:
+        conversations = [Conversation(user_id="testuser") for _ in range(3)]
+        session.add_all(conversations)
+        session.commit()
+    return conversations
+
+
+def count_commits(engine) -> list:
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    return commits
+
+
+def turn(conversation: Conversation, n: int) -> PendingTurn:
+    now = datetime.utcnow() + timedelta(seconds=n)
+    return PendingTurn(
+        conversation_id=conversation.id,
+        user_id="testuser",
+        messages=[("user", f"question {n}", now), ("assistant", f"answer {n}", now)],
+        updated_at=now,
+    )
+
+
+def test_sync_mode_writes_turn_in_one_commit(engine, conversations):
+    commits = count_commits(engine)
+    with Session(engine) as session:
+        record_turn(session, turn(conversations[0], 1))
+
+        assert len(commits) == 1
+        assert [m.role for m in session.exec(select(Message)).all()] == ["user", "assistant"]
+        assert session.get(Conversation, conversations[0].id).updated_at > conversations[0].updated_at
+
+
+@pytest.mark.asyncio
+async def test_write_behind_batches_turns_across_conversations(engine, conversations):
+    writer = MessageWriter(engine, flush_interval=0.05)
+    commits = count_commits(engine)
+
+    for n, conversation in enumerate(conversations * 2):
+        assert writer.enqueue(turn(conversation, n))
+    assert writer.has_pending(conversations[0].id)
+
+    await writer.close()
+
+    assert len(commits) == 1
+    assert not writer.has_pending(conversations[0].id)
+    assert writer.stats() == {"queued": 0, "written": 6, "dropped": 0}
+    with Session(engine) as session:
+        assert len(session.exec(select(Message)).all()) == 12
+
+
+@pytest.mark.asyncio
+async def test_record_turn_falls_back_to_sync_write_when_queue_is_full(engine, conversations):
+    writer = MessageWriter(engine, max_pending=1)
+    set_durability_mode("write_behind")
+    try:
+        with patch.object(writer_module, "message_writer", writer), Session(engine) as session:
+            record_turn(session, turn(conversations[0], 1))
+            record_turn(session, turn(conversations[1], 2))
+
+            # The second turn did not fit in the queue and was written directly
+            assert len(session.exec(select(Message)).all()) == 2
+            await writer.flush()
+            assert len(session.exec(select(Message)).all()) == 4
+    finally:
+        set_durability_mode("sync")
+        await writer.close()
+
+
+def test_unknown_durability_mode_is_rejected():
+    with pytest.raises(ValueError):
+        set_durability_mode("eventually")
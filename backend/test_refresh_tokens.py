@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from src.auth.refresh_token_model import RefreshToken, hash_refresh_token
+from src.auth.refresh_token_service import MAX_REFRESH_TOKENS_PER_USER, RefreshTokenService
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        yield session
+
+
+def issue(session: Session, user_id: int) -> str:
+    token = RefreshTokenService.issue(session, user_id)
+    session.commit()
+    return token
+
+
+def stored_hashes(session: Session, user_id: int) -> set:
+    return set(session.exec(select(RefreshToken.token_hash).where(RefreshToken.user_id == user_id)).all())
+
+
+def test_issue_keeps_only_the_newest_tokens_per_user(session: Session):
+    tokens = [issue(session, 1) for _ in range(MAX_REFRESH_TOKENS_PER_USER + 2)]
+    other = issue(session, 2)
+
+    assert stored_hashes(session, 1) == {hash_refresh_token(t) for t in tokens[2:]}
+    assert stored_hashes(session, 2) == {hash_refresh_token(other)}
+    assert RefreshTokenService.get_valid(session, tokens[0]) is None
+    assert RefreshTokenService.get_valid(session, tokens[-1]).user_id == 1
+
+
+def test_get_valid_rejects_and_deletes_revoked_and_expired_tokens(session: Session):
+    revoked, expired, live = issue(session, 1), issue(session, 1), issue(session, 1)
+    for token, values in ((revoked, {"revoked": True}), (expired, {"expires_at": datetime.utcnow() - timedelta(seconds=1)})):
+        row = session.exec(select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token))).one()
+        for key, value in values.items():
+            setattr(row, key, value)
+        session.add(row)
+    session.commit()
+
+    assert RefreshTokenService.get_valid(session, revoked) is None
+    assert RefreshTokenService.get_valid(session, expired) is None
+    assert RefreshTokenService.get_valid(session, "never-issued") is None
+    assert RefreshTokenService.get_valid(session, live) is not None
+    assert stored_hashes(session, 1) == {hash_refresh_token(live)}
+
+
+def test_rotate_replaces_the_token_and_the_old_one_cannot_be_rotated_again(session: Session):
+    old = issue(session, 1)
+
+    new = RefreshTokenService.rotate(session, RefreshTokenService.get_valid(session, old))
+    session.commit()
+
+    assert new != old
+    assert stored_hashes(session, 1) == {hash_refresh_token(new)}
+    assert RefreshTokenService.get_valid(session, old) is None
+    assert RefreshTokenService.get_valid(session, new).user_id == 1
+
+
+def test_prune_deletes_dead_tokens_in_batches_and_keeps_live_ones(session: Session):
+    now = datetime.utcnow()
+    for n in range(7):
+        session.add(RefreshToken(
+            token_hash=f"{n:064d}",
+            user_id=1,
+            expires_at=now - timedelta(hours=1) if n < 5 else now + timedelta(days=1),
+            revoked=n >= 5,
+        ))
+    session.commit()
+    live = [issue(session, 2) for _ in range(3)]
+
+    assert [RefreshTokenService.prune(session, batch_size=3) for _ in range(4)] == [3, 3, 1, 0]
+    assert stored_hashes(session, 1) == set()
+    assert stored_hashes(session, 2) == {hash_refresh_token(t) for t in live}
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.pool import StaticPool
+
+from src.auth.revocation import RevocationList, start_revocation_refresher
+from src.auth.revoked_token_model import RevokedToken
+from src.auth.routes import router
+from src.database import get_session
+from src.middleware.auth import AuthMiddleware
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        yield session
+
+
+def test_load_and_refresh_pick_up_revocations(session: Session):
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    session.add(RevokedToken(jti="b" * 32, user_id=1, expires_at=datetime.utcnow() - timedelta(hours=1)))
+    session.commit()
+    session.add(RevokedToken(jti="a" * 32, user_id=1, expires_at=expires_at))
+    session.commit()
+
+    revocations = RevocationList()
+    revocations.load(session)
+    assert revocations.stats()["entries"] == 1
+
+    # Simulate another worker revoking a token
+    session.add(RevokedToken(jti="c" * 32, user_id=2, expires_at=expires_at))
+    session.commit()
+    assert revocations.refresh(session) == 1
+    assert revocations.refresh(session) == 0
+    assert revocations.stats()["entries"] == 2
+
+
+def test_lookups_are_answered_from_memory(session: Session):
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    revocations = RevocationList()
+    revocations.revoke(session, "a" * 32, user_id=1, expires_at=expires_at)
+    session.add(RevokedToken(jti="c" * 32, user_id=2, expires_at=expires_at))
+    session.commit()
+    revocations.refresh(session)
+
+    with patch("src.auth.revocation.Session", side_effect=AssertionError("database used")):
+        assert revocations.is_revoked("a" * 32)
+        assert revocations.is_revoked("c" * 32)
+        assert not revocations.is_revoked("d" * 32)
+        assert not revocations.is_revoked(None)
+    assert revocations.stats() == {"entries": 2, "checks": 3, "hits": 2}
+
+
+@pytest.mark.asyncio
+async def test_refresher_loads_before_returning(session: Session):
+    session.add(RevokedToken(jti="e" * 32, user_id=1, expires_at=datetime.utcnow() + timedelta(hours=1)))
+    session.commit()
+    revocations = RevocationList()
+
+    with patch("src.auth.revocation.engine", session.get_bind()), \
+            patch("src.auth.revocation.revocation_list", revocations):
+        task = await start_revocation_refresher(interval=3600)
+        task.cancel()
+
+    assert revocations.loaded and revocations.is_revoked("e" * 32)
+
+
+def test_access_token_is_rejected_after_logout(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware)
+    app.include_router(router)
+    app.dependency_overrides[get_session] = session_override
+
+    with TestClient(app) as client:
+        registered = client.post("/api/auth/register", json={"email": "logout@example.com", "password": "Passw0rd1"})
+        headers = {"Authorization": f"Bearer {registered.json()['access_token']}"}
+
+        assert client.post("/api/auth/logout", headers=headers).status_code == 200
+        reused = client.post("/api/auth/logout", headers=headers)
+
+    engine.dispose()
+    assert reused.status_code == 401
+    assert reused.json()["error"] == "invalid_token"
@@ -0,0 +1,94 @@
+import pytest
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.chatbot.tool_registry import TOOL_REGISTRY
+from src.mcp_server.db import create_mcp_engine, transaction
+from src.tasks.changes import TaskChange, TaskChangeBus, record_change, task_changes
+from src.tasks.service import TaskService
+
+
+@pytest.fixture(name="db_path")
+def db_path_fixture(tmp_path):
+    path = tmp_path / "changes.db"
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(bind=engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture(name="published")
+def published_fixture():
+    published = []
+    unsubscribe = task_changes.subscribe(published.append)
+    yield published
+    unsubscribe()
+
+
+def test_service_writes_are_published_after_commit(db_path, published):
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        task = TaskService.create_task(session, "alice", "Buy milk")
+        TaskService.toggle_task(session, task.id, "alice")
+        TaskService.delete_task(session, task.id, "alice")
+
+        TaskService.create_task(session, "alice", "Flushed only", commit=False)
+        assert [change.action for batch in published for change in batch] == ["created", "updated", "deleted"]
+        session.rollback()
+
+    assert published == [
+        [TaskChange("alice", task.id, "created")],
+        [TaskChange("alice", task.id, "updated")],
+        [TaskChange("alice", task.id, "deleted")],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_async_tools_publish_once_per_transaction(db_path, published):
+    engine = create_mcp_engine(f"sqlite:///{db_path}")
+    try:
+        async with transaction(engine) as session:
+            args = TOOL_REGISTRY.validate("batch", {"user_id": "bob", "operations": [
+                {"tool": "add_task", "arguments": {"title": "One"}},
+                {"tool": "add_task", "arguments": {"title": "Two"}},
+                {"tool": "complete_task", "arguments": {"task_id": 1}},
+                {"tool": "delete_task", "arguments": {"task_id": 2}},
+                {"tool": "delete_task", "arguments": {"task_id": 99}},
+            ]})
+            await TOOL_REGISTRY.acall(session, "batch", args)
+            assert published == []
+
+        with pytest.raises(RuntimeError):
+            async with transaction(engine) as session:
+                args = TOOL_REGISTRY.validate("update_task", {"user_id": "bob", "task_id": 1, "title": "Renamed"})
+                await TOOL_REGISTRY.acall(session, "update_task", args)
+                raise RuntimeError("rolled back")
+    finally:
+        await engine.dispose()
+
+    assert published == [[
+        TaskChange("bob", 1, "created"),
+        TaskChange("bob", 2, "created"),
+        TaskChange("bob", 1, "updated"),
+        TaskChange("bob", 2, "deleted"),
+    ]]
+
+
+def test_failing_subscriber_does_not_stop_others_or_the_writer():
+    bus = TaskChangeBus()
+    received = []
+    bus.subscribe(lambda changes: 1 / 0)
+    unsubscribe = bus.subscribe(received.append)
+
+    bus.publish([TaskChange("alice", 1, "created")])
+    unsubscribe()
+    bus.publish([TaskChange("alice", 2, "created")])
+
+    assert received == [[TaskChange("alice", 1, "created")]]
+
+
+def test_record_change_accepts_sync_sessions(db_path, published):
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        record_change(session, "alice", 7, "updated")
+        session.commit()
+    assert published == [[TaskChange("alice", 7, "updated")]]
@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import anyio
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.auth import throttle
+from src.auth.routes import router
+from src.auth.service import AuthService
+from src.auth.throttle import InMemoryRateLimitBackend
+from src.database import get_session
+from src.exceptions import InvalidCredentialsException
+
+
+def test_bucket_allows_burst_then_limits():
+    backend = InMemoryRateLimitBackend()
+    with patch("src.auth.throttle.time.monotonic", return_value=100.0):
+        assert all(backend.consume("ip:1.2.3.4", 3, 1.0) == 0 for _ in range(3))
+        assert backend.consume("ip:1.2.3.4", 3, 1.0) > 0
+        # Other keys have their own bucket
+        assert backend.consume("ip:5.6.7.8", 3, 1.0) == 0
+
+
+def test_bucket_refills_over_time():
+    backend = InMemoryRateLimitBackend()
+    with patch("src.auth.throttle.time.monotonic", return_value=100.0):
+        backend.consume("email:a@b.c", 1, 0.5)
+        assert backend.consume("email:a@b.c", 1, 0.5) == 2.0
+
+    with patch("src.auth.throttle.time.monotonic", return_value=102.0):
+        assert backend.consume("email:a@b.c", 1, 0.5) == 0
+
+
+def test_idle_buckets_are_pruned():
+    backend = InMemoryRateLimitBackend(max_keys=2)
+    with patch("src.auth.throttle.time.monotonic", return_value=0.0):
+        backend.consume("a", 2, 1.0)
+        backend.consume("b", 2, 1.0)
+    with patch("src.auth.throttle.time.monotonic", return_value=10.0):
+        backend.consume("c", 2, 1.0)
+
+    assert set(backend._buckets) == {"c"}
+
+
+def test_pruning_keeps_buckets_of_other_limits_that_are_still_refilling():
+    ip_limit, email_limit = (20, 20 / 60), (5, 5 / 60)
+    backend = InMemoryRateLimitBackend(max_keys=2)
+    with patch("src.auth.throttle.time.monotonic", return_value=0.0):
+        for _ in range(20):
+            backend.consume("ip:1.2.3.4", *ip_limit)
+    # An email limit bucket is full again after 48 s; the drained IP one needs 60 s
+    with patch("src.auth.throttle.time.monotonic", return_value=50.0):
+        backend.consume("email:a@b.c", *email_limit)
+        backend.consume("email:d@e.f", *email_limit)
+        assert "ip:1.2.3.4" in backend._buckets
+        # 50 s refilled 16.7 tokens, not a fresh bucket's 20
+        assert sum(backend.consume("ip:1.2.3.4", *ip_limit) == 0 for _ in range(20)) == 16
+
+
+def test_pruning_is_amortized_over_new_keys():
+    # Every fourth new key may prune: "d" here
+    backend = InMemoryRateLimitBackend(max_keys=2, prune_every=4)
+    with patch("src.auth.throttle.time.monotonic", return_value=0.0):
+        backend.consume("a", 2, 1.0)
+        backend.consume("b", 2, 1.0)
+    with patch("src.auth.throttle.time.monotonic", return_value=10.0):
+        backend.consume("c", 2, 1.0)
+        for _ in range(5):
+            backend.consume("a", 2, 1.0)
+        assert set(backend._buckets) == {"a", "b", "c"}
+        backend.consume("d", 2, 1.0)
+        assert set(backend._buckets) == {"a", "c", "d"}
+
+
+# Endpoint behaviour: rate limiting, shedding and bursts through /api/auth/login
+
+@pytest.fixture(name="client")
+def client_fixture(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'auth.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+
+    def session_override():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_session] = session_override
+
+    monkeypatch.setattr(throttle, "_backend", InMemoryRateLimitBackend())
+    monkeypatch.setattr(throttle, "IP_RATE_LIMIT", (1000, 1000.0))
+    monkeypatch.setattr(throttle, "_hash_slots", anyio.CapacityLimiter(2))
+    monkeypatch.setattr(throttle, "_hash_threads", anyio.CapacityLimiter(2))
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    engine.dispose()
+
+
+@pytest.fixture(name="slow_authenticate")
+def slow_authenticate_fixture(monkeypatch):
+    """Stands in for bcrypt: 50 ms of blocking work, then bad credentials"""
+    running = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def authenticate(session, email, password):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.05)
+        with lock:
+            running["now"] -= 1
+        raise InvalidCredentialsException()
+
+    monkeypatch.setattr(AuthService, "authenticate", staticmethod(authenticate))
+    return running
+
+
+def login(client, email: str = "a@example.com"):
+    return client.post("/api/auth/login", json={"email": email, "password": "Passw0rd1"})
+
+
+@pytest.mark.asyncio
+async def test_login_is_rate_limited_per_email(client, slow_authenticate, monkeypatch):
+    monkeypatch.setattr(throttle, "EMAIL_RATE_LIMIT", (2, 1 / 60))
+    async with client:
+        statuses = [(await login(client, "A@example.com ")).status_code for _ in range(3)]
+        other = await login(client, "b@example.com")
+        limited = await login(client)
+
+    assert statuses == [401, 401, 429]
+    assert other.status_code == 401
+    assert limited.status_code == 429 and int(limited.headers["Retry-After"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_login_is_shed_when_no_hashing_slot_frees_up(client, slow_authenticate, monkeypatch):
+    monkeypatch.setattr(throttle, "ADMISSION_WAIT_SECONDS", 0.1)
+    holders = [object(), object()]
+    async with client:
+        for holder in holders:
+            await throttle._hash_slots.acquire_on_behalf_of(holder)
+        shed = await login(client)
+        for holder in holders:
+            throttle._hash_slots.release_on_behalf_of(holder)
+        admitted = await login(client)
+
+    assert shed.status_code == 503 and shed.headers["Retry-After"] == "1"
+    assert admitted.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_burst_larger_than_the_threadpool_is_served(client, slow_authenticate):
+    # Shrink the shared threadpool so the burst is several times its size
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 4
+    async with client:
+        responses = await asyncio.gather(*[login(client, f"user{n}@example.com") for n in range(30)])
+
+    assert [response.status_code for response in responses] == [401] * 30
+    assert slow_authenticate["peak"] == 2
@@ -0,0 +1,109 @@
+from unittest.mock import patch
+import pytest
+from openai import AsyncOpenAI
+from sqlmodel import SQLModel, Session, create_engine
+
+from src.chatbot import llm_calls
+from src.chatbot.ai_agent_service import AIAgentService
+from src.chatbot.conversation_models import Conversation
+from src.chatbot.timing import ChatMetrics, Histogram, TurnTimings, span, track_turn
+from fake_openai_server import FakeCompletionServer, completion, text_chunks, tool_call_chunks
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(name="conversation_id")
+def conversation_fixture(engine):
+    with Session(engine, expire_on_commit=False) as session:
+        conversation = Conversation(user_id="testuser")
+        session.add(conversation)
+        session.commit()
+        return conversation.id
+
+
+def test_histogram_percentiles_use_bucket_bounds():
+    histogram = Histogram((10, 100, 1000))
+    for value in [5] * 90 + [50] * 9 + [5000]:
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100
+    assert snapshot["p50"] == 10
+    assert snapshot["p95"] == 100
+    assert snapshot["p99"] == 100
+    assert histogram.percentile(1.0) == float("inf")
+    assert snapshot["buckets"] == {"le_10": 90, "le_100": 9, "le_1000": 0, "le_inf": 1}
+
+
+def test_spans_outside_a_turn_are_ignored():
+    with span("anything"):
+        pass
+
+
+def test_server_timing_header_lists_phases():
+    timings = TurnTimings()
+    with timings.span("llm"):
+        pass
+    with timings.span("llm"):
+        pass
+    timings.first_token()
+
+    header = timings.server_timing()
+    assert header.startswith("llm;dur=")
+    assert "ttft;dur=" in header
+    assert header.split(", ")[-1].startswith("total;dur=")
+
+
+@pytest.mark.asyncio
+async def test_turn_records_phases_tokens_and_retries(engine, conversation_id):
+    metrics = ChatMetrics()
+    script = [
+        500,
+        completion(tool_calls=[{"id": "call_1", "type": "function",
+                                "function": {"name": "add_task", "arguments": '{"title": "Milk"}'}}]),
+        completion("Added Milk."),
+    ]
+    with patch.object(llm_calls, "LLM_BACKOFF_BASE_SECONDS", 0.01), \
+            FakeCompletionServer(script) as server, Session(engine) as session:
+        client = AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        with track_turn(metrics) as timings:
+            result = await AIAgentService(client, engine).process_conversation(
+                session, conversation_id, "testuser", "could you note Milk for me?"
+            )
+        await client.close()
+
+    assert result["response"] == "Added Milk."
+    assert {"fast_path", "context", "llm", "tools", "llm_final"} <= set(timings.spans)
+    assert timings.retries == 1
+    assert (timings.prompt_tokens, timings.completion_tokens) == (20, 10)
+    assert timings.spans["llm"] <= timings.ttft_ms <= timings.total_ms() - timings.spans["llm_final"]
+
+    snapshot = metrics.snapshot()
+    assert snapshot["llm_ms"]["count"] == 1
+    assert snapshot["ttft_ms"]["count"] == 1
+    assert snapshot["retries"]["buckets"]["le_1"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_records_time_to_first_token(engine, conversation_id):
+    with FakeCompletionServer([tool_call_chunks("list_tasks", {}), text_chunks("Nothing ", "yet.")]) as server, \
+            Session(engine) as session:
+        client = AsyncOpenAI(base_url=server.base_url, api_key="test", max_retries=0)
+        with track_turn(ChatMetrics()) as timings:
+            events = [
+                event async for event in AIAgentService(client, engine).stream_conversation(
+                    session, conversation_id, "testuser", "anything on my plate?"
+                )
+            ]
+        await client.close()
+
+    assert events[-1]["response"] == "Nothing yet."
+    assert timings.ttft_ms is not None
+    assert timings.ttft_ms >= timings.spans["llm"] + timings.spans["tools"]
+    assert server.requests[0]["stream_options"] == {"include_usage": True}
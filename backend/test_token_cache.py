@@ -0,0 +1,71 @@
+import time
+import pytest
+from unittest.mock import patch
+
+from src.auth.token_cache import TokenCache
+
+
+def _payload(user_id: int, ttl: float = 3600, jti: str | None = None) -> dict:
+    return {"sub": str(user_id), "exp": time.time() + ttl, "jti": jti}
+
+
+def test_token_verified_once_then_served_from_cache():
+    cache = TokenCache(max_size=10)
+    with patch("src.auth.token_cache.verify_token", return_value=_payload(7)) as verify:
+        assert cache.get_user_id("token-a") == 7
+        assert cache.get_user_id("token-a") == 7
+        assert cache.get_user_id("token-a") == 7
+
+    assert verify.call_count == 1
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_invalid_token_is_not_cached():
+    cache = TokenCache(max_size=10)
+    with patch("src.auth.token_cache.verify_token", return_value=None) as verify:
+        assert cache.get_user_id("bad") is None
+        assert cache.get_user_id("bad") is None
+
+    assert verify.call_count == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TokenCache(max_size=2)
+    payloads = {"a": _payload(1), "b": _payload(2), "c": _payload(3)}
+    with patch("src.auth.token_cache.verify_token", side_effect=lambda t: payloads[t]) as verify:
+        cache.get_user_id("a")
+        cache.get_user_id("b")
+        cache.get_user_id("a")  # "b" is now least recently used
+        cache.get_user_id("c")
+        assert verify.call_count == 3
+
+        cache.get_user_id("a")
+        assert verify.call_count == 3
+        cache.get_user_id("b")
+        assert verify.call_count == 4
+
+    assert cache.stats()["evictions"] == 2
+
+
+def test_entry_expires_with_token():
+    cache = TokenCache(max_size=10)
+    with patch("src.auth.token_cache.verify_token", return_value=_payload(5, ttl=-1)):
+        assert cache.get_user_id("expired") == 5
+
+    with patch("src.auth.token_cache.verify_token", return_value=None):
+        assert cache.get_user_id("expired") is None
+
+    assert cache.stats()["expirations"] == 1
+
+
+def test_revoked_token_is_rejected_even_when_cached():
+    revoked = set()
+    cache = TokenCache(max_size=10, is_revoked=lambda entry: entry.jti in revoked)
+    with patch("src.auth.token_cache.verify_token", return_value=_payload(9, jti="j1")):
+        assert cache.get_user_id("tok") == 9
+        revoked.add("j1")
+        assert cache.get_user_id("tok") is None
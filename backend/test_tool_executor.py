@@ -0,0 +1,75 @@
+import time
+import pytest
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from src.chatbot.tool_executor import ToolExecutor
+from src.chatbot.tool_registry import ToolArgs, ToolRegistry, ToolSpec
+from src.tasks.models import Task
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tools.db'}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_tools_act_on_task_service_for_authenticated_user(engine):
+    executor = ToolExecutor("alice", engine)
+
+    created = await executor.run("add_task", {"user_id": "mallory", "title": "Buy milk"})
+    completed = await executor.run("complete_task", {"task_id": created["task_id"]})
+    listed = await executor.run("list_tasks", {"status": "completed"})
+
+    assert created["status"] == "created"
+    assert completed == {"task_id": created["task_id"], "status": "completed", "title": "Buy milk"}
+    assert [task["title"] for task in listed["tasks"]] == ["Buy milk"]
+    with Session(engine) as session:
+        assert session.exec(select(Task)).one().user_id == "alice"
+
+
+@pytest.mark.asyncio
+async def test_other_users_tasks_and_bad_arguments_return_errors(engine):
+    created = await ToolExecutor("alice", engine).run("add_task", {"title": "Private"})
+    bob = ToolExecutor("bob", engine)
+
+    assert "error" in await bob.run("delete_task", {"task_id": created["task_id"]})
+    assert "error" in await bob.run("delete_task", {"task_id": 999})
+    assert "error" in await bob.run("add_task", {})
+    assert "error" in await bob.run("unknown_tool", {})
+
+
+class EchoArgs(ToolArgs):
+    n: int = 0
+
+
+@pytest.mark.asyncio
+async def test_calls_run_concurrently_and_keep_order(engine):
+    def slow_echo(session, args):
+        time.sleep(0.2)
+        return args.n
+
+    registry = ToolRegistry()
+    registry.register(ToolSpec("echo", "Echo", EchoArgs, slow_echo))
+
+    started = time.perf_counter()
+    results = await ToolExecutor("alice", engine, registry).run_all([("echo", {"n": n}) for n in range(4)])
+    elapsed = time.perf_counter() - started
+
+    assert results == [0, 1, 2, 3]
+    assert elapsed < 0.6
+
+
+@pytest.mark.asyncio
+async def test_slow_tool_times_out(engine):
+    def stuck(session, args):
+        time.sleep(0.3)
+
+    registry = ToolRegistry()
+    registry.register(ToolSpec("stuck", "Never returns in time", EchoArgs, stuck, timeout=0.05))
+
+    result = await ToolExecutor("alice", engine, registry).run("stuck", {})
+
+    assert result == {"error": "stuck timed out"}
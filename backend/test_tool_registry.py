@@ -0,0 +1,56 @@
+import pytest
+
+from src.chatbot.tool_registry import TOOL_REGISTRY, ToolArgumentsError, UpdateTaskArgs
+
+
+TOOL_NAMES = ["add_task", "list_tasks", "complete_task", "delete_task", "update_task"]
+
+
+def test_openai_and_mcp_schemas_come_from_one_definition():
+    openai_tools = TOOL_REGISTRY.openai_tools()
+    mcp_tools = TOOL_REGISTRY.mcp_tools()
+
+    assert [tool["function"]["name"] for tool in openai_tools] == TOOL_NAMES
+    assert [tool["name"] for tool in mcp_tools] == TOOL_NAMES + ["batch"]
+    for openai_tool, mcp_tool in zip(openai_tools, mcp_tools):
+        assert openai_tool["function"]["description"] == mcp_tool["description"]
+        mcp_properties = dict(mcp_tool["inputSchema"]["properties"])
+        assert mcp_properties.pop("user_id") == {"type": "string", "description": "User identifier"}
+        assert openai_tool["function"]["parameters"]["properties"] == mcp_properties
+
+
+def test_schemas_are_built_once():
+    assert TOOL_REGISTRY.openai_tools() is TOOL_REGISTRY.openai_tools()
+    assert TOOL_REGISTRY.mcp_tools() is TOOL_REGISTRY.mcp_tools()
+
+
+def test_schema_is_compact():
+    update = TOOL_REGISTRY.mcp_tools()[TOOL_NAMES.index("update_task")]["inputSchema"]
+    status = TOOL_REGISTRY.mcp_tools()[TOOL_NAMES.index("list_tasks")]["inputSchema"]["properties"]["status"]
+
+    assert update["required"] == ["user_id", "task_id"]
+    assert update["properties"]["title"]["type"] == "string"
+    assert "anyOf" not in update["properties"]["title"]
+    assert status["enum"] == ["all", "pending", "completed"]
+
+
+def test_validate_accepts_json_and_dicts_with_overrides():
+    args = TOOL_REGISTRY.validate("update_task", '{"user_id": "a", "task_id": "3", "title": "New"}')
+    assert args == UpdateTaskArgs(user_id="a", task_id=3, title="New")
+
+    args = TOOL_REGISTRY.validate("update_task", '{"user_id": "mallory", "task_id": 3}', user_id="alice")
+    assert args.user_id == "alice"
+
+
+@pytest.mark.parametrize("name, arguments", [
+    ("add_task", {"user_id": "a"}),
+    ("add_task", {"user_id": "a", "title": ""}),
+    ("list_tasks", {"user_id": "a", "status": "overdue"}),
+    ("complete_task", {"user_id": "a", "task_id": "twelve"}),
+    ("complete_task", "not json"),
+    ("complete_task", "[1, 2]"),
+    ("unknown_tool", {}),
+])
+def test_validate_rejects_bad_arguments(name, arguments):
+    with pytest.raises(ToolArgumentsError):
+        TOOL_REGISTRY.validate(name, arguments, user_id="a")
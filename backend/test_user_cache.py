@@ -0,0 +1,75 @@
+import pytest
+from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.pool import StaticPool
+
+from src.auth.models import User
+from src.auth.user_cache import UserCache, UserSnapshot, user_cache
+
+
+@pytest.fixture(name="session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture(name="user")
+def user_fixture(session: Session):
+    user = User(email="cached@example.com", hashed_password="x")
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
+
+
+def test_second_lookup_is_served_from_cache(session: Session, user: User):
+    cache = UserCache()
+    first = cache.get_by_id(session, user.id)
+    second = cache.get_by_email(session, user.email)
+
+    assert first == second == UserSnapshot(user.id, user.email, user.created_at)
+    assert not hasattr(first, "hashed_password")
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_missing_user_is_not_cached(session: Session):
+    cache = UserCache()
+    assert cache.get_by_id(session, 999) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_expired_entry_is_reloaded(session: Session, user: User):
+    cache = UserCache(ttl=0)
+    cache.get_by_id(session, user.id)
+    cache.get_by_id(session, user.id)
+    assert cache.stats()["hits"] == 0
+
+
+def test_size_bound_evicts_least_recently_used(session: Session):
+    users = [User(email=f"u{i}@example.com", hashed_password="x") for i in range(3)]
+    session.add_all(users)
+    session.commit()
+
+    cache = UserCache(max_size=2)
+    for u in users:
+        cache.get_by_id(session, u.id)
+
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_orm_update_invalidates_shared_cache(session: Session, user: User):
+    user_cache.clear()
+    user_cache.get_by_id(session, user.id)
+
+    user.email = "renamed@example.com"
+    session.add(user)
+    session.commit()
+
+    assert user_cache.get_by_id(session, user.id).email == "renamed@example.com"